@@ -0,0 +1,115 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.base.registry`."""
+import gc
+import os
+import sys
+import pytest
+from {{ cookiecutter.repo_name }}.base.abc import AbstractPersistence
+from {{ cookiecutter.repo_name }}.base.registry import Registry
+from {{ cookiecutter.repo_name }}.exceptions import AmbiguousMatchError
+
+MODULES = {
+    '__init__.py': "",
+    'a.py': (
+        "from {{ cookiecutter.repo_name }}.base.abc import AbstractPersistence\n"
+        "class RegA(AbstractPersistence):\n"
+        "    pass\n"
+        "class RegDup(AbstractPersistence):\n"
+        "    pass\n"
+    ),
+    'b.py': (
+        "from {{ cookiecutter.repo_name }}.base.abc import AbstractPersistence\n"
+        "from .a import RegA\n"
+        "class RegB(AbstractPersistence):\n"
+        "    pass\n"
+        "class RegDup(AbstractPersistence):\n"
+        "    pass\n"
+    ),
+    'lazy.py': (
+        "import sys\n"
+        "from types import ModuleType\n"
+        "from {{ cookiecutter.repo_name }}.base.abc import AbstractPersistence\n"
+        "__lazy_objects__ = { 'persistence': [ 'RegLazy' ] }\n"
+        "n_accessed = 0\n"
+        "class _Module(ModuleType):\n"
+        "    @property\n"
+        "    def RegLazy(self):\n"
+        "        global n_accessed\n"
+        "        n_accessed += 1\n"
+        "        return type('RegLazy', (AbstractPersistence,), {})\n"
+        "sys.modules[__name__].__class__ = _Module\n"
+    ),
+    'broken.py': "import module_that_does_not_exist\n",
+    'tests/__init__.py': "raise RuntimeError('should not be imported')\n"
+}
+
+
+@pytest.fixture
+def package(tmpdir, monkeypatch):
+    """Fixture: temporary package with persistence classes."""
+    name = 'regpkg'
+    root = tmpdir.mkdir('src')
+    for path, code in MODULES.items():
+        root.join(name, path).write(code, ensure=True)
+    monkeypatch.syspath_prepend(str(root))
+    yield name, str(root.join(name)), str(tmpdir.join('cache', 'registry.json'))
+    unload(name)
+
+
+def unload(name):
+    for module in [ m for m in sys.modules if m.split('.')[0] == name ]:
+        del sys.modules[module]
+
+
+class TestRegistry:
+    """Test cases for `Registry`."""
+
+    def test_build(self, package):
+        name, path, cache_path = package
+        registry = Registry(name, path, cache_path)
+        index = registry.index['persistence']
+        assert index['RegA'] == [ 'regpkg.a:RegA' ]
+        assert sorted(index['RegDup']) == [ 'regpkg.a:RegDup', 'regpkg.b:RegDup' ]
+        assert registry.get('persistence', 'RegB') is sys.modules['regpkg.b'].RegB
+        assert registry.get('persistence', 'Missing') is None
+        assert registry.get('models', 'RegA') is None
+        assert 'regpkg.broken' in registry._failed
+        assert os.path.exists(cache_path)
+
+    def test_ambiguous(self, package):
+        registry = Registry(*package)
+        with pytest.raises(AmbiguousMatchError):
+            registry.get('persistence', 'RegDup')
+        names = [ c.__name__ for c in registry.iter('persistence') ]
+        assert names.count('RegDup') == 2
+        assert names.count('RegA') == 1
+
+    def test_cache(self, package):
+        name, path, cache_path = package
+        Registry(name, path, cache_path).index
+        unload(name)
+        registry = Registry(name, path, cache_path)
+        assert registry.load() is not None
+        cls = registry.get('persistence', 'RegA')
+        assert cls.__module__ == 'regpkg.a'
+        assert 'regpkg.b' not in sys.modules
+        # Changed modules invalidate the cache
+        stat = os.stat(os.path.join(path, 'b.py'))
+        os.utime(os.path.join(path, 'b.py'), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert Registry(name, path, cache_path).load() is None
+
+    def test_lazy_objects(self, package):
+        registry = Registry(*package)
+        assert registry.index['persistence']['RegLazy'] == [ 'regpkg.lazy:RegLazy' ]
+        # Lazy attributes are not initialized by indexing
+        assert sys.modules['regpkg.lazy'].n_accessed == 0
+        assert registry.get('persistence', 'RegLazy').__name__ == 'RegLazy'
+        assert sys.modules['regpkg.lazy'].n_accessed == 1
+
+    def test_register(self, package):
+        registry = Registry(*package)
+        cls = type('RegDynamic', (AbstractPersistence,), {})
+        registry.register('persistence', cls)
+        assert registry.get('persistence', 'RegDynamic') is cls
+        del cls
+        gc.collect()
+        assert registry.get('persistence', 'RegDynamic') is None
@@ -45,6 +45,18 @@ class TestCLIDbMongo:
         res = cli_runner.invoke(mongo, args)
         assert res.exit_code == 0
 
+    @pytest.mark.parametrize('path_or_name', [EXAMPLE_MONGO_MODEL])
+    @pytest.mark.parametrize('query', ['', '{ "number": { "$gt": 75 } }'])
+    @pytest.mark.parametrize('field', ['', '-ftext'])
+    @pytest.mark.parametrize('order', ['', '-o-number'])
+    @pytest.mark.parametrize('output', ['', 'export.jl.gz'])
+    def test_mongo_export(self, cli_runner, tmpdir, path_or_name, query, field,
+                          order, output):
+        output = f"-O{tmpdir.join(output)}" if output else ''
+        args = make_cli_args('export', path_or_name, query, field, order, output, '-b7')
+        res = cli_runner.invoke(mongo, args)
+        assert res.exit_code == 0
+
     @pytest.mark.parametrize('path_or_name', [EXAMPLE_MONGO_MODEL])
     @pytest.mark.parametrize('query', [
         '{ "text": { "$in": [ "a112", "a17" ] } }'
@@ -69,6 +81,21 @@ class TestCLIDbMongo:
         res = cli_runner.invoke(mongo, args)
         assert res.exit_code == 0
 
+    @pytest.mark.parametrize('path_or_name', [EXAMPLE_MONGO_MODEL])
+    @pytest.mark.parametrize('records', [[
+        '{ "filter": { "text": "a112" }, "update": { "$set": { "number": 112 } } }',
+        '{ "filter": { "text": "a17" }, "update": { "$set": { "number": 17 } }, "upsert": true }'
+    ]])
+    def test_mongo_bulk_update(self, cli_runner, tmpdir, path_or_name, records):
+        src = tmpdir.join('ops.jl')
+        src.write("\n".join(records))
+        reject = tmpdir.join('reject.jl')
+        invalid = tmpdir.join('invalid.jl')
+        args = make_cli_args('bulk-update', path_or_name, str(src), '-b1',
+                             f"-r{reject}", f"-i{invalid}")
+        res = cli_runner.invoke(mongo, args)
+        assert res.exit_code == 0
+
     @pytest.mark.parametrize('path_or_name', [EXAMPLE_MONGO_MODEL])
     @pytest.mark.parametrize('pipeline', [(
         '{ "$match": { "number": { "$gt": 100 } } }',
@@ -81,6 +108,31 @@ class TestCLIDbMongo:
         res = cli_runner.invoke(mongo, args)
         assert res.exit_code == 0
 
+    @pytest.mark.parametrize('path_or_name', [EXAMPLE_MONGO_MODEL])
+    @pytest.mark.parametrize('dry', ['', '--dry-run'])
+    def test_mongo_ensure_indexes(self, cli_runner, path_or_name, dry):
+        args = make_cli_args('ensure-indexes', path_or_name, dry)
+        res = cli_runner.invoke(mongo, args)
+        assert res.exit_code == 0
+
+    @pytest.mark.parametrize('path_or_name', [EXAMPLE_MONGO_MODEL])
+    @pytest.mark.parametrize('command,args', [
+        ('find', ['{ "text": "a112" }', '-l10']),
+        ('update', ['{ "text": "a112" }', '{ "$set": { "number": 112 } }']),
+        ('aggregate', ['{ "$match": { "text": "a112" } }'])
+    ])
+    def test_mongo_explain(self, cli_runner, path_or_name, command, args):
+        args = make_cli_args(command, path_or_name, *args, '--explain')
+        res = cli_runner.invoke(mongo, args)
+        assert res.exit_code == 0
+
+    @pytest.mark.parametrize('path_or_name', ['', EXAMPLE_MONGO_MODEL])
+    @pytest.mark.parametrize('source', ['profile', 'currentop'])
+    def test_mongo_slow_ops(self, cli_runner, path_or_name, source):
+        args = make_cli_args('slow-ops', path_or_name, f"-S{source}", '-m0')
+        res = cli_runner.invoke(mongo, args)
+        assert res.exit_code == 0
+
     @pytest.mark.parametrize('path_or_name', [EXAMPLE_MONGO_MODEL])
     @pytest.mark.parametrize('prompt', ['n'])
     def test_mongo_drop(self, cli_runner, path_or_name, prompt):
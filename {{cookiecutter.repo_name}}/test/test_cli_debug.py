@@ -0,0 +1,21 @@
+"""Test cases for the debug module of the command-line interface."""
+import json
+import sys
+import pytest
+from {{ cookiecutter.repo_name }}.cli.debug import debug
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="'-X importtime' requires Python 3.7+")
+@pytest.mark.parametrize('fmt', [ 'text', 'json' ])
+def test_startup_profile(cli_runner, fmt):
+    args = [ 'startup-profile', '--no-components', '-f', fmt, '-d', '1' ]
+    res = cli_runner.invoke(debug, args)
+    assert res.exit_code == 0
+    if fmt == 'json':
+        profile = json.loads(res.output)
+        assert 'import' in profile['phases']
+        assert all(
+            not c['children'] for n in profile['imports'] for c in n['children']
+        )
+    else:
+        assert 'Imports [ms]' in res.output
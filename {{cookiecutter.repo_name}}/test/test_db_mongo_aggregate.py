@@ -0,0 +1,83 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.aggregate`."""
+import io
+import json
+import pytest
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.aggregate import into_stage, make_options
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.aggregate import run_aggregation
+from .utils import FakeCollection
+
+
+@pytest.fixture
+def collection():
+    """Fixture: fake collection."""
+    return FakeCollection([ { '_id': i, 'n': i * 2 } for i in range(25) ])
+
+
+@pytest.mark.parametrize('into,mode,kwds,expected', [
+    ('target', 'out', {}, { '$out': 'target' }),
+    ('db.target', 'out', {}, { '$out': { 'db': 'db', 'coll': 'target' } }),
+    ('target', 'merge', { 'on': 'n' }, { '$merge': {
+        'into': 'target', 'on': 'n', 'whenMatched': 'replace', 'whenNotMatched': 'insert'
+    } }),
+    ('db.target', 'merge', { 'when_matched': 'keepExisting' }, { '$merge': {
+        'into': { 'db': 'db', 'coll': 'target' },
+        'whenMatched': 'keepExisting', 'whenNotMatched': 'insert'
+    } })
+])
+def test_into_stage(into, mode, kwds, expected):
+    assert into_stage(into, mode, **kwds) == expected
+
+def test_into_stage_unknown_mode():
+    with pytest.raises(ValueError):
+        into_stage('target', 'replace')
+
+@pytest.mark.parametrize('kwds,expected', [
+    ({}, { 'allowDiskUse': True }),
+    ({ 'allow_disk_use': False, 'batch_size': 10, 'max_time_ms': 1000 },
+     { 'allowDiskUse': False, 'batchSize': 10, 'maxTimeMS': 1000 }),
+    ({ 'collation': { 'locale': 'pl' } },
+     { 'allowDiskUse': True, 'collation': { 'locale': 'pl' } })
+])
+def test_make_options(kwds, expected):
+    assert make_options(**kwds) == expected
+
+@pytest.mark.parametrize('batch_size', [ None, 7 ])
+def test_run_aggregation_stream(collection, batch_size):
+    stream = io.BytesIO()
+    pipeline = [ { '$match': {} } ]
+    res = run_aggregation(collection, pipeline, stream=stream, batch_size=batch_size)
+    assert res['n_results'] == len(collection.docs)
+    assert 'server' not in res
+    assert collection.calls[0]['pipeline'] == pipeline
+    assert collection.calls[0]['allowDiskUse'] is True
+    assert collection.calls[0].get('batchSize') == batch_size
+    assert collection.cursors[0].closed
+    lines = stream.getvalue().decode('utf-8').split("\n")
+    assert [ json.loads(l) for l in lines[:-1] ] == collection.docs
+
+@pytest.mark.parametrize('into', [ 'target', 'other.target' ])
+def test_run_aggregation_into(collection, into):
+    pipeline = [ { '$match': {} } ]
+    res = run_aggregation(collection, pipeline, into=into, into_mode='out')
+    assert collection.calls[0]['pipeline'] == [ *pipeline, into_stage(into, 'out') ]
+    assert res['into'] == into
+    assert res['into_count'] == 0
+
+def test_run_aggregation_stats(collection):
+    collection.database.response = {
+        'stages': [
+            { '$cursor': { 'executionStats': { 'nReturned': 25, 'totalDocsExamined': 25 } },
+              'nReturned': 25 },
+            { '$group': {}, 'nReturned': 5 }
+        ]
+    }
+    res = run_aggregation(collection, [ { '$group': { '_id': '$n' } } ],
+                          batch_size=10, stats=True)
+    assert res['n_results'] == len(collection.docs)
+    name, cmd, kwds = collection.database.commands[0]
+    assert name == 'explain'
+    assert kwds == { 'verbosity': 'executionStats' }
+    assert 'batchSize' not in cmd
+    assert res['server']['nReturned'] == 25
+    assert res['server']['totalDocsExamined'] == 25
+    assert [ s['stage'] for s in res['server']['stages'] ] == [ '$cursor', '$group' ]
@@ -0,0 +1,46 @@
+"""Test cases for adaptive batching of *MongoDB* writes."""
+import pytest
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.batching import AdaptiveBatchController
+
+
+class TestAdaptiveBatchController:
+    """Test cases for `AdaptiveBatchController`."""
+
+    def test_add(self):
+        ctl = AdaptiveBatchController(min_batch_size=10)
+        n_bytes = ctl.add({ 'x': 'a'*100 })
+        assert n_bytes > 100
+        assert ctl.pending_bytes == n_bytes
+        assert ctl.take() == n_bytes
+        assert ctl.pending_bytes == 0
+
+    @pytest.mark.parametrize('docs_per_sec,exp', [
+        (1e3, 1000),
+        (1e7, 100000),
+        (10, 10)
+    ])
+    def test_latency(self, docs_per_sec, exp):
+        ctl = AdaptiveBatchController(
+            batch_size=100,
+            target_flush_time=1,
+            min_batch_size=10,
+            max_step=None,
+            smoothing=1
+        )
+        ctl.record(100, 100, 100 / docs_per_sec)
+        assert ctl.batch_size == exp
+        assert ctl.stats['n_resizes'] == 1
+
+    def test_bytes(self):
+        ctl = AdaptiveBatchController(
+            batch_size=100,
+            max_batch_bytes=10000,
+            min_batch_size=1,
+            max_step=2
+        )
+        for _ in range(10):
+            ctl.record(100, 100*1000, .001)
+        assert ctl.batch_size == 10
+        for _ in range(11):
+            ctl.add({ 'x': 'a'*1000 })
+        assert ctl.should_flush(5)
@@ -0,0 +1,112 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.bulk`."""
+import io
+import json
+import gzip
+import pytest
+from bson import ObjectId
+from pymongo import UpdateOne, UpdateMany
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.bulk import open_input, make_update_op
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.bulk import read_ops, iter_batches
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.bulk import write_batch, bulk_update
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.bulk import ExtendedJSONEncoder
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.utils import DeadLetterWriter
+from .utils import FakeCollection
+
+
+def make_lines(n, n_failed=0, upsert=False):
+    lines = []
+    for i in range(n):
+        flt = { '_id': { '$oid': str(ObjectId()) } }
+        if i < n_failed:
+            flt['fail'] = True
+        lines.append(json.dumps({
+            'filter': flt,
+            'update': { '$set': { 'n': i } },
+            'upsert': upsert
+        }))
+    return lines
+
+
+@pytest.mark.parametrize('record,multiple,expected', [
+    ({ 'filter': { 'a': 1 }, 'update': { '$set': { 'b': 1 } } }, False, UpdateOne),
+    ({ 'filter': { 'a': 1 }, 'update': { '$set': { 'b': 1 } } }, True, UpdateMany),
+    ({ 'filter': { 'a': 1 }, 'update': { '$set': { 'b': 1 } }, 'multi': True },
+     False, UpdateMany)
+])
+def test_make_update_op(record, multiple, expected):
+    op = make_update_op(record, multiple=multiple)
+    assert isinstance(op, expected)
+    assert op._filter == record['filter']
+    assert op._upsert is False
+
+@pytest.mark.parametrize('record', [
+    [],
+    { 'filter': { 'a': 1 } },
+    { 'filter': 'x', 'update': { '$set': { 'b': 1 } } }
+])
+def test_make_update_op_invalid(record):
+    with pytest.raises(ValueError):
+        make_update_op(record)
+
+def test_read_ops():
+    invalid = []
+    lines = [ *make_lines(3), '', '{ "filter": {} ', '{ "update": {} }' ]
+    ops = list(read_ops(lines, on_invalid=lambda *args: invalid.append(args)))
+    assert len(ops) == 3
+    assert isinstance(ops[0]._filter['_id'], ObjectId)
+    assert [ i for i, *_ in invalid ] == [ 5, 6 ]
+
+@pytest.mark.parametrize('n,batch_size', [ (0, 3), (7, 3), (9, 3) ])
+def test_iter_batches(n, batch_size):
+    batches = list(iter_batches(range(n), batch_size))
+    assert [ x for b in batches for x in b ] == list(range(n))
+    assert all(len(b) <= batch_size for b in batches)
+
+def test_open_input(tmpdir):
+    path = str(tmpdir.join('ops.jl.gz'))
+    with gzip.open(path, 'wt') as f:
+        f.write("\n".join(make_lines(3)))
+    with open_input(path) as f:
+        assert len(list(read_ops(f))) == 3
+
+def test_write_batch():
+    ops = list(read_ops(make_lines(5, n_failed=2)))
+    res = write_batch(FakeCollection(), ops)
+    assert res['matched'] == 3
+    assert [ op for op, _ in res['failed'] ] == ops[:2]
+
+def test_write_batch_connection_error():
+    ops = list(read_ops(make_lines(5)))
+    res = write_batch(FakeCollection(down=True), ops)
+    assert res['matched'] == 0
+    assert len(res['failed']) == 5
+
+@pytest.mark.parametrize('workers', [ 1, 3 ])
+@pytest.mark.parametrize('batch_size', [ 1, 4, 100 ])
+def test_bulk_update(tmpdir, workers, batch_size):
+    collection = FakeCollection()
+    lines = [ *make_lines(20, n_failed=3), *make_lines(5, upsert=True), 'invalid' ]
+    reject = DeadLetterWriter(str(tmpdir.join('reject.jl')), encoder=ExtendedJSONEncoder)
+    invalid = io.StringIO()
+    progress = []
+    res = bulk_update(collection, lines, batch_size=batch_size, workers=workers,
+                      reject=reject, invalid=invalid, callback=progress.append)
+    reject.close()
+    assert res['n_ops'] == 25
+    assert res['batches'] == len(collection.batches) == len(progress)
+    assert all(len(b) <= batch_size for b in collection.batches)
+    assert res['matched'] == res['modified'] == 17
+    assert res['upserted'] == 5
+    assert res['failed'] == 3
+    assert res['invalid'] == 1
+    with open(reject.path) as f:
+        records = [ json.loads(l) for l in f ]
+    assert len(records) == 3
+    assert all(r['multi'] is False for r in records)
+    assert invalid.getvalue() == "invalid\n"
+    # Rejected operations may be fed back as input
+    failed = [ json.dumps(r) for r in records ]
+    ops = list(read_ops(failed))
+    assert len(ops) == 3
+    assert all(op._filter['fail'] for op in ops)
+    assert all(isinstance(op._filter['_id'], ObjectId) for op in ops)
@@ -0,0 +1,103 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.explain`."""
+import pytest
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.explain import find_command, update_command
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.explain import aggregate_command, explain
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.explain import summarize, find_execution_stats
+from .utils import FakeCollection, FakeDatabase
+
+IXSCAN_PLAN = {
+    'stage': 'LIMIT',
+    'inputStage': {
+        'stage': 'FETCH',
+        'inputStage': { 'stage': 'IXSCAN', 'indexName': 'text_1' }
+    }
+}
+EXECUTION_STATS = {
+    'nReturned': 5,
+    'executionTimeMillis': 3,
+    'totalKeysExamined': 5,
+    'totalDocsExamined': 5
+}
+
+
+def make_collection():
+    """Make fake collection with a database explaining commands."""
+    database = FakeDatabase(response={ 'queryPlanner': { 'winningPlan': IXSCAN_PLAN } })
+    return FakeCollection(database=database)
+
+
+def test_commands():
+    coll = make_collection()
+    assert find_command(coll, { 'a': 1 }) == { 'find': 'coll', 'filter': { 'a': 1 } }
+    assert find_command(coll, None, { 'a': 1 }, [ ('a', -1) ], skip=5, limit=10) == {
+        'find': 'coll', 'filter': {}, 'projection': { 'a': 1 },
+        'sort': { 'a': -1 }, 'skip': 5, 'limit': 10
+    }
+    assert update_command(coll, { 'a': 1 }, { '$set': { 'b': 1 } }, upsert=True) == {
+        'update': 'coll',
+        'updates': [ { 'q': { 'a': 1 }, 'u': { '$set': { 'b': 1 } },
+                       'upsert': True, 'multi': False } ]
+    }
+    assert aggregate_command(coll, [], allowDiskUse=True, batchSize=10) == {
+        'aggregate': 'coll', 'pipeline': [], 'cursor': {}, 'allowDiskUse': True
+    }
+
+def test_explain():
+    coll = make_collection()
+    cmd = find_command(coll, { 'a': 1 })
+    explain(coll, cmd)
+    assert coll.database.commands[-1] == ('explain', cmd, { 'verbosity': 'executionStats' })
+
+@pytest.mark.parametrize('res', [
+    # Classic engine
+    { 'queryPlanner': { 'winningPlan': IXSCAN_PLAN }, 'executionStats': EXECUTION_STATS },
+    # Slot-based engine
+    { 'queryPlanner': { 'winningPlan': { 'queryPlan': IXSCAN_PLAN, 'slotBasedPlan': {} } },
+      'executionStats': EXECUTION_STATS },
+    # Sharded cluster
+    { 'queryPlanner': { 'winningPlan': { 'stage': 'SINGLE_SHARD', 'shards': [
+        { 'shardName': 's0', 'winningPlan': IXSCAN_PLAN }
+      ] } },
+      'executionStats': EXECUTION_STATS }
+])
+def test_summarize(res):
+    summary = summarize(res)
+    assert summary == {
+        'winningPlan': "LIMIT <- FETCH <- IXSCAN",
+        'indexes': [ 'text_1' ],
+        'collectionScan': False,
+        **EXECUTION_STATS
+    }
+
+def test_summarize_aggregate():
+    res = {
+        'stages': [
+            { '$cursor': {
+                'queryPlanner': { 'winningPlan': { 'stage': 'COLLSCAN' } },
+                'executionStats': EXECUTION_STATS
+            }, 'nReturned': 5, 'executionTimeMillisEstimate': 2 },
+            { '$group': {}, 'nReturned': 2, 'executionTimeMillisEstimate': 3 }
+        ]
+    }
+    summary = summarize(res)
+    assert summary['winningPlan'] == 'COLLSCAN'
+    assert summary['collectionScan'] is True
+    assert summary['indexes'] == []
+    assert summary['totalDocsExamined'] == 5
+    assert summary['stages'] == [
+        { 'stage': '$cursor', 'nReturned': 5, 'executionTimeMillisEstimate': 2 },
+        { 'stage': '$group', 'nReturned': 2, 'executionTimeMillisEstimate': 3 }
+    ]
+
+def test_summarize_empty():
+    assert summarize({})['winningPlan'] is None
+
+@pytest.mark.parametrize('res,expected', [
+    ({ 'executionStats': { 'nReturned': 1 } }, { 'nReturned': 1 }),
+    ({ 'stages': [ { '$cursor': { 'executionStats': { 'nReturned': 2 } } } ] },
+     { 'nReturned': 2 }),
+    ({ 'shards': { 's0': { 'executionStats': { 'nReturned': 3 } } } }, { 'nReturned': 3 }),
+    ({ 'stages': [ { '$match': {} } ] }, {})
+])
+def test_find_execution_stats(res, expected):
+    assert find_execution_stats(res) == expected
@@ -0,0 +1,62 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.export`."""
+import io
+import bz2
+import gzip
+import lzma
+import json
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.export import open_output, export_collection
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.export import infer_compression
+from .utils import FakeCollection
+
+
+@pytest.fixture
+def collection():
+    """Fixture: fake collection."""
+    return FakeCollection([
+        { '_id': ObjectId(), 'n': i, 'ts': datetime(2000, 1, 1, i % 24), 'text': "zażółć" }
+        for i in range(25)
+    ])
+
+
+@pytest.mark.parametrize('path,expected', [
+    ('data.jl', None),
+    ('data.jl.gz', 'gzip'),
+    ('data.jl.xz', 'xz'),
+    (None, None)
+])
+def test_infer_compression(path, expected):
+    assert infer_compression(path) == expected
+
+@pytest.mark.parametrize('batch_size', [ 1, 7, 100 ])
+@pytest.mark.parametrize('skip,limit', [ (0, 0), (5, 10) ])
+def test_export_collection(collection, batch_size, skip, limit):
+    stream = io.BytesIO()
+    n = export_collection(collection, stream, { 'n': { '$gt': 1 } }, { 'n': 1 },
+                          batch_size=batch_size, skip=skip, limit=limit)
+    docs = collection.docs[skip:skip+limit] if limit else collection.docs
+    assert n == len(docs)
+    assert collection.calls[0]['batch_size'] == batch_size
+    lines = stream.getvalue().decode('utf-8').split("\n")
+    assert lines[-1] == ''
+    assert [ json.loads(l) for l in lines[:-1] ] == [
+        { **d, '_id': str(d['_id']), 'ts': d['ts'].isoformat() } for d in docs
+    ]
+
+def test_export_collection_extended_json(collection):
+    stream = io.BytesIO()
+    export_collection(collection, stream, mode='relaxed')
+    doc = json.loads(stream.getvalue().decode('utf-8').split("\n")[0])
+    assert doc['_id'] == { '$oid': str(collection.docs[0]['_id']) }
+    assert '$date' in doc['ts']
+
+@pytest.mark.parametrize('compression', [ None, 'gzip', 'bz2', 'xz' ])
+def test_open_output(collection, tmpdir, compression):
+    path = str(tmpdir.join('export.jl'))
+    with open_output(path, compression=compression) as stream:
+        n = export_collection(collection, stream)
+    opener = { None: open, 'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open }[compression]
+    with opener(path, 'rt', encoding='utf-8') as f:
+        assert sum(1 for _ in f) == n == 25
@@ -0,0 +1,94 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.indexes`."""
+import pytest
+from mongoengine import Document, StringField, IntField
+from {{ cookiecutter.repo_name }}.persistence.db.mongo import MongoPersistence
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.mixins import BaseDocumentMixin
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.indexes import get_index_models, ensure_indexes
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.indexes import get_db_fields, find_index
+from {{ cookiecutter.repo_name }}.exceptions import MissingIndexError
+from .utils import FakeCollection
+
+
+class IndexedModel(BaseDocumentMixin, Document):
+    """ODM model with declared indexes."""
+    title = StringField()
+    year = IntField(db_field='y')
+    code = StringField(unique=True)
+    meta = {
+        'collection': 'test_indexed_model',
+        'indexes': [ 'title', { 'fields': [ '-year', 'title' ], 'name': 'year_title' } ],
+        'auto_create_index': False
+    }
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    """Fixture: fake collection of the indexed model."""
+    collection = FakeCollection()
+    monkeypatch.setattr(IndexedModel, '_get_collection', lambda: collection)
+    return collection
+
+
+def test_get_index_models():
+    indexes = [ i.document for i in get_index_models(IndexedModel) ]
+    assert [ list(i['key'].items()) for i in indexes ] == [
+        [ ('title', 1) ], [ ('y', -1), ('title', 1) ], [ ('code', 1) ]
+    ]
+    assert indexes[1]['name'] == 'year_title'
+    assert indexes[2]['unique'] is True
+
+@pytest.mark.parametrize('background', [ True, False ])
+def test_ensure_indexes(collection, background):
+    names = ensure_indexes(IndexedModel, background=background)
+    assert names == [ 'title_1', 'year_title', 'code_1' ]
+    assert all(i.document.get('background', False) is background
+               for i in collection.created)
+
+def test_get_db_fields():
+    assert get_db_fields(IndexedModel, [ 'title', 'year', 'other' ]) == \
+        [ 'title', 'y', 'other' ]
+
+@pytest.mark.parametrize('fields,expected', [
+    ([ '_id', 'x' ], '_id_'),
+    ([ 'title' ], 'title_1'),
+    ([ 'title', 'y' ], 'y_-1_title_1'),
+    ([ 'y' ], 'y_-1_title_1'),
+    ([ 'code' ], None)
+])
+def test_find_index(fields, expected):
+    index_info = {
+        '_id_': { 'key': [ ('_id', 1) ] },
+        'title_1': { 'key': [ ('title', 1) ] },
+        'y_-1_title_1': { 'key': [ ('y', -1), ('title', 1) ] },
+        'title_1_code_1': { 'key': [ ('z', 1), ('code', 1) ] }
+    }
+    assert find_index(fields, index_info) == expected
+
+
+class TestMongoPersistenceCheckIndexes:
+    """Test cases for checking indexes of update queries in `MongoPersistence`."""
+
+    @pytest.mark.parametrize('query,indexed', [
+        ('title', False),
+        ('year', True),
+        (lambda doc: { 'title': doc['title'] }, None)
+    ])
+    def test_check_query_index(self, collection, query, indexed):
+        collection.index_info['y_-1'] = { 'key': [ ('y', -1) ] }
+        p = MongoPersistence(model=IndexedModel, query=query)
+        index = p.check_query_index()
+        assert (index is not None) is bool(indexed)
+
+    def test_prepare_fail(self, collection):
+        p = MongoPersistence(model=IndexedModel, query='title', check_indexes='fail')
+        with pytest.raises(MissingIndexError) as exc:
+            p.prepare()
+        assert exc.value.fields == [ 'title' ]
+        collection.index_info['title_1'] = { 'key': [ ('title', 1) ] }
+        p.prepare()
+
+    @pytest.mark.parametrize('check_indexes,update', [ ('ignore', True), ('fail', False) ])
+    def test_prepare_skip(self, collection, check_indexes, update):
+        p = MongoPersistence(model=IndexedModel, query='title',
+                             check_indexes=check_indexes, update=update)
+        p.prepare()
@@ -0,0 +1,129 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.partition`."""
+import os
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from mongoengine import Document, IntField
+from {{ cookiecutter.repo_name }}.persistence.db.mongo import partition
+from .utils import FakeCollection
+
+
+class PartitionModel(Document):
+    """ODM model (defined at module level so it may be pickled)."""
+    n = IntField()
+    meta = {
+        'collection': 'test_mongo_partition'
+    }
+
+
+def partition_kwds(model, lower, upper, **kwds):
+    """Partition function returning its arguments."""
+    return lower, upper, kwds
+
+
+@pytest.fixture(scope='module')
+def partition_model():
+    """Fixture: model with data."""
+    PartitionModel.drop_collection()
+    PartitionModel._get_collection().insert_many([ { 'n': i } for i in range(1000) ])
+    yield PartitionModel
+    PartitionModel.drop_collection()
+
+
+@pytest.mark.parametrize('lower,upper,query,expected', [
+    (None, None, None, {}),
+    (None, None, { 'x': 1 }, { 'x': 1 }),
+    (1, None, None, { '_id': { '$gte': 1 } }),
+    (1, 5, { 'x': 1 }, { '$and': [ { 'x': 1 }, { '_id': { '$gte': 1, '$lt': 5 } } ] })
+])
+def test_range_query(lower, upper, query, expected):
+    assert partition.range_query(lower, upper, query) == expected
+
+def test_make_ranges():
+    assert partition.make_ranges([]) == [ (None, None) ]
+    assert partition.make_ranges([ 1, 1, 5 ]) == [ (None, 1), (1, 5), (5, None) ]
+
+@pytest.mark.parametrize('n_values,n_partitions', [ (0, 4), (3, 4), (100, 4), (100, 1) ])
+def test_select_quantiles(n_values, n_partitions):
+    values = list(range(n_values))
+    quantiles = partition.select_quantiles(values, n_partitions)
+    assert quantiles == sorted(quantiles)
+    assert len(quantiles) == (n_partitions - 1 if n_values else 0)
+    if n_values >= n_partitions:
+        assert len(set(quantiles)) == n_partitions - 1
+
+def test_interpolate_boundaries():
+    def boundaries(ids):
+        collection = FakeCollection([ { '_id': i } for i in ids ])
+        return partition.interpolate_boundaries(collection, 4)
+    ids = [ ObjectId.from_datetime(datetime(2000, 1, 1)),
+            ObjectId.from_datetime(datetime(2000, 1, 5)) ]
+    assert [ b.generation_time.day for b in boundaries(ids) ] == [ 2, 3, 4 ]
+    assert boundaries([ 0, 100 ]) == [ 25, 50, 75 ]
+    assert boundaries([]) == []
+    with pytest.raises(TypeError):
+        boundaries([ 'a', 'b' ])
+
+def test_dumps_ranges():
+    ranges = [ (None, ObjectId()), (ObjectId(), None) ]
+    assert partition.loads_ranges(partition.dumps_ranges(ranges)) == ranges
+
+@pytest.mark.parametrize('path,expected', [
+    ('out/export-{n}.jl', 'out/export-0003.jl'),
+    ('out/export.jl.gz', 'out/export-0003.jl.gz'),
+    ('out/export', 'out/export-0003')
+])
+def test_shard_path(path, expected):
+    assert partition.shard_path(path, 3) == expected
+
+def test_map_partitions():
+    ranges = [ (None, 1), (1, None) ]
+    # Lists of the same length as ranges are passed whole to every range
+    res = partition.map_partitions(partition_kwds, 'model', ranges, workers=1,
+                                   per_range=[ { 'path': 'a' }, { 'path': 'b' } ],
+                                   values=[ 1, 2 ])
+    assert res == [
+        (None, 1, { 'path': 'a', 'values': [ 1, 2 ] }),
+        (1, None, { 'path': 'b', 'values': [ 1, 2 ] })
+    ]
+    assert partition.map_partitions(partition_kwds, 'model', ranges, workers=1) == [
+        (None, 1, {}),
+        (1, None, {})
+    ]
+    with pytest.raises(ValueError):
+        partition.map_partitions(partition_kwds, 'model', ranges, per_range=[ {} ])
+
+
+@pytest.mark.mongo
+class TestPartitionedScans:
+    """Test cases for partitioned exports and scans."""
+
+    @pytest.mark.parametrize('method', [ 'sample', 'interpolate' ])
+    def test_split_ranges(self, partition_model, method):
+        collection = partition_model._get_collection()
+        ranges = partition.split_ranges(collection, 4, method)
+        assert len(ranges) == 4
+        counts = [
+            collection.count_documents(partition.range_query(lo, hi))
+            for lo, hi in ranges
+        ]
+        assert sum(counts) == 1000
+
+    @pytest.mark.parametrize('workers', [ 1, 2 ])
+    def test_export_partitioned(self, partition_model, tmpdir, workers):
+        path = str(tmpdir.join('export-{n}.jl'))
+        res = partition.export_partitioned(partition_model, path, 4, workers=workers,
+                                           query={ 'n': { '$lt': 500 } })
+        assert sum(r['count'] for r in res) == 500
+        assert all(os.path.exists(r['path']) for r in res)
+
+    @pytest.mark.parametrize('workers', [ 1, 2 ])
+    def test_scan_partitioned(self, partition_model, workers):
+        res = partition.scan_partitioned(partition_model, count_docs, 4, workers=workers,
+                                         projection={ 'n': 1 })
+        assert sum(res) == 1000
+
+
+def count_docs(docs):
+    """Count documents."""
+    return sum(1 for _ in docs)
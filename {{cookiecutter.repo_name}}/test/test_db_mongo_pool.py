@@ -0,0 +1,42 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.pool`."""
+from pymongo import MongoClient
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.pool import PoolMonitor, get_pool_options
+
+
+class TestPoolMonitor:
+    """Test cases for `PoolMonitor`."""
+
+    def test_stats(self):
+        monitor = PoolMonitor()
+        monitor.pool_created(None)
+        for _ in range(3):
+            monitor.connection_created(None)
+            monitor.connection_checked_out(None)
+        monitor.connection_checked_in(None)
+        monitor.connection_closed(None)
+        monitor.connection_check_out_failed(None)
+        stats = monitor.stats
+        assert stats['open'] == 2
+        assert stats['checked_out'] == 2
+        assert stats['checkouts'] == 3
+        assert stats['checkout_failures'] == 1
+        assert stats['pools'] == 1
+
+    def test_reset_after_fork(self):
+        monitor = PoolMonitor()
+        monitor.connection_created(None)
+        monitor.pid = -1
+        assert monitor.stats['created'] == 0
+        monitor.connection_created(None)
+        assert monitor.stats['created'] == 1
+
+
+def test_get_pool_options():
+    client = MongoClient(connect=False, maxPoolSize=7, minPoolSize=2,
+                         waitQueueTimeoutMS=1500, event_listeners=[ PoolMonitor() ])
+    assert get_pool_options(client) == {
+        'maxPoolSize': 7,
+        'minPoolSize': 2,
+        'waitQueueTimeoutMS': 1500
+    }
+    client.close()
@@ -0,0 +1,81 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.mongo.profiling`."""
+import json
+import pytest
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.profiling import query_shape, get_command_shape
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.profiling import read_profile, read_current_ops
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.profiling import rank_ops
+from .utils import FakeDatabase
+
+
+def make_op(ns='test.coll', op='query', millis=100, text='a', plan='COLLSCAN'):
+    return {
+        'ns': ns,
+        'op': op,
+        'millis': millis,
+        'microsecs_running': millis * 1000,
+        'planSummary': plan,
+        'command': { 'find': ns.split('.')[-1], 'filter': { 'text': text } },
+        'docsExamined': 1000,
+        'keysExamined': 0,
+        'nreturned': 1
+    }
+
+
+def make_database(ops):
+    """Make fake database with a profiler collection and `currentOp` command."""
+    db = FakeDatabase('test')
+    db['system.profile'].docs = ops
+    db.client.admin.response = { 'inprog': ops }
+    return db
+
+
+@pytest.mark.parametrize('obj,expected', [
+    ({ 'a': 1 }, { 'a': '?' }),
+    ({ 'a': { '$in': [ 1, 2 ] }, 'b': 'x' }, { 'a': { '$in': '?' }, 'b': '?' }),
+    ({ '$or': [ { 'a': 1 }, { 'b': 2 } ] }, { '$or': [ { 'a': '?' }, { 'b': '?' } ] })
+])
+def test_query_shape(obj, expected):
+    assert query_shape(obj) == expected
+
+def test_get_command_shape():
+    shape = get_command_shape({ 'find': 'coll', 'filter': { 'a': 1 }, 'limit': 10 })
+    assert json.loads(shape) == { 'filter': { 'a': '?' } }
+    assert shape == get_command_shape({ 'find': 'coll', 'filter': { 'a': 2 } })
+    assert get_command_shape({ 'find': 'coll' }) is None
+
+def test_read_profile():
+    db = make_database([ make_op(), make_op(millis=200) ])
+    ops = read_profile(db, min_ms=50, namespaces=[ 'test.coll' ])
+    assert [ op['millis'] for op in ops ] == [ 100, 200 ]
+    assert db['system.profile'].calls[0]['query'] == {
+        'millis': { '$gte': 50 },
+        'ns': { '$in': [ 'test.coll' ] }
+    }
+
+def test_read_current_ops():
+    db = make_database([ make_op(millis=150) ])
+    ops = read_current_ops(db, min_ms=50)
+    assert ops[0]['millis'] == 150
+    name, value, fields = db.client.admin.commands[0]
+    assert (name, value) == ('currentOp', 1)
+    assert fields == {
+        'active': True,
+        'ns': { '$regex': r'^test\.' },
+        'microsecs_running': { '$gte': 50000 }
+    }
+
+def test_rank_ops():
+    db = make_database([
+        make_op(millis=100, text='a'),
+        make_op(millis=300, text='b'),
+        make_op(millis=500, plan='IXSCAN { text: 1 }'),
+        make_op(ns='test.other', millis=50)
+    ])
+    ranked = rank_ops(read_profile(db), models={ 'test.coll': 'Model' })
+    assert [ (g['model'], g['count'], g['total_ms']) for g in ranked ] == [
+        ('Model', 1, 500), ('Model', 2, 400), ('test.other', 1, 50)
+    ]
+    assert ranked[1]['max_ms'] == 300
+    assert ranked[1]['mean_ms'] == 200
+    assert ranked[1]['docs_examined'] == 2000
+    assert len(rank_ops(read_profile(db), top=1)) == 1
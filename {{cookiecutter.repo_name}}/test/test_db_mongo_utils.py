@@ -0,0 +1,94 @@
+"""Test cases for *MongoDB* related utilities."""
+import pytest
+from pymongo import UpdateOne, UpdateMany, InsertOne
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.utils import freeze, partition_ops
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.utils import coalesce_updates
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.utils import content_hash, query_factory
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.utils import op_to_record
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.bulk import make_update_op
+
+
+@pytest.mark.parametrize('x,y', [
+    ({ 'a': 1, 'b': [ 1, 2 ] }, { 'b': [ 1, 2 ], 'a': 1 }),
+    ({ 'a': { 'b': { 1, 2 } } }, { 'a': { 'b': { 2, 1 } } }),
+    ('abc', 'abc')
+])
+def test_freeze(x, y):
+    """Test cases for `freeze`."""
+    assert hash(freeze(x)) == hash(freeze(y))
+
+
+@pytest.mark.parametrize('n', [ 1, 3, 8 ])
+def test_partition_ops(n):
+    """Test cases for `partition_ops`."""
+    ops = [
+        UpdateOne({ 'k': i % 5 }, { '$set': { 'v': i } }) for i in range(50)
+    ] + [ InsertOne({ 'v': i }) for i in range(10) ]
+    parts = partition_ops(ops, n)
+    assert len(parts) <= n
+    assert sorted(map(id, ops)) == sorted(id(op) for p in parts for op in p)
+    for p in parts:
+        # Order of updates of the same document is preserved
+        idx = [ ops.index(op) for op in p ]
+        assert idx == sorted(idx)
+    for k in range(5):
+        assert sum(any(getattr(op, '_filter', None) == { 'k': k } for op in p) for p in parts) == 1
+
+
+@pytest.mark.parametrize('updates,exp', [
+    ([
+        ({ 'k': 1 }, { '$set': { 'a': 1, 'b': 1 } }),
+        ({ 'k': 2 }, { '$set': { 'a': 2 } }),
+        ({ 'k': 1 }, { '$set': { 'a': 3 } })
+    ], [
+        ({ 'k': 1 }, { '$set': { 'a': 3, 'b': 1 } }),
+        ({ 'k': 2 }, { '$set': { 'a': 2 } })
+    ]),
+    ([
+        ({ 'k': 1 }, { '$set': { 'a': 1 } }),
+        ({ 'k': 1 }, { '$push': { 'l': 1 } }),
+        ({ 'k': 1 }, { '$set': { 'a': 2 } }),
+        ({ 'k': 1 }, { '$set': { 'b': 2 } })
+    ], [
+        ({ 'k': 1 }, { '$set': { 'a': 1 } }),
+        ({ 'k': 1 }, { '$push': { 'l': 1 } }),
+        ({ 'k': 1 }, { '$set': { 'a': 2, 'b': 2 } })
+    ]),
+    ([
+        ({ 'k': 1 }, { '$set': { 'a.b': 1, 'c': 1 } }),
+        ({ 'k': 1 }, { '$set': { 'a': { 'x': 1 } } }),
+        ({ 'k': 1 }, { '$set': { 'a.y': 1 } })
+    ], [
+        ({ 'k': 1 }, { '$set': { 'c': 1, 'a': { 'x': 1 } } }),
+        ({ 'k': 1 }, { '$set': { 'a.y': 1 } })
+    ])
+])
+def test_coalesce_updates(updates, exp):
+    """Test cases for `coalesce_updates`."""
+    assert coalesce_updates(updates) == exp
+
+
+def test_query_factory():
+    """Test cases for `query_factory`."""
+    query = query_factory([ 'a', 'b' ])
+    doc = { 'a': 1, 'b': 2, 'c': 3 }
+    assert query.fields == [ 'a', 'b' ]
+    assert query(doc) == { 'a': 1, 'b': 2 }
+    assert doc == { 'c': 3 }
+
+
+def test_content_hash():
+    """Test cases for `content_hash`."""
+    h = content_hash({ 'a': 1, 'b': [ 1, 2 ] })
+    assert h == content_hash({ 'b': [ 1, 2 ], 'a': 1, 'h': h }, exclude=('h',))
+    assert h != content_hash({ 'a': 2, 'b': [ 1, 2 ] })
+
+@pytest.mark.parametrize('op', [
+    UpdateOne({ 'a': 1 }, { '$set': { 'b': 1 } }, upsert=True),
+    UpdateMany({ 'a': 1 }, { '$set': { 'b': 1 } }, upsert=False)
+])
+def test_op_to_record(op):
+    """Test cases for `op_to_record`."""
+    record = op_to_record(op)
+    assert record['multi'] is isinstance(op, UpdateMany)
+    assert make_update_op(record) == op
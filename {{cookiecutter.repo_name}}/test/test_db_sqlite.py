@@ -0,0 +1,85 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.db.sqlite`."""
+import os
+import pytest
+from {{ cookiecutter.repo_name }}.config import ROOT_PATH
+from {{ cookiecutter.repo_name }}.persistence.db.sqlite import SQLitePersistence
+from {{ cookiecutter.repo_name }}.persistence.importers import JSONLinesImporter
+
+
+@pytest.fixture
+def sqlite_persistence(tmpdir):
+    """Fixture: SQLite persistence factory."""
+    def make_persistence(**kwds):
+        kwds = {
+            'model': 'records',
+            'database': str(tmpdir.join('db.sqlite3')),
+            **kwds
+        }
+        return SQLitePersistence(**kwds)
+    return make_persistence
+
+
+class TestSQLitePersistence:
+    """Test cases for `SQLitePersistence`."""
+
+    @pytest.mark.parametrize('batch_size', [ 0, 7 ])
+    def test_persist(self, sqlite_persistence, batch_size):
+        persistence = sqlite_persistence(query='key', batch_size=batch_size)
+        with persistence:
+            for i in range(50):
+                persistence.persist({ 'key': i % 20, 'x': i, 'tags': [ i ] }, print_num=False)
+            # New columns are added as needed
+            persistence.persist({ 'key': 0, 'y': 'new' }, print_num=False)
+        assert persistence.n_committed == 51
+        data = sorted(persistence.load_persisted_data(), key=lambda x: x['key'])
+        persistence.close()
+        assert len(data) == 20
+        assert data[0] == { 'key': 0, 'x': 40, 'tags': '[40]', 'y': 'new' }
+        assert data[19] == { 'key': 19, 'x': 39, 'tags': '[39]' }
+
+    def test_insert(self, sqlite_persistence):
+        persistence = sqlite_persistence(update=False, batch_size=10)
+        with persistence:
+            for i in range(25):
+                persistence.persist({ 'x': i % 5 }, print_num=False)
+        assert len(list(persistence.load_persisted_data())) == 25
+        persistence = sqlite_persistence(clear_model={ 'x': 0 })
+        with persistence:
+            pass
+        assert len(list(persistence.load_persisted_data())) == 20
+        persistence.close()
+
+    @pytest.mark.parametrize('update,query', [
+        (False, None),
+        (False, 'id'),
+        (True, 'id')
+    ])
+    def test_mixed_columns(self, sqlite_persistence, update, query):
+        persistence = sqlite_persistence(query=query, update=update, batch_size=10)
+        docs = [ { 'id': 1, 'a': 1 }, { 'id': 2, 'b': 2 }, { 'id': 3, 'a': 3, 'b': 4 } ]
+        with persistence:
+            for doc in docs:
+                persistence.persist(doc, print_num=False)
+        data = sorted(persistence.load_persisted_data(), key=lambda x: x['id'])
+        persistence.close()
+        assert data == docs
+
+    def test_update_order(self, sqlite_persistence):
+        persistence = sqlite_persistence(query='k', update=True, batch_size=10)
+        docs = [ { 'k': 0, 'x': 1 }, { 'k': 0, 'x': 2, 'y': 1 }, { 'k': 0, 'x': 3 } ]
+        with persistence:
+            for doc in docs:
+                persistence.persist(doc, print_num=False)
+        data = list(persistence.load_persisted_data())
+        persistence.close()
+        assert data == [ { 'k': 0, 'x': 3, 'y': 1 } ]
+
+    def test_run_importer(self, sqlite_persistence):
+        persistence = sqlite_persistence(query='text', batch_size=100)
+        source = os.path.join(ROOT_PATH, 'test', 'data', 'raw', 'example-mongo-model-dump.jl')
+        JSONLinesImporter(persistence).import_data(source, print_num=False)
+        with open(source) as f:
+            n_lines = sum(1 for _ in f)
+        assert persistence.n_committed == n_lines
+        assert len(list(persistence.load_persisted_data())) > 0
+        persistence.close()
@@ -1,15 +1,19 @@
 """Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence`."""
 import os
 import json
+import time
 from logging import getLogger
 import pytest
 from datetime import datetime
 from mongoengine import Document
 from mongoengine import ObjectIdField, StringField, IntField, ListField, DateTimeField
+from pymongo.errors import BulkWriteError
 from {{ cookiecutter.repo_name }}.config import ROOT_PATH
-from {{ cookiecutter.repo_name }}.persistence import JSONLinesPersistence
+from {{ cookiecutter.repo_name }}.exceptions import FailedWritesError
+from {{ cookiecutter.repo_name }}.persistence import JSONLinesPersistence, CompositePersistence
 from {{ cookiecutter.repo_name }}.persistence.db.mongo import MongoPersistence
-from {{ cookiecutter.repo_name }}.persistence.importers import BaseImporter
+from {{ cookiecutter.repo_name }}.persistence.importers import BaseImporter, JSONLinesImporter
+from {{ cookiecutter.repo_name }}.persistence.importers import find_chunks
 from {{ cookiecutter.repo_name }}.persistence.db.mongo.mixins import BaseDocumentMixin
 from {{ cookiecutter.repo_name }}.cli.importers.utils import run_importer
 
@@ -25,10 +29,19 @@ def jl_persistence():
     #Teardown part of the fixture
     os.remove(jl_persistence.filepath)
 
+@pytest.fixture
+def jl_source(tmpdir):
+    """Fixture: JSON lines data source."""
+    path = str(tmpdir.join('jl-source.jl'))
+    with open(path, 'w') as f:
+        for i in range(1000):
+            f.write(json.dumps({ 'x': i, 'text': f"t{i}" })+"\n")
+    return path
+
 @pytest.fixture(scope='module')
 def MongoModel():
     """Fixture: test *Mongoengine* model."""
-    class MongoModel(Document, BaseDocumentMixin):
+    class MongoModel(BaseDocumentMixin, Document):
         """ODM model."""
         _id = ObjectIdField(primary_key=True)
         title = StringField()
@@ -54,15 +67,16 @@ def mongo_model_data():
         data.append(x)
     return data
 
-@pytest.fixture(scope='module')
-def importer(MongoModel):
-    """Fixture: JSONLinesImporter."""
+@pytest.fixture(scope='module', params=[ 0, 2 ])
+def importer(request, MongoModel):
+    """Fixture: JSONLinesImporter with synchronous and pipelined writes."""
     importer = BaseImporter(MongoPersistence(
         model=MongoModel,
         query='title',
         batch_size=440,
         logger=True,
-        backoff_time=0
+        backoff_time=0,
+        n_inflight=request.param
     ))
     return importer
 
@@ -80,6 +94,250 @@ class TestJSONLinesPersistence:
         # Compare entire datasets
         saved_data = [ item for item in jl_persistence.load_persisted_data() ]
         assert saved_data == data
+        assert list(jl_persistence.load_persisted_data(start=5, stop=20, step=3)) \
+            == data[5:20:3]
+        assert jl_persistence.load_persisted_item(-1) == data[-1]
+
+
+class TestJSONLinesImporter:
+    """Test cases for `JSONLinesImporter`."""
+
+    @pytest.mark.parametrize('chunk_size', [1, 100, 1024, 10**9])
+    def test_find_chunks(self, jl_source, chunk_size):
+        chunks = find_chunks(jl_source, chunk_size)
+        assert chunks[0][0] == 0
+        assert chunks[-1][1] == os.path.getsize(jl_source)
+        with open(jl_source, 'rb') as f:
+            for (_, end), (start, _) in zip(chunks, chunks[1:]):
+                assert end == start
+                f.seek(start - 1)
+                assert f.read(1) == b"\n"
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_import_data(self, jl_source, jl_persistence, workers):
+        importer = JSONLinesImporter(jl_persistence)
+        importer.import_data(jl_source, print_num=False,
+                             workers=workers, chunk_size=1024)
+        saved_data = sorted(jl_persistence.load_persisted_data(), key=lambda x: x['x'])
+        assert saved_data == [ { 'x': i, 'text': f"t{i}" } for i in range(1000) ]
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    @pytest.mark.parametrize('start,stop,step', [
+        (500, None, None),
+        (10, 990, None),
+        (None, 100, 7)
+    ])
+    def test_import_data_range(self, jl_source, jl_persistence, workers,
+                               start, stop, step):
+        importer = JSONLinesImporter(jl_persistence)
+        importer.import_data(jl_source, print_num=False, workers=workers,
+                             chunk_size=1024, start=start, stop=stop, step=step)
+        saved_data = sorted(jl_persistence.load_persisted_data(), key=lambda x: x['x'])
+        data = [ { 'x': i, 'text': f"t{i}" } for i in range(1000) ]
+        assert saved_data == data[start:stop:step]
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_import_data_resume(self, jl_source, tmpdir, workers):
+        """Test case for resuming an import interrupted by a failed write."""
+        class FailingPersistence(JSONLinesPersistence):
+            """Persistence failing after a number of writes."""
+            fail_at = 555
+
+            def persist(self, doc, **kwds):
+                if self.count + 1 == self.fail_at:
+                    raise IOError("Write failed")
+                super().persist(doc, **kwds)
+
+        kwds = dict(filename='jl-resume-{n}.jl', dirpath=str(tmpdir), batch_size=100)
+        persistence = FailingPersistence(**kwds)
+        importer = JSONLinesImporter(persistence)
+        with pytest.raises(IOError):
+            importer.import_data(jl_source, print_num=False, workers=workers,
+                                 chunk_size=1024, checkpoint=True)
+        with open(jl_source + '.checkpoint') as f:
+            assert json.load(f)['count'] == 554
+        resumed = JSONLinesPersistence(**kwds)
+        JSONLinesImporter(resumed).import_data(jl_source, print_num=False,
+                                               workers=workers, chunk_size=1024,
+                                               resume=True)
+        data = [
+            *persistence.load_persisted_data(),
+            *resumed.load_persisted_data()
+        ]
+        assert data == [ { 'x': i, 'text': f"t{i}" } for i in range(1000) ]
+        with open(jl_source + '.checkpoint') as f:
+            checkpoint = json.load(f)
+        assert checkpoint['count'] == 1000
+        assert checkpoint['offset'] == os.path.getsize(jl_source)
+
+
+class TestCompositePersistence:
+    """Test cases for `CompositePersistence`."""
+
+    def test_import_data(self, jl_source, tmpdir):
+        class SlowPersistence(JSONLinesPersistence):
+            """Persistence with slow writes."""
+            def persist(self, doc, **kwds):
+                time.sleep(.0005)
+                doc['slow'] = True
+                super().persist(doc, **kwds)
+
+        persistence = CompositePersistence(
+            sinks=[ JSONLinesPersistence, SlowPersistence ],
+            sink_kwds=[ { 'filename': 'fast-{n}.jl' }, { 'filename': 'slow-{n}.jl' } ],
+            dirpath=str(tmpdir),
+            batch_size=100,
+            queue_size=50
+        )
+        committed = []
+        persistence.commit_hooks.append(committed.append)
+        JSONLinesImporter(persistence).import_data(jl_source, print_num=False)
+        fast, slow = persistence.sinks
+        data = [ { 'x': i, 'text': f"t{i}" } for i in range(1000) ]
+        assert list(fast.load_persisted_data()) == data
+        assert list(slow.load_persisted_data()) == [ { **d, 'slow': True } for d in data ]
+        assert persistence.count == 1000
+        assert persistence.n_committed == sum(committed) == 1000
+        assert not any(w.is_alive for w in persistence.workers)
+
+    def test_failed_sink(self, tmpdir):
+        class FailingPersistence(JSONLinesPersistence):
+            """Persistence failing after a number of writes."""
+            def persist(self, doc, **kwds):
+                if self.count == 10:
+                    raise IOError("Write failed")
+                super().persist(doc, **kwds)
+
+        persistence = CompositePersistence(
+            sinks=[ JSONLinesPersistence(filename='ok-{n}.jl', dirpath=str(tmpdir), batch_size=5),
+                    FailingPersistence(filename='fail-{n}.jl', dirpath=str(tmpdir), batch_size=5) ],
+            queue_size=1
+        )
+        with pytest.raises(IOError):
+            with persistence:
+                for i in range(100):
+                    persistence.persist({ 'x': i }, print_num=False)
+        ok, failed = persistence.sinks
+        assert len(list(failed.load_persisted_data())) == 10
+        assert len(list(ok.load_persisted_data())) >= 10
+        assert persistence.n_committed == 10
+
+
+class TestMongoPersistenceRetries:
+    """Test cases for retries of partially failed writes in `MongoPersistence`."""
+
+    @pytest.fixture
+    def persistence(self, monkeypatch):
+        class RetryModel(BaseDocumentMixin, Document):
+            """ODM model."""
+            title = StringField()
+            meta = { 'collection': 'test_retry_model' }
+
+        class Collection:
+            """Collection failing on some operations."""
+            def __init__(self):
+                self.calls = []
+            def find(self, *args, **kwds):
+                return []
+            def bulk_write(self, ops, ordered=True):
+                self.calls.append([ op._filter['title'] for op in ops ])
+                errors = []
+                for i, op in enumerate(ops):
+                    title = op._filter['title']
+                    if title == 't3':
+                        errors.append({ 'index': i, 'code': 11000, 'errmsg': 'dup' })
+                    elif title == 't5' and len(self.calls) == 1:
+                        errors.append({ 'index': i, 'code': 91, 'errmsg': 'shutdown' })
+                if errors:
+                    raise BulkWriteError({ 'writeErrors': errors })
+
+        collection = Collection()
+        monkeypatch.setattr(RetryModel, '_get_collection', lambda: collection)
+        def make_persistence(**kwds):
+            return MongoPersistence(
+                model=RetryModel,
+                query='title',
+                backoff_time=0,
+                **kwds
+            )
+        return make_persistence, collection
+
+    def test_dead_letter(self, persistence, tmpdir):
+        make_persistence, collection = persistence
+        path = str(tmpdir.join('dead.jl'))
+        p = make_persistence(dead_letter=path)
+        for i in range(10):
+            p.persist({ 'title': f"t{i}" }, print_num=False)
+        p.finalize()
+        assert len(collection.calls) == 2
+        assert collection.calls[1] == [ 't5' ]
+        assert p.n_committed == 10
+        with open(path) as f:
+            records = [ json.loads(l) for l in f ]
+        assert len(records) == 1
+        assert records[0]['filter'] == { 'title': 't3' }
+        assert records[0]['error']['code'] == 11000
+
+    def test_no_dead_letter(self, persistence):
+        make_persistence, _ = persistence
+        p = make_persistence()
+        for i in range(10):
+            p.persist({ 'title': f"t{i}" }, print_num=False)
+        with pytest.raises(FailedWritesError) as exc:
+            p.finalize()
+        assert len(exc.value.failed) == 1
+
+    @pytest.mark.parametrize('n_inflight', [ 0, 2 ])
+    def test_finalize_releases_resources(self, persistence, tmpdir, n_inflight):
+        make_persistence, _ = persistence
+        p = make_persistence(n_inflight=n_inflight, n_writers=2)
+        for i in range(10):
+            p.persist({ 'title': f"t{i}" }, print_num=False)
+        with pytest.raises(FailedWritesError):
+            p.finalize()
+        assert p._flusher is None
+        assert p._writers is None
+
+    def test_skip_unchanged_failed(self, persistence, tmpdir):
+        make_persistence, collection = persistence
+        p = make_persistence(skip_unchanged=True, dead_letter=str(tmpdir.join('dead.jl')))
+        for i in range(10):
+            p.persist({ 'title': f"t{i}" }, print_num=False)
+        p.finalize()
+        # Hash of the dead-lettered document is not cached
+        assert len(p.hashes) == 9
+        collection.calls.clear()
+        for i in range(10):
+            p.persist({ 'title': f"t{i}" }, print_num=False)
+        p.finalize()
+        assert collection.calls == [ [ 't3' ] ]
+        assert p.stats['skipped'] == 9
+
+    def test_load_hashes_db_fields(self, monkeypatch):
+        class HashModel(BaseDocumentMixin, Document):
+            """ODM model with custom database field names."""
+            title = StringField(db_field='t')
+            content_hash = StringField(db_field='h')
+            meta = { 'collection': 'test_hash_model' }
+
+        class Collection:
+            """Collection returning stored content hashes."""
+            def find(self, query, projection, **kwds):
+                assert query == { 'h': { '$exists': True } }
+                assert projection == { 't': 1, 'h': 1, '_id': 0 }
+                return [ { 't': 'x', 'h': 'abc' } ]
+
+        monkeypatch.setattr(HashModel, '_get_collection', Collection)
+        p = MongoPersistence(model=HashModel, query='title',
+                             skip_unchanged=True, hash_field='content_hash')
+        p.load_hashes()
+        assert p.hashes == { p.get_hash_key({ 'title': 'x' }): 'abc' }
+
+    def test_prepare_missing_hash_field(self, persistence):
+        make_persistence, _ = persistence
+        with pytest.raises(ValueError):
+            make_persistence(skip_unchanged=True, update=False).prepare()
+        make_persistence(skip_unchanged=True, update=False, raw_insert=True).prepare()
 
 
 @pytest.mark.mongo
@@ -113,3 +371,28 @@ class TestJSONLinesImporterWithMongoPersistence:
             )
         except Exception as exc:
             pytest.fail(str(exc))
+
+@pytest.mark.mongo
+class TestMongoPersistenceInsert:
+    """Test cases for insert mode of `MongoPersistence`."""
+
+    @pytest.mark.parametrize('raw_insert', [ False, True ])
+    def test_insert(self, MongoModel, mongo_model_data, raw_insert):
+        """Test case for standard and raw inserts."""
+        MongoModel.drop_collection()
+        persistence = MongoPersistence(
+            model=MongoModel,
+            update=False,
+            raw_insert=raw_insert,
+            batch_size=1000,
+            backoff_time=0
+        )
+        n_rounds = 10
+        for _ in range(n_rounds):
+            for doc in mongo_model_data:
+                persistence.persist(doc, print_num=False)
+        persistence.finalize()
+        n_docs = n_rounds*len(mongo_model_data)
+        assert MongoModel.objects.count() == n_docs
+        docs = [ doc.to_dict() for doc in MongoModel.objects.order_by('views')[:n_rounds] ]
+        assert docs == [ mongo_model_data[0] ]*n_rounds
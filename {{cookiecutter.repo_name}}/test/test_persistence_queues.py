@@ -0,0 +1,55 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.persistence.queues`."""
+import pytest
+from {{ cookiecutter.repo_name }}.persistence.queues import SpillQueue
+
+
+class TestSpillQueue:
+    """Test cases for `SpillQueue`."""
+
+    @pytest.mark.parametrize('max_bytes', [ 1, 200, 10**6 ])
+    def test_fifo(self, max_bytes, tmpdir):
+        queue = SpillQueue(max_bytes, dirpath=str(tmpdir))
+        out = []
+        n = 0
+        # Interleave appends and pops to cross memory / disk boundaries
+        for k in (50, 20, 70, 0):
+            for _ in range(k):
+                queue.appendleft({ 'n': n, 'text': 'x'*(n % 13) })
+                n += 1
+            for _ in range(len(queue) // 2):
+                out.append(queue.pop()['n'])
+        while queue:
+            out.append(queue.pop()['n'])
+        assert out == list(range(n))
+        assert queue.memory_bytes == 0
+        assert queue.disk_bytes == 0
+        if max_bytes < 10**6:
+            assert queue.n_spilled > 0
+        else:
+            assert queue.n_spilled == 0
+        with pytest.raises(IndexError):
+            queue.pop()
+        queue.close()
+
+    def test_memory_limit(self):
+        queue = SpillQueue(1000)
+        for i in range(1000):
+            queue.appendleft('x'*100)
+        assert len(queue) == 1000
+        assert queue.memory_bytes <= 1000
+        queue.close()
+
+    def test_refill_memory_limit(self):
+        queue = SpillQueue(1000)
+        # The first record fills the memory, the others are spilled
+        for item in ('x'*900, 'a'*480, 'b'*470, 'c'*880):
+            queue.appendleft(item)
+        assert queue.n_spilled == 3
+        # Refilling stops before the record exceeding the ceiling
+        out = []
+        while queue:
+            out.append(queue.pop())
+            assert queue.memory_bytes <= 1000
+        assert [ x[0] for x in out ] == [ 'x', 'a', 'b', 'c' ]
+        queue.close()
+        assert not queue
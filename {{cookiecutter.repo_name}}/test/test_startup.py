@@ -0,0 +1,107 @@
+"""Test cases for startup time of the package and the command-line interface.
+
+Startup time budget (in seconds) may be changed
+with `STARTUP_BUDGET` environment variable.
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+from types import ModuleType
+import pytest
+import {{ cookiecutter.repo_name }}
+from {{ cookiecutter.repo_name }}.cli import cli
+
+STARTUP_BUDGET = float(os.environ.get('STARTUP_BUDGET', 1.0))
+HEAVY_MODULES = (
+    'pymongo', 'mongoengine', 'celery', 'scrapy',
+    'networkx', 'matplotlib', 'dateparser'
+)
+CLI_HELP = (
+    "import sys, json\n"
+    "from {{ cookiecutter.repo_name }}.cli import cli\n"
+    "try:\n"
+    "    cli({args!r})\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "print(json.dumps(sorted(m for m in {modules!r} if m in sys.modules)))\n"
+)
+
+
+def run_python(code, **environ):
+    """Run code in a fresh interpreter and measure wall time."""
+    root = os.path.dirname(os.path.dirname({{ cookiecutter.repo_name }}.__file__))
+    env = { **os.environ, **environ }
+    env['PYTHONPATH'] = os.pathsep.join([ root, *filter(None, [ env.get('PYTHONPATH') ]) ])
+    start = time.monotonic()
+    proc = subprocess.run([ sys.executable, '-c', code ], env=env, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    return proc.stdout, time.monotonic() - start
+
+
+@pytest.mark.parametrize('args', [
+    [ '--help' ],
+    [ 'db', '--help' ],
+    [ 'tasks', '--help' ]
+])
+def test_cli_imports(args):
+    code = CLI_HELP.format(args=args, modules=HEAVY_MODULES)
+    out, _ = run_python(code)
+    assert json.loads(out.splitlines()[-1]) == []
+
+def test_cli_startup_time():
+    code = CLI_HELP.format(args=[ '--help' ], modules=())
+    elapsed = min(run_python(code)[1] for _ in range(3))
+    assert elapsed < STARTUP_BUDGET
+
+def test_lazy_components():
+    # Importing a subpackage does not shadow the application object
+    import {{ cookiecutter.repo_name }}.taskiss.scheduler     # pylint: disable=W0612
+    assert not isinstance({{ cookiecutter.repo_name }}.taskiss, ModuleType)
+    assert {{ cookiecutter.repo_name }}.taskiss is {{ cookiecutter.repo_name }}.taskiss
+    # Celery looks for the application in the `app` attribute
+    assert {{ cookiecutter.repo_name }}.app is {{ cookiecutter.repo_name }}.taskiss
+    assert 'mongo' in dir({{ cookiecutter.repo_name }})
+    assert {{ cookiecutter.repo_name }}.BasePersistence.__name__ == 'BasePersistence'
+    with pytest.raises(AttributeError):
+        {{ cookiecutter.repo_name }}.nonexistent_attribute
+
+def test_lazy_subcommands(cli_runner):
+    res = cli_runner.invoke(cli, [ '--help' ])
+    assert res.exit_code == 0
+    for name in ('db', 'tasks', 'persistence', 'importers'):
+        assert name in res.output
+
+@pytest.mark.parametrize('use', [
+    "from {{ cookiecutter.repo_name }}.utils.fetch import get_db_model\n"
+    "get_db_model('ExampleMongoModel')._get_collection()\n",
+    "from {{ cookiecutter.repo_name }}.persistence.db.mongo.models import ExampleMongoModel\n"
+    "ExampleMongoModel.objects\n"
+])
+def test_mongo_connection_warm_cache(tmpdir, use):
+    env = {
+        'USE_MONGO': 'yes',
+        'XDG_CACHE_HOME': str(tmpdir),
+        **{ f"MONGODB_TEST_{k}": v for k, v in [
+            ('USER', 'user'), ('PASS', 'pass'), ('HOST', 'localhost'),
+            ('PORT', '27017'), ('DB', 'test')
+        ] }
+    }
+    code = (
+        "from {{ cookiecutter.repo_name }}.base.registry import registry\n"
+        "print(registry.load() is not None)\n"
+        "registry.index\n"
+    )
+    run_python(code, **env)
+    code += (
+        "from mongoengine.connection import _connection_settings\n"
+        "print('default' in _connection_settings)\n"
+        f"{use}"
+        "print('default' in _connection_settings)\n"
+    )
+    out, _ = run_python(code, **env)
+    # Cache is warm, connection is not initialized until the model is used
+    assert out.split() == [ 'True', 'False', 'True' ]
+
@@ -0,0 +1,50 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.utils.concurrency`."""
+import time
+import pytest
+from {{ cookiecutter.repo_name }}.utils.concurrency import BackgroundWorker
+
+
+class TestBackgroundWorker:
+    """Test cases for `BackgroundWorker`."""
+
+    @pytest.mark.parametrize('maxsize', [ 1, 3 ])
+    def test_submit(self, maxsize):
+        results = []
+        def func(x, delay=0):
+            time.sleep(delay)
+            results.append(x)
+        worker = BackgroundWorker(func, maxsize=maxsize)
+        for i in range(10):
+            worker.submit(i, delay=.001)
+        worker.join()
+        assert results == list(range(10))
+        worker.close()
+        assert not worker.is_alive
+
+    def test_error(self):
+        results = []
+        def func(x):
+            if x == 2:
+                raise RuntimeError(x)
+            results.append(x)
+        worker = BackgroundWorker(func)
+        with pytest.raises(RuntimeError):
+            for i in range(5):
+                worker.submit(i)
+            worker.close()
+        # Tasks are rejected until the worker is reset
+        for i in range(3, 5):
+            with pytest.raises(RuntimeError):
+                worker.submit(i)
+        with pytest.raises(RuntimeError):
+            worker.close()
+        worker.close(reraise=False)
+        assert results == [ 0, 1 ]
+        worker.reset()
+        worker.submit(5)
+        worker.close()
+        assert results == [ 0, 1, 5 ]
+
+    def test_maxsize(self):
+        with pytest.raises(ValueError):
+            BackgroundWorker(print, maxsize=0)
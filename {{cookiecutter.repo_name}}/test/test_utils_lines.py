@@ -0,0 +1,49 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.utils.lines`."""
+import os
+import pytest
+from {{ cookiecutter.repo_name }}.utils.lines import LineIndex
+
+
+@pytest.fixture(params=[ "a\nbb\n\nccc\n", "a\nbb\n\nccc", "" ])
+def text_file(request, tmpdir):
+    """Fixture: text file with and without trailing newline."""
+    path = str(tmpdir.join('lines.txt'))
+    with open(path, 'w') as f:
+        f.write(request.param)
+    return path, request.param.split("\n") if request.param else []
+
+
+class TestLineIndex:
+    """Test cases for `LineIndex`."""
+
+    def test_index(self, text_file):
+        path, lines = text_file
+        if lines and lines[-1] == '':
+            lines = lines[:-1]
+        lines = [ l.encode() for l in lines ]
+        with LineIndex(path) as index:
+            assert len(index) == len(lines)
+            assert index[:] == lines
+            assert index[1::2] == lines[1::2]
+            for i, line in enumerate(lines):
+                assert index[i] == line
+                assert index[-i-1] == lines[-i-1]
+            with pytest.raises(IndexError):
+                index[len(lines)]
+        assert os.path.exists(path + '.idx')
+
+    def test_persisted_index(self, text_file):
+        path, _ = text_file
+        with LineIndex(path) as index:
+            offsets = index.offsets
+        index = LineIndex(path)
+        size, mtime = index.signature
+        assert index.load(size, mtime)
+        assert index.offsets == offsets
+        # Index is invalidated when the file changes
+        with open(path, 'a') as f:
+            f.write("dddd\n")
+        size, mtime = index.signature
+        assert not index.load(size, mtime)
+        with index:
+            assert index[-1].endswith(b"dddd")
@@ -0,0 +1,98 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.utils.log`."""
+# pylint: disable=W0212
+import gzip
+import logging
+import threading
+import pytest
+from {{ cookiecutter.repo_name }}.utils import log
+from {{ cookiecutter.repo_name }}.utils.log import make_file_handler, make_logging_settings
+from {{ cookiecutter.repo_name }}.utils.log import GzipRotatingFileHandler, LoggerQueueHandler
+from {{ cookiecutter.repo_name }}.utils.log import start_queue_listener, stop_queue_listener
+from {{ cookiecutter.repo_name }}.utils.log import restart_queue_listener
+
+
+class RecordingHandler(logging.Handler):
+    """Handler recording formatted messages and threads handling them."""
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+@pytest.fixture
+def logger():
+    """Fixture: logger with recording handlers."""
+    logger = logging.getLogger('test_utils_log')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handlers = [ RecordingHandler(), RecordingHandler(logging.WARNING) ]
+    for handler in handlers:
+        logger.addHandler(handler)
+    yield logger, handlers
+    stop_queue_listener()
+    for handler in handlers:
+        logger.removeHandler(handler)
+
+
+def test_make_file_handler():
+    handler = make_file_handler('x.log', 'INFO', max_bytes=10, backup_count=2, compress=True)
+    assert handler['class'].endswith('GzipRotatingFileHandler')
+    assert handler['maxBytes'] == 10
+    assert handler['backupCount'] == 2
+    handler = make_file_handler('x.log', 'INFO', compress=False)
+    assert handler['class'] == 'logging.handlers.RotatingFileHandler'
+
+def test_make_logging_settings(tmpdir):
+    settings = make_logging_settings(str(tmpdir))
+    assert settings['loggers']['taskiss']['handlers'] == [ 'taskiss', 'taskiss_error' ]
+
+def test_gzip_rotating_file_handler(tmpdir):
+    path = tmpdir.join('test.log')
+    handler = GzipRotatingFileHandler(str(path), maxBytes=50, backupCount=2)
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, "x"*40, None, None)
+    for _ in range(4):
+        handler.emit(record)
+    handler.close()
+    assert tmpdir.join('test.log.1.gz').exists()
+    assert not tmpdir.join('test.log.1').exists()
+    with gzip.open(str(tmpdir.join('test.log.1.gz')), 'rt') as f:
+        assert f.read() == "x"*40 + "\n"
+
+def test_queue_listener(logger):
+    logger, handlers = logger
+    start_queue_listener([ logger.name ])
+    assert [ type(h) for h in logger.handlers ] == [ LoggerQueueHandler ]
+    args = [ 1 ]
+    logger.info("Info %s", args)
+    args.append(2)
+    try:
+        raise ValueError("error")
+    except ValueError:
+        logger.exception("Failed")
+    stop_queue_listener()
+    assert [ h for h in logger.handlers if isinstance(h, RecordingHandler) ] == handlers
+    assert not any(isinstance(h, LoggerQueueHandler) for h in logger.handlers)
+    assert handlers[0].messages[0] == "INFO Info [1]"
+    assert handlers[0].messages[1].count("ValueError: error") == 1
+    assert handlers[1].messages == handlers[0].messages[1:]
+    assert threading.current_thread().name not in handlers[0].threads
+
+def test_restart_queue_listener(logger, monkeypatch):
+    logger, handlers = logger
+    listener = start_queue_listener([ logger.name ])
+    restart_queue_listener()
+    assert log._listener is listener
+    # Simulate a forked process
+    monkeypatch.setattr(log, '_listener_pid', -1)
+    restart_queue_listener()
+    assert log._listener is not listener
+    assert logger.handlers[0].queue is log._listener.queue
+    logger.warning("Warning")
+    stop_queue_listener()
+    listener.stop()
+    assert handlers[1].messages == [ "WARNING Warning" ]
@@ -0,0 +1,83 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.utils.progress`."""
+from logging import getLogger
+import pytest
+from {{ cookiecutter.repo_name }}.utils.progress import ProgressMeter, format_bytes, format_time
+
+
+class FakeClock:
+    """Manually advanced clock."""
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize('n,expected', [
+    (0, "0.0 B"),
+    (1536, "1.5 KB"),
+    (3*1024**3, "3.0 GB")
+])
+def test_format_bytes(n, expected):
+    assert format_bytes(n) == expected
+
+@pytest.mark.parametrize('seconds,expected', [
+    (0, "00:00:00"),
+    (61.5, "00:01:01"),
+    (3*3600 + 7, "03:00:07")
+])
+def test_format_time(seconds, expected):
+    assert format_time(seconds) == expected
+
+
+class TestProgressMeter:
+    """Test cases for `ProgressMeter`."""
+
+    def test_throttling(self):
+        clock = FakeClock()
+        meter = ProgressMeter(interval=.5, enabled=True, clock=clock)
+        due = []
+        for _ in range(100):
+            clock.now += .01
+            due.append(meter.update())
+        assert meter.count == 100
+        # Refreshes at 0.01, 0.51
+        assert sum(due) == 2
+
+    def test_disabled(self, capsys):
+        meter = ProgressMeter(enabled=False)
+        assert not any(meter.update() for _ in range(10))
+        assert meter.count == 10
+        # Not a terminal under pytest
+        assert not ProgressMeter().enabled
+        assert capsys.readouterr().out == ""
+
+    def test_stats(self):
+        clock = FakeClock()
+        meter = ProgressMeter('record', total=400, total_bytes=4000, clock=clock)
+        meter.update(n_bytes=10)
+        clock.now += 10
+        meter.update(n=99, n_bytes=990)
+        stats = meter.stats
+        assert stats['items_per_sec'] == 10
+        assert stats['bytes_per_sec'] == 100
+        assert stats['eta'] == 30
+        assert meter.format() == "100/400, 10.0 records/s, 100.0 B/s, elapsed 00:00:10, ETA 00:00:30"
+        meter.total = None
+        assert meter.stats['eta'] == 30
+
+    def test_display(self, capsys):
+        meter = ProgressMeter(enabled=True)
+        meter.update()
+        meter.display("\rProcessing item no. 1")
+        meter.close()
+        out = capsys.readouterr().out
+        assert out.startswith("\rProcessing item no. 1 [1, ")
+        assert out.endswith("\n")
+
+    def test_log(self, caplog):
+        meter = ProgressMeter()
+        meter.update()
+        with caplog.at_level('INFO'):
+            meter.log(getLogger('test-progress'), "Committed 1 items")
+        assert "Committed 1 items: 1, " in caplog.text
@@ -0,0 +1,45 @@
+"""Test cases for :py:module:`{{ cookiecutter.repo_name }}.utils.startup`."""
+import sys
+import pytest
+from {{ cookiecutter.repo_name }}.utils.startup import parse_importtime, sort_tree, prune_tree
+from {{ cookiecutter.repo_name }}.utils.startup import format_tree, format_profile, profile_startup
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   b.x
+import time:        50 |         50 |   b.y
+import time:       200 |        350 | b
+some warning
+import time:       400 |        400 | a
+"""
+
+
+def test_parse_importtime():
+    tree = parse_importtime(IMPORTTIME.splitlines())
+    assert [ n['name'] for n in tree ] == [ 'b', 'a' ]
+    assert [ n['name'] for n in tree[0]['children'] ] == [ 'b.x', 'b.y' ]
+    assert tree[0]['self_us'] == 200
+    assert tree[0]['cumulative_us'] == 350
+
+def test_sort_and_prune_tree():
+    tree = sort_tree(parse_importtime(IMPORTTIME.splitlines()))
+    assert [ n['name'] for n in tree ] == [ 'a', 'b' ]
+    assert [ n['name'] for n in tree[1]['children'] ] == [ 'b.x', 'b.y' ]
+    pruned = prune_tree(tree, min_us=60)
+    assert [ n['name'] for n in pruned[1]['children'] ] == [ 'b.x' ]
+    pruned = prune_tree(tree, max_depth=0)
+    assert all(not n['children'] for n in pruned)
+    lines = format_tree(tree)
+    assert len(lines) == 4
+    assert lines[2].split() == [ '0.1', '0.1', 'b.x' ]
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="'-X importtime' requires Python 3.7+")
+def test_profile_startup():
+    profile = profile_startup(components=())
+    assert set(profile['phases']) == { 'import', 'logging' }
+    assert profile['errors'] == {}
+    names = [ n['name'] for n in profile['imports'] ]
+    assert '{{ cookiecutter.repo_name }}' in names
+    assert profile['total_ms'] > 0
+    text = format_profile(profile)
+    assert text.startswith("Phases [ms]")
@@ -1,5 +1,150 @@
-"""Utility functions for running tests."""
+"""Utility functions and fake objects for running tests."""
+from threading import Lock
+from pymongo.errors import BulkWriteError, AutoReconnect
+
 
 def make_cli_args(*args):
     """Prepare args for invoking the CLI."""
     return [ (x.strip() if isinstance(x, str) else x) for x in args if x ]
+
+
+# Fake MongoDB objects --------------------------------------------------------
+
+class FakeCursor:
+    """Cursor over a list of documents."""
+    def __init__(self, docs):
+        self.docs = iter(docs)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.docs)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeResult:
+    """Bulk write result."""
+    def __init__(self, matched, modified, upserted):
+        self.matched_count = matched
+        self.modified_count = modified
+        self.upserted_count = upserted
+
+
+class FakeClient:
+    """Client creating fake databases on first access."""
+    def __init__(self):
+        self.databases = {}
+
+    def __getitem__(self, name):
+        if name not in self.databases:
+            self.databases[name] = FakeDatabase(name, client=self)
+        return self.databases[name]
+
+    @property
+    def admin(self):
+        return self['admin']
+
+
+class FakeDatabase:
+    """Database recording commands and creating fake collections on first access.
+
+    Every command returns `response`.
+    """
+    def __init__(self, name='test', client=None, response=None):
+        self.name = name
+        self.client = client if client is not None else FakeClient()
+        self.client.databases.setdefault(name, self)
+        self.response = response or {}
+        self.commands = []
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection([], database=self, name=name)
+        return self.collections[name]
+
+    def command(self, name, cmd=None, **kwds):
+        self.commands.append((name, cmd, kwds))
+        return self.response
+
+
+class FakeCollection:
+    """Collection operating on a list of documents in memory.
+
+    Queries and sort orders are not applied, except for sorting by `_id`
+    in `find_one`. Calls of `find` and `aggregate` are recorded.
+
+    Bulk writes accept only update operations. Operations with filters
+    containing `fail` key fail with a duplicate key error.
+    If `down` is set, then bulk writes fail with a connection error.
+    """
+    def __init__(self, docs=(), database=None, name='coll', down=False, index_info=None):
+        self.docs = list(docs)
+        self.name = name
+        self.database = database if database is not None else FakeDatabase()
+        self.down = down
+        self.index_info = index_info or { '_id_': { 'key': [ ('_id', 1) ] } }
+        self.calls = []
+        self.cursors = []
+        self.batches = []
+        self.created = []
+        self._lock = Lock()
+
+    @property
+    def full_name(self):
+        return f"{self.database.name}.{self.name}"
+
+    def _cursor(self, docs):
+        cursor = FakeCursor(docs)
+        self.cursors.append(cursor)
+        return cursor
+
+    def find(self, query=None, projection=None, skip=0, limit=0, **kwds):
+        self.calls.append(dict(query=query, projection=projection, **kwds))
+        docs = self.docs[skip:]
+        return self._cursor(docs[:limit] if limit else docs)
+
+    def find_one(self, query=None, projection=None, sort=None):
+        if not self.docs:
+            return None
+        docs = sorted(self.docs, key=lambda d: d['_id'])
+        return docs[0] if not sort or sort[0][1] == 1 else docs[-1]
+
+    def aggregate(self, pipeline, **kwds):
+        self.calls.append(dict(pipeline=pipeline, **kwds))
+        return self._cursor(self.docs)
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+    def index_information(self):
+        return self.index_info
+
+    def create_indexes(self, indexes):
+        self.created.extend(indexes)
+        return [ i.document['name'] for i in indexes ]
+
+    def bulk_write(self, ops, ordered=True):
+        with self._lock:
+            self.batches.append(ops)
+        if self.down:
+            raise AutoReconnect("connection closed")
+        errors = [
+            { 'index': i, 'code': 11000, 'errmsg': "E11000 duplicate key" }
+            for i, op in enumerate(ops) if 'fail' in op._filter
+        ]
+        ok = [ op for op in ops if 'fail' not in op._filter ]
+        upserted = sum(1 for op in ok if op._upsert)
+        counts = (len(ok) - upserted, len(ok) - upserted, upserted)
+        if errors:
+            raise BulkWriteError({
+                'writeErrors': errors,
+                'nMatched': counts[0],
+                'nModified': counts[1],
+                'nUpserted': counts[2]
+            })
+        return FakeResult(*counts)
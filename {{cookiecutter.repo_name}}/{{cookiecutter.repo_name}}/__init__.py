@@ -1,59 +1,188 @@
 """_{{ cookiecutter.repo_name | capitalize }}_ top-level module.
 
 This module defines additional top-level exports, main package metadata etc.
+
+Application components (`mongo` client and `taskiss` application)
+and heavy top-level exports are initialized lazily on first access,
+so importing the package (i.e. by the command-line interface)
+does not connect to databases or import *Celery*, *networkx* etc.
+unless they are used.
+
+Attributes
+----------
+mongo : :py:class:`pymongo.MongoClient` or None
+    *MongoDB* client. `None` if *MongoDB* is disabled.
+taskiss : :py:class:`{{ cookiecutter.repo_name }}.taskiss.Taskiss` or None
+    *Taskiss* application object. `None` if *Celery* is disabled.
+app : :py:class:`{{ cookiecutter.repo_name }}.taskiss.Taskiss` or None
+    Alias of `taskiss`, so *Celery* finds the application
+    with `celery -A {{ cookiecutter.repo_name }}`.
+init_times : dict
+    Durations (in seconds) of initialization phases,
+    i.e. logging setup and initialization of components.
 """
 # pylint: disable=C0103
-import os
-import atexit
+import sys
+import time
+from types import ModuleType
+from threading import RLock
+from importlib import import_module
 from logging import getLogger
-from configparser import ConfigParser, ExtendedInterpolation
-from pymongo import MongoClient
-from mongoengine.base import DocumentMetaclass
 from {{ cookiecutter.repo_name }}.config import cfg, MODE
 from {{ cookiecutter.repo_name }}.utils import log
-from {{ cookiecutter.repo_name }}.utils.path import make_path
-from {{ cookiecutter.repo_name }}.utils.processors import parse_bool
-from {{ cookiecutter.repo_name }}.persistence.db import mongo as mongodb
-from {{ cookiecutter.repo_name }}.persistence.importers import BaseImporter
-from {{ cookiecutter.repo_name }}.persistence import BasePersistence
-from {{ cookiecutter.repo_name }}.base.abc import AbstractDBConnector, AbstractMongoModel
-from {{ cookiecutter.repo_name }}.taskiss import Taskiss
 
 
 __author__ = '{{ cookiecutter.full_name }}'
 __email__ = '{{ cookiecutter.email }}'
 __version__ = '{{ cookiecutter.version }}'
 
-# Register abstract base classes ----------------------------------------------
-
-AbstractDBConnector.register(MongoClient)
-AbstractMongoModel.register(DocumentMetaclass)
-
 # Iniitilize application components -------------------------------------------
 
+init_times = {}
+
+_start = time.perf_counter()
 log.init(cfg.getenvvar(MODE, 'log_root_dir'))
 logger = getLogger()
+init_times['logging'] = time.perf_counter() - _start
+
+_LAZY_EXPORTS = {
+    'mongodb': '{{ cookiecutter.repo_name }}.persistence.db.mongo',
+    'BaseImporter': '{{ cookiecutter.repo_name }}.persistence.importers:BaseImporter',
+    'BasePersistence': '{{ cookiecutter.repo_name }}.persistence:BasePersistence'
+}
+_components = {}
+_lock = RLock()
+
+# Lazy attributes indexed by the registry without initializing them
+__lazy_objects__ = {
+    'connectors': [ 'mongo' ]
+}
 
-mongo = None
-if cfg.getenvvar(MODE, 'use_mongo', fallback=True, convert_bool=True):
-    mongo = mongodb.init(
+
+def init_mongo():
+    """Initialize *MongoDB* client.
+
+    The client does not connect until the first operation,
+    so it is never shared between forked worker processes.
+    """
+    if not cfg.getenvvar(MODE, 'use_mongo', fallback=True, convert_bool=True):
+        return None
+    from {{ cookiecutter.repo_name }}.persistence.db import mongo as mongodb
+    return mongodb.init(
         user=cfg.getenvvar(MODE, 'mongo_user'),
         password=cfg.getenvvar(MODE, 'mongo_pass'),
         host=cfg.getenvvar(MODE, 'mongo_host'),
         port=cfg.getenvvar(MODE, 'mongo_port'),
-        db=cfg.getenvvar(MODE, 'mongo_db')
+        db=cfg.getenvvar(MODE, 'mongo_db'),
+        maxPoolSize=cfg.getint(MODE, 'mongo_max_pool_size', fallback=100),
+        minPoolSize=cfg.getint(MODE, 'mongo_min_pool_size', fallback=0),
+        waitQueueTimeoutMS=cfg.getint(MODE, 'mongo_wait_queue_timeout_ms', fallback=None)
     )
 
-taskiss = None
-if cfg.getenvvar(MODE, 'use_celery', fallback=True, convert_bool=True):
+def init_taskiss():
+    """Initialize *Taskiss* application.
+
+    Its scheduler is set up lazily, so task modules
+    are not imported until it is used.
+    """
+    if not cfg.getenvvar(MODE, 'use_celery', fallback=True, convert_bool=True):
+        return None
+    from celery.signals import worker_process_init
+    from {{ cookiecutter.repo_name }}.taskiss import Taskiss
+    worker_process_init.connect(init_worker_process, weak=False)
     taskiss = Taskiss('{{cookiecutter.repo_name}}',
                       config_source='{{cookiecutter.repo_name}}.config.taskiss')
     taskiss.setup_scheduler()
+    return taskiss
+
+def init_worker_process(**kwds):
+    """Reinitialize components in every forked worker process.
+
+    A new MongoDB client is created and the logging queue listener
+    is restarted (if logging works in the queue mode).
+    """
+    log.restart_queue_listener()
+    if _components.get('mongo') is not None:
+        from {{ cookiecutter.repo_name }}.persistence.db import mongo as mongodb
+        _components['mongo'] = mongodb.reconnect()
+
+_INITIALIZERS = {
+    'mongo': init_mongo,
+    'taskiss': init_taskiss
+}
+
+def get_component(name):
+    """Get application component initializing it on first access.
+
+    Parameters
+    ----------
+    name : str
+        Component name. One of `mongo` or `taskiss`.
+    """
+    try:
+        return _components[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _components:
+            start = time.perf_counter()
+            _components[name] = _INITIALIZERS[name]()
+            init_times[name] = time.perf_counter() - start
+        return _components[name]
+
+
+class _Package(ModuleType):
+    """Top-level module with lazily initialized attributes.
+
+    Components are properties, so they are not shadowed
+    by subpackages of the same name (i.e. `taskiss`)
+    that are set as attributes of the package when imported.
+    """
+    @property
+    def mongo(self):
+        return get_component('mongo')
+
+    @mongo.setter
+    def mongo(self, value):
+        _components['mongo'] = value
+
+    @property
+    def taskiss(self):
+        return get_component('taskiss')
+
+    @taskiss.setter
+    def taskiss(self, value):
+        if not isinstance(value, ModuleType):
+            _components['taskiss'] = value
+
+    @property
+    def app(self):
+        return get_component('taskiss')
+
+    def __getattr__(self, attr):
+        try:
+            path = _LAZY_EXPORTS[attr]
+        except KeyError:
+            raise AttributeError(f"module '{__name__}' has no attribute '{attr}'")
+        module_name, _, name = path.partition(':')
+        obj = import_module(module_name)
+        if name:
+            obj = getattr(obj, name)
+        setattr(self, attr, obj)
+        return obj
+
+    def __dir__(self):
+        return sorted({ *super().__dir__(), *_INITIALIZERS, *_LAZY_EXPORTS, 'app' })
+
+sys.modules[__name__].__class__ = _Package
 
 # Exit hanlders ---------------------------------------------------------------
 
 def exit_handler():
     """Exit handler that handles db logout etc."""
+    mongo = _components.get('mongo')
+    if mongo is None:
+        return
     db = cfg.getenvvar(MODE, 'mongo_db')
     user = cfg.getenvvar(MODE, 'mongo_user')
     mongo[db].logout()
@@ -1,5 +1,6 @@
 """**Abstract base classes**"""
 from abc import ABCMeta, abstractmethod
+from .registry import registry
 
 
 # Abstract metaclasses --------------------------------------------------------
@@ -25,7 +26,15 @@ class AbstractMongoModelMetaclass(AbstractDBModelMetaclass):
     pass
 
 class AbstractImporterMetaclass(ABCMeta):
-    """Abstract database importer metaclass."""
+    """Abstract database importer metaclass.
+
+    Importer classes are registered in
+    :py:data:`{{ cookiecutter.repo_name }}.base.registry.registry` when they are created.
+    """
+    def __init__(cls, name, bases, namespace, **kwds):
+        super().__init__(name, bases, namespace, **kwds)
+        registry.register('importers', cls)
+
     @property
     @abstractmethod
     def schema(cls):
@@ -33,7 +42,15 @@ class AbstractImporterMetaclass(ABCMeta):
         pass
 
 class AbstractPersistenceMetaclass(ABCMeta):
-    """Abstract persistence metaclass."""
+    """Abstract persistence metaclass.
+
+    Persistence classes are registered in
+    :py:data:`{{ cookiecutter.repo_name }}.base.registry.registry` when they are created.
+    """
+    def __init__(cls, name, bases, namespace, **kwds):
+        super().__init__(name, bases, namespace, **kwds)
+        registry.register('persistence', cls)
+
     @property
     @abstractmethod
     def schema(cls):
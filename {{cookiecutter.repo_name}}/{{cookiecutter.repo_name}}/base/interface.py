@@ -143,6 +143,14 @@ class DBPersistenceInterface(BaseInterface):
         Must be non-negative.
     logger : :py:class:`logging.Logger`
         Optional logger object.
+    max_queue_memory : int or None
+        Maximum size (in bytes) of queued records kept in memory.
+        Records over the limit are spilled to a temporary file.
+        No limit if `None`.
+    flush_chunk_size : int
+        Maximum number of records written at once when the queue
+        is flushed if `max_queue_memory` is set, so spilled records
+        are streamed from disk in chunks.
     """
     _schema = BaseValidator({
         'model': {
@@ -161,5 +169,57 @@ class DBPersistenceInterface(BaseInterface):
             'default': None,
             'coerce': get_logger
         },
-        'clear_model': { 'nullable': True, 'default': None }
+        'clear_model': { 'nullable': True, 'default': None },
+        'max_queue_memory': {
+            'type': 'integer',
+            'coerce': int,
+            'min': 1,
+            'nullable': True,
+            'default': None
+        },
+        'flush_chunk_size': { 'type': 'integer', 'coerce': int, 'min': 1, 'default': 10000 }
+    })
+
+
+class CompositePersistenceInterface(BaseInterface):
+    """Interface class for
+    :py:class:`{{ cookiecutter.repo_name }}.persistence.CompositePersistence`.
+
+    Attributes
+    ----------
+    sinks : list
+        Persistence objects, classes or class paths / names.
+        Classes are constructed with the keyword arguments
+        passed to the composite persistence.
+        Comma-separated string is also accepted.
+    sink_kwds : list of dict or None
+        Optional keyword arguments used to construct sinks,
+        given in the same order as the sinks.
+        They take precedence over the shared keyword arguments.
+    queue_size : int
+        Maximum number of items waiting to be written by a single sink.
+        Producer blocks when the queue of any sink is full.
+    logger : :py:class:`logging.Logger`
+        Optional logger object.
+    """
+    _schema = BaseValidator({
+        'sinks': {
+            'type': 'list',
+            'coerce': lambda x: [ s.strip() for s in x.split(',') ] if isinstance(x, str) else x,
+            'required': True,
+            'empty': False
+        },
+        'sink_kwds': {
+            'type': 'list',
+            'schema': { 'type': 'dict', 'nullable': True },
+            'nullable': True,
+            'default': None
+        },
+        'queue_size': { 'type': 'integer', 'coerce': int, 'min': 1, 'default': 1000 },
+        'logger': {
+            'type': 'logger',
+            'nullable': True,
+            'default': None,
+            'coerce': get_logger
+        }
     })
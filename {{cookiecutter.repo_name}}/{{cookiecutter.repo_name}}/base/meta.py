@@ -21,8 +21,13 @@ def methdispatch(func):
 
 # Metaclasses -----------------------------------------------------------------
 
-def __getattr__(self, attr):
-    """Attribute lookup for composable classes."""
+def getattr_(self, attr):
+    """Attribute lookup for composable classes.
+
+    It is set as `__getattr__` of composable classes. It is not named
+    `__getattr__`, as on *Python 3.7+* a module level `__getattr__`
+    is called for missing attributes of the module itself (:pep:`562`).
+    """
     components_attr = '_'+self.__class__.__name__+'__components'
     components = [
         *(getattr(self, '__components').items() if '__components' in dir(self) else []),
@@ -192,7 +197,7 @@ class Composable(type):
     def __new__(cls, name, bases, namespace, **kwds):
         """Class instance constructor."""
         newclass = super().__new__(cls, name, bases, namespace)
-        setattr(newclass, __getattr__.__name__, __getattr__)
+        setattr(newclass, '__getattr__', getattr_)
         setattr(newclass, getcomponents_.__name__, getcomponents_)
         setattr(newclass, setcomponents_.__name__, setcomponents_)
         setattr(newclass, getcomponent_.__name__, getcomponent_)
@@ -0,0 +1,366 @@
+"""Registry of database models, persistence classes, importers and connectors.
+
+Classes are registered in memory when they are created
+(by the abstract metaclasses in :py:mod:`{{ cookiecutter.repo_name }}.base.abc`
+and by :py:class:`{{ cookiecutter.repo_name }}.persistence.db.mongo.mixins.BaseDocumentMixin`).
+Objects defined in modules that were not imported yet are found
+with an index mapping names to python paths. The index is built by importing
+all modules of the package once and it is cached on disk together with
+modification times of the modules, so it is rebuilt only after the code
+changes. Then lookups by name are dictionary hits and only modules
+defining the requested objects are imported.
+
+Modules are indexed by their namespaces, so indexing does not trigger
+lazy initialization of module attributes. Lazy attributes are indexed
+if they are listed in `__lazy_objects__` mapping (kinds to names)
+of the module, without accessing them.
+
+Attributes
+----------
+KINDS : tuple of str
+    Kinds of registered objects.
+registry : Registry
+    Registry of the package.
+"""
+import os
+import sys
+import json
+import hashlib
+import pkgutil
+import tempfile
+from weakref import WeakSet
+from threading import RLock
+from importlib import import_module
+
+KINDS = ('models', 'persistence', 'importers', 'connectors')
+_CACHE_VERSION = 1
+
+
+def _is_model(obj):
+    from .abc import AbstractDBModel, AbstractDBMixin
+    return isinstance(obj, type) and isinstance(obj, AbstractDBModel) \
+        and issubclass(obj, AbstractDBMixin)
+
+def _is_persistence(obj):
+    from .abc import AbstractPersistenceMetaclass
+    return isinstance(obj, AbstractPersistenceMetaclass)
+
+def _is_importer(obj):
+    from .abc import AbstractImporterMetaclass
+    return isinstance(obj, AbstractImporterMetaclass)
+
+def _is_connector(obj):
+    from .abc import AbstractDBConnector
+    return isinstance(obj, AbstractDBConnector)
+
+PREDICATES = {
+    'models': _is_model,
+    'persistence': _is_persistence,
+    'importers': _is_importer,
+    'connectors': _is_connector
+}
+
+
+def get_cache_dir():
+    """Get directory of cache files.
+
+    It is `$XDG_CACHE_HOME/<package>` or `~/.cache/<package>`.
+    """
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, __name__.split('.')[0])
+
+
+class Registry:
+    """Registry of objects of selected kinds.
+
+    Attributes
+    ----------
+    package : str
+        Name of the scanned package.
+    path : str
+        Directory of the package.
+    cache_path : str or None
+        Path to the index cache file. Cache is not used if `None`.
+    skip_modules : tuple of str
+        Names of modules (on any level) that are not scanned.
+    """
+    def __init__(self, package, path, cache_path=None,
+                 skip_modules=('test', 'tests', 'doc', 'docs')):
+        """Initialization method."""
+        self.package = package
+        self.path = path
+        self.cache_path = cache_path
+        self.skip_modules = tuple(skip_modules)
+        self._objects = { kind: {} for kind in KINDS }
+        self._index = None
+        self._failed = []
+        self._lock = RLock()
+
+    def register(self, kind, obj, name=None):
+        """Register an object.
+
+        Objects are referenced weakly, so registering classes
+        created dynamically (i.e. in tests) does not leak them.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of the object. One of :py:data:`KINDS`.
+        obj : type or object
+            Registered object.
+        name : str or None
+            Name of the object. Defaults to `obj.__name__`.
+        """
+        name = name or obj.__name__
+        with self._lock:
+            objects = self._objects[kind].get(name)
+            if objects is None:
+                objects = self._objects[kind][name] = WeakSet()
+            objects.add(obj)
+
+    @property
+    def index(self):
+        """dict: Mapping from kinds to names to lists of python paths.
+
+        It is loaded from the cache if it is valid or built otherwise.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = self.load()
+                if self._index is None:
+                    self._index = self.build()
+                    self.save()
+            return self._index
+
+    def get(self, kind, name, predicate=None):
+        """Get an object by name.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of the object. One of :py:data:`KINDS`.
+        name : str
+            Name of the object.
+        predicate : callable or None
+            Additional predicate function.
+
+        Returns
+        -------
+        object or None
+            `None` if there is no such object.
+
+        Raises
+        ------
+        {{ cookiecutter.repo_name }}.exceptions.AmbiguousMatchError
+            If different objects are registered with the same name.
+        """
+        matches = self._find(kind, name, predicate)
+        if not matches and self._failed:
+            # Modules failing to import (i.e. because of missing dependencies)
+            # are retried before giving up
+            if self.retry_failed():
+                matches = self._find(kind, name, predicate)
+        if len(matches) > 1:
+            from {{ cookiecutter.repo_name }}.exceptions import AmbiguousMatchError
+            paths = [ _get_path(obj, name) for obj in matches ]
+            raise AmbiguousMatchError.from_matches(paths, key=name)
+        return matches[0] if matches else None
+
+    def iter(self, kind, predicate=None):
+        """Iterate over all objects of a kind.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of the objects. One of :py:data:`KINDS`.
+        predicate : callable or None
+            Additional predicate function.
+        """
+        names = set(self.index.get(kind, {})) | set(self._objects[kind])
+        seen = set()
+        for name in sorted(names):
+            for obj in self._find(kind, name, predicate):
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    yield obj
+
+    def iter_modules(self):
+        """Iterate over names of scanned modules."""
+        prefix = self.package + '.'
+        yield self.package
+        for _, name, _ in pkgutil.walk_packages([ self.path ], prefix, onerror=self._failed.append):
+            parts = name.split('.')[1:]
+            if any(p.startswith('_') or p in self.skip_modules for p in parts):
+                continue
+            yield name
+
+    def build(self):
+        """Build index by importing all modules of the package."""
+        index = { kind: {} for kind in KINDS }
+        self._failed = []
+        for module_name in self.iter_modules():
+            try:
+                module = import_module(module_name)
+            except Exception:   # pylint: disable=broad-except
+                self._failed.append(module_name)
+                continue
+            self._index_module(index, module)
+        return index
+
+    def retry_failed(self):
+        """Retry importing modules that failed to import.
+
+        Returns
+        -------
+        bool
+            `True` if any module was imported and the index was updated.
+        """
+        with self._lock:
+            index = self.index
+            failed, self._failed = self._failed, []
+            updated = False
+            for module_name in failed:
+                try:
+                    module = import_module(module_name)
+                except Exception:   # pylint: disable=broad-except
+                    self._failed.append(module_name)
+                    continue
+                self._index_module(index, module)
+                updated = True
+            if updated:
+                self.save()
+            return updated
+
+    def invalidate(self):
+        """Drop the index, so it is loaded or built again on the next use."""
+        with self._lock:
+            self._index = None
+
+    def get_mtimes(self):
+        """Get modification times of the source files of the package."""
+        mtimes = {}
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            dirnames[:] = [ d for d in dirnames if d != '__pycache__' ]
+            for filename in filenames:
+                if filename.endswith('.py'):
+                    path = os.path.join(dirpath, filename)
+                    mtimes[os.path.relpath(path, self.path)] = os.stat(path).st_mtime_ns
+        return mtimes
+
+    def load(self):
+        """Load index from the cache if it is up to date.
+
+        Returns
+        -------
+        dict or None
+            `None` if there is no valid cache.
+        """
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get('version') != _CACHE_VERSION \
+        or cache.get('python') != list(sys.version_info[:2]) \
+        or cache.get('mtimes') != self.get_mtimes():
+            return None
+        self._failed = cache.get('failed', [])
+        return cache['index']
+
+    def save(self):
+        """Save index to the cache.
+
+        Errors are ignored, so a read-only file system only disables caching.
+        """
+        if not self.cache_path or self._index is None:
+            return
+        cache = {
+            'version': _CACHE_VERSION,
+            'python': list(sys.version_info[:2]),
+            'mtimes': self.get_mtimes(),
+            'failed': self._failed,
+            'index': self._index
+        }
+        try:
+            dirpath = os.path.dirname(self.cache_path)
+            os.makedirs(dirpath, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=dirpath, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
+
+    def _find(self, kind, name, predicate=None):
+        predicate_ = PREDICATES[kind]
+        matches = []
+        for obj in list(self._objects[kind].get(name, ())):
+            if not any(obj is m for m in matches):
+                matches.append(obj)
+        for path in self.index.get(kind, {}).get(name, ()):
+            try:
+                obj = _import_path(path)
+            except (ImportError, AttributeError):
+                continue
+            if not any(obj is m for m in matches):
+                matches.append(obj)
+        return [
+            obj for obj in matches
+            if predicate_(obj) and (predicate(obj) if predicate else True)
+        ]
+
+    def _index_module(self, index, module):
+        namespace = vars(module)
+        for kind, attrs in namespace.get('__lazy_objects__', {}).items():
+            for attr in attrs:
+                paths = index[kind].setdefault(attr, [])
+                path = f"{module.__name__}:{attr}"
+                if path not in paths:
+                    paths.append(path)
+        for attr, obj in list(namespace.items()):
+            if attr.startswith('_'):
+                continue
+            for kind, predicate in PREDICATES.items():
+                try:
+                    if not predicate(obj):
+                        continue
+                except TypeError:
+                    continue
+                if isinstance(obj, type):
+                    name = obj.__name__
+                    path = _get_path(obj, attr, module.__name__)
+                else:
+                    name = attr
+                    path = f"{module.__name__}:{attr}"
+                paths = index[kind].setdefault(name, [])
+                if path not in paths:
+                    paths.append(path)
+
+
+def _get_path(obj, attr, module_name=None):
+    qualname = getattr(obj, '__qualname__', '')
+    module = getattr(obj, '__module__', None)
+    if isinstance(obj, type) and module and '<locals>' not in qualname:
+        return f"{module}:{qualname}"
+    return f"{module_name or module}:{attr}"
+
+def _import_path(path):
+    module_name, _, attr = path.partition(':')
+    obj = import_module(module_name)
+    for part in attr.split('.'):
+        obj = getattr(obj, part)
+    return obj
+
+
+_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+registry = Registry(
+    package=__name__.split('.')[0],
+    path=_path,
+    # Different checkouts of the package do not share the cache
+    cache_path=os.path.join(
+        get_cache_dir(),
+        f"registry-{hashlib.md5(_path.encode('utf-8')).hexdigest()[:12]}.json"
+    )
+)
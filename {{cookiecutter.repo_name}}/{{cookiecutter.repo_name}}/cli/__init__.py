@@ -9,15 +9,25 @@ click
 import os
 import click
 from {{ cookiecutter.repo_name }} import __name__
-from .tasks import tasks
-from .db import db
-from .persistence import persistence
-from .importers import importers
+from .utils import LazyGroup
 
 PACKAGE_NAME = __name__
 CONTEXT_SETTINGS = {}
+# Submodules are imported only when used
+SUBCOMMANDS = {
+    'tasks': ('{{ cookiecutter.repo_name }}.cli.tasks:tasks',
+              "Interface for interacting with the task scheduler."),
+    'db': ('{{ cookiecutter.repo_name }}.cli.db:db',
+           "Database management module."),
+    'persistence': ('{{ cookiecutter.repo_name }}.cli.persistence:persistence',
+                    "Persistence classes management interface."),
+    'importers': ('{{ cookiecutter.repo_name }}.cli.importers:importers',
+                  "Interface for importing data to databases."),
+    'debug': ('{{ cookiecutter.repo_name }}.cli.debug:debug',
+              "Debugging and profiling tools.")
+}
 
-@click.group(context_settings=CONTEXT_SETTINGS)
+@click.group(cls=LazyGroup, lazy_subcommands=SUBCOMMANDS, context_settings=CONTEXT_SETTINGS)
 @click.version_option(prog_name=PACKAGE_NAME.upper())
 @click.option('--debug/--no-debug', default=False,
               help=f"Run '{PACKAGE_NAME}' in debug mode.")
@@ -31,9 +41,3 @@ def cli(debug):
     if debug:
         os.environ['LOGGING_LEVEL'] = 'DEBUG'
         click.echo(f"{PACKAGE_NAME.upper()}: running in DEBUG mode")
-
-
-cli.add_command(tasks)
-cli.add_command(db)
-cli.add_command(persistence)
-cli.add_command(importers)
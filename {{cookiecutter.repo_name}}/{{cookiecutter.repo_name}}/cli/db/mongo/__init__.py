@@ -1,9 +1,30 @@
 """CLI: DB submodule for MongoDB / Mongoengine management."""
 # pylint: disable=W0212
+import sys
 import json
+from datetime import datetime, timedelta
 import click
+from mongoengine.connection import DEFAULT_CONNECTION_NAME, get_db
+from {{ cookiecutter.repo_name }} import get_component
+from {{ cookiecutter.repo_name }}.persistence.db.mongo import pool_stats
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.export import open_output, export_collection
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.export import COMPRESSION, JSON_MODES
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.bulk import open_input, bulk_update, ExtendedJSONEncoder
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.utils import DeadLetterWriter
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.explain import find_command, update_command
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.explain import summarize
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.explain import explain as explain_command
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.profiling import SOURCES, rank_ops
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.profiling import read_profile, read_current_ops
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.indexes import get_index_models, ensure_indexes
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.aggregate import INTO_MODES, run_aggregation
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.aggregate import make_options, execution_stats
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.partition import METHODS, split_ranges
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.partition import dumps_ranges
+from {{ cookiecutter.repo_name }}.persistence.db.mongo.partition import export_partitioned, scan_partitioned
 from ...utils import eager_callback, pprint, parse_args, to_console, do_dry_run
-from .utils import get_mongo_model, show_mongo_models, show_mongo_model_schema
+from {{ cookiecutter.repo_name }}.utils.serializers import UniversalJSONEncoder
+from .utils import get_mongo_model, iter_mongo_models, show_mongo_models, show_mongo_model_schema
 
 
 @click.group()
@@ -33,9 +54,11 @@ def _(path_or_name):
 @click.option('--skip', '-s', type=int, help="Skip first *n* documents.")
 @click.option('--order', '-o', type=str, multiple=True,
               help="Sort by fields (multiple allowed). Set to '-field_name' to sort descending.")
+@click.option('--explain', is_flag=True, default=False,
+              help="Only show the query plan and execution statistics.")
 @click.option('--dry-run', is_flag=True, default=False,
               help="Dry run: only show how the engine interprets the query.")
-def _(path_or_name, query, field, exclude, limit, skip, order, dry_run):
+def _(path_or_name, query, field, exclude, limit, skip, order, explain, dry_run):
     """Run a find query against a MongoDB collection.
 
     Notes
@@ -45,6 +68,14 @@ def _(path_or_name, query, field, exclude, limit, skip, order, dry_run):
     query = json.loads(query)
     do_dry_run(dry_run, query)
     model = get_mongo_model(path_or_name)
+    if explain:
+        coll = model._get_collection()
+        projection = { f: 0 if exclude else 1 for f in field } or None
+        sort = [ (o[1:], -1) if o.startswith('-') else (o, 1) for o in order ] or None
+        cmd = find_command(coll, query, projection, sort=sort, skip=skip or 0,
+                           limit=limit or 0)
+        pprint(summarize(explain_command(coll, cmd)))
+        return
     s = slice(None, None)
     if limit and skip:
         s = slice(skip, skip+limit)
@@ -63,6 +94,115 @@ def _(path_or_name, query, field, exclude, limit, skip, order, dry_run):
             doc = doc.to_dict(only=field)
         pprint(doc)
 
+@mongo.command(name='export', help="Export documents from a MongoDB collection as JSON lines.")
+@click.argument('path_or_name', nargs=1, type=str, required=True)
+@click.argument('query', nargs=1, type=str, required=False, default='{}')
+@click.option('--output', '-O', type=str, default='-',
+              help="Output file path. Write to stdout if not set or '-'.")
+@click.option('--field', '-f', type=str, multiple=True,
+              help="Field names to limit to the results.")
+@click.option('--exclude', is_flag=True, default=False,
+              help="Should selected fields be excluded instead of included.")
+@click.option('--limit', '-l', type=int, default=0, help="Limit exported documents.")
+@click.option('--skip', '-s', type=int, default=0, help="Skip first *n* documents.")
+@click.option('--order', '-o', type=str, multiple=True,
+              help="Sort by fields (multiple allowed). Set to '-field_name' to sort descending.")
+@click.option('--batch-size', '-b', type=int, default=1000,
+              help="Number of documents fetched in a single round trip.")
+@click.option('--compress', '-c', type=click.Choice(list(COMPRESSION)), default=None,
+              help="Output compression. Inferred from the output file extension if not set.")
+@click.option('--json-mode', type=click.Choice(JSON_MODES), default='plain',
+              help="Serialize BSON types as plain JSON or as MongoDB Extended JSON.")
+@click.option('--dry-run', is_flag=True, default=False,
+              help="Dry run: only show how the engine interprets the query.")
+def _(path_or_name, query, output, field, exclude, limit, skip, order, batch_size,
+      compress, json_mode, dry_run):
+    """Export documents from a collection as compact JSON lines.
+
+    Documents are read with a raw cursor and streamed
+    to a file or the standard output, so this is much faster than `find`
+    and the output may be redirected or piped.
+    """
+    query = json.loads(query)
+    do_dry_run(dry_run, query)
+    coll = get_mongo_model(path_or_name)._get_collection()
+    projection = { f: 0 if exclude else 1 for f in field } or None
+    sort = [ (o[1:], -1) if o.startswith('-') else (o, 1) for o in order ] or None
+    with open_output(output, compression=compress) as stream:
+        n = export_collection(coll, stream, query, projection=projection,
+                              batch_size=batch_size, sort=sort, skip=skip,
+                              limit=limit, mode=json_mode)
+    click.echo(f"Exported {n} documents.", err=True)
+
+@mongo.command(name='split', help="Split a MongoDB collection into '_id' ranges.")
+@click.argument('path_or_name', nargs=1, type=str, required=True)
+@click.argument('query', nargs=1, type=str, required=False, default='{}')
+@click.option('--partitions', '-p', type=int, default=8, help="Number of partitions.")
+@click.option('--method', '-m', type=click.Choice(METHODS), default='auto',
+              help="Method of computing range boundaries.")
+def _(path_or_name, query, partitions, method):
+    """Show '_id' ranges (as MongoDB Extended JSON) partitioning a collection."""
+    coll = get_mongo_model(path_or_name)._get_collection()
+    ranges = split_ranges(coll, partitions, method, json.loads(query))
+    click.echo(dumps_ranges(ranges))
+
+@mongo.command(name='parallel-export',
+               help="Export a MongoDB collection to sharded JSON lines files in parallel.")
+@click.argument('path_or_name', nargs=1, type=str, required=True)
+@click.argument('query', nargs=1, type=str, required=False, default='{}')
+@click.option('--output', '-O', type=str, required=True,
+              help="Path template of shards. '{n}' is replaced with the shard number.")
+@click.option('--partitions', '-p', type=int, default=8, help="Number of partitions.")
+@click.option('--workers', '-w', type=int, default=None,
+              help="Number of worker processes. Defaults to the number of CPUs.")
+@click.option('--method', '-m', type=click.Choice(METHODS), default='auto',
+              help="Method of computing range boundaries.")
+@click.option('--field', '-f', type=str, multiple=True,
+              help="Field names to limit to the results.")
+@click.option('--exclude', is_flag=True, default=False,
+              help="Should selected fields be excluded instead of included.")
+@click.option('--batch-size', '-b', type=int, default=1000,
+              help="Number of documents fetched in a single round trip.")
+@click.option('--json-mode', type=click.Choice(JSON_MODES), default='plain',
+              help="Serialize BSON types as plain JSON or as MongoDB Extended JSON.")
+def _(path_or_name, query, output, partitions, workers, method, field, exclude,
+      batch_size, json_mode):
+    """Export a collection to JSON lines shards, one per '_id' range."""
+    model = get_mongo_model(path_or_name)
+    projection = { f: 0 if exclude else 1 for f in field } or None
+    res = export_partitioned(model, output, partitions, workers=workers, method=method,
+                             query=json.loads(query) or None, projection=projection,
+                             batch_size=batch_size, mode=json_mode)
+    pprint(res)
+
+@mongo.command(name='parallel-scan',
+               help="Apply a python function to partitions of a MongoDB collection in parallel.")
+@click.argument('path_or_name', nargs=1, type=str, required=True)
+@click.argument('func', nargs=1, type=str, required=True)
+@click.argument('query', nargs=1, type=str, required=False, default='{}')
+@click.option('--partitions', '-p', type=int, default=8, help="Number of partitions.")
+@click.option('--workers', '-w', type=int, default=None,
+              help="Number of worker processes. Defaults to the number of CPUs.")
+@click.option('--method', '-m', type=click.Choice(METHODS), default='auto',
+              help="Method of computing range boundaries.")
+@click.option('--field', '-f', type=str, multiple=True,
+              help="Field names to limit to the results.")
+@click.option('--batch-size', '-b', type=int, default=1000,
+              help="Number of documents fetched in a single round trip.")
+def _(path_or_name, func, query, partitions, workers, method, field, batch_size):
+    """Apply a function to partitions of a collection.
+
+    FUNC must be a python path (i.e. 'package.module:func') of a function
+    taking an iterator of raw documents. Its results are printed
+    in the order of partitions.
+    """
+    model = get_mongo_model(path_or_name)
+    res = scan_partitioned(model, func, partitions, workers=workers, method=method,
+                           query=json.loads(query) or None,
+                           projection={ f: 1 for f in field } or None,
+                           batch_size=batch_size)
+    pprint(res)
+
 @mongo.command(name='remove', help="Remove documents from MongoDB collection.")
 @click.argument('path_or_name', nargs=1, type=str)
 @click.argument('query', nargs=1, type=str, required=True)
@@ -89,14 +229,20 @@ def _(path_or_name, query, parg, dry_run):
               help="Allow updating multiple documents.")
 @click.option('--parg', '-p', multiple=True,
               help="Additional named arguments parsed as JSON strings.")
+@click.option('--explain', is_flag=True, default=False,
+              help="Only show the query plan and execution statistics (no writes are applied).")
 @click.option('--dry-run', is_flag=True, default=False,
               help="Dry run: only show how the engine interprets the query.")
-def _(path_or_name, query, update, upsert, multiple, parg, dry_run):
+def _(path_or_name, query, update, upsert, multiple, parg, explain, dry_run):
     """Update documents in MongoDB collection."""
     query = json.loads(query)
     update = json.loads(update)
     do_dry_run(dry_run, query, update)
     coll = get_mongo_model(path_or_name)._get_collection()
+    if explain:
+        cmd = update_command(coll, query, update, upsert=upsert, multiple=multiple)
+        pprint(summarize(explain_command(coll, cmd)))
+        return None
     kwds = parse_args(*parg, parser='json')
     if multiple:
         res = coll.update_many(query, update, upsert=upsert, **kwds)
@@ -104,6 +250,53 @@ def _(path_or_name, query, update, upsert, multiple, parg, dry_run):
         res = coll.update_one(query, update, upsert=upsert, **kwds)
     return res
 
+@mongo.command(name='bulk-update',
+               help="Update documents in MongoDB collection from a JSON lines file "
+                    "(operations are unordered, so filters should not repeat).")
+@click.argument('path_or_name', nargs=1, type=str)
+@click.argument('input', nargs=1, type=str, required=False, default='-')
+@click.option('--batch-size', '-b', type=int, default=1000,
+              help="Number of operations in a single bulk write.")
+@click.option('--workers', '-w', type=int, default=4,
+              help="Number of bulk writes executed concurrently.")
+@click.option('--multiple/--not-multiple', default=False,
+              help="Update multiple documents by default (records may override with 'multi').")
+@click.option('--reject', '-r', type=str, default=None,
+              help="Path of a JSON lines file for failed operations.")
+@click.option('--invalid', '-i', type=str, default=None,
+              help="Path of a file for invalid input lines (written verbatim).")
+@click.option('--compress', '-c', type=click.Choice(list(COMPRESSION)), default=None,
+              help="Input compression. Inferred from the input file extension if not set.")
+def _(path_or_name, input, batch_size, workers, multiple, reject, invalid, compress):
+    """Update documents from `{filter, update, upsert}` JSON lines records.
+
+    Records are read from a file or the standard input (if not set or '-')
+    and executed in unordered bulk writes. Matched, modified
+    and upserted counts are printed to the standard error.
+
+    The order of operations is not preserved, so records
+    updating the same documents should not be repeated.
+    """
+    coll = get_mongo_model(path_or_name)._get_collection()
+    writer = DeadLetterWriter(reject, encoder=ExtendedJSONEncoder) if reject else None
+    invalid_stream = open(invalid, 'w', encoding='utf-8') if invalid else None
+    stream = open_input(input, compression=compress)
+    try:
+        res = bulk_update(coll, stream, batch_size=batch_size, workers=workers,
+                          multiple=multiple, reject=writer, invalid=invalid_stream)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if writer is not None:
+            writer.close()
+        if invalid_stream is not None:
+            invalid_stream.close()
+    click.echo(json.dumps(res, sort_keys=True), err=True)
+    if res['failed'] or res['invalid']:
+        raise click.ClickException(
+            f"{res['failed']} failed operations and {res['invalid']} invalid records."
+        )
+
 @mongo.command(name='aggregate', help="Run an aggregate query againt a MongoDB collection.")
 @click.argument('path_or_name', nargs=1, type=str, required=True)
 @click.argument('pipeline', nargs=-1, type=str, required=True)
@@ -111,22 +304,78 @@ def _(path_or_name, query, update, upsert, multiple, parg, dry_run):
               help="Args passed to the task (i.e. -a x=10).")
 @click.option('--parg', '-p', type=str, multiple=True,
               help="Literal evaluated args passed to the task (i.e. -e x=['a']).")
+@click.option('--allow-disk-use/--no-allow-disk-use', default=True,
+              help="Allow stages to spill to temporary files on the server.")
+@click.option('--batch-size', '-b', type=int, default=1000,
+              help="Number of documents returned in a single cursor batch.")
+@click.option('--max-time-ms', type=int, default=None,
+              help="Time limit of the aggregation on the server in milliseconds.")
+@click.option('--output', '-O', type=str, default='-',
+              help="Output file path. Write to stdout if not set or '-'.")
+@click.option('--compress', '-c', type=click.Choice(list(COMPRESSION)), default=None,
+              help="Output compression. Inferred from the output file extension if not set.")
+@click.option('--json-mode', type=click.Choice(JSON_MODES), default='plain',
+              help="Serialize BSON types as plain JSON or as MongoDB Extended JSON.")
+@click.option('--into', type=str, default=None,
+              help="Write results into a collection ('[db.]collection') on the server.")
+@click.option('--into-mode', type=click.Choice(INTO_MODES), default='merge',
+              help="Use '$merge' or '$out' stage to write results into a collection.")
+@click.option('--stats', is_flag=True, default=False,
+              help="Report server-side execution statistics (runs the pipeline with explain).")
+@click.option('--explain', is_flag=True, default=False,
+              help="Only show the query plan and execution statistics.")
 @click.option('--dry-run', is_flag=True, default=False,
               help="Dry run: only show how the engine interprets the query.")
-def _(path_or_name, pipeline, arg, parg, dry_run):
+def _(path_or_name, pipeline, arg, parg, allow_disk_use, batch_size, max_time_ms,
+      output, compress, json_mode, into, into_mode, stats, explain, dry_run):
     """Run an aggregate query against a collection.
 
     Additional keyword arguments are used to configure the aggregation process.
     Pipeline stages are specified as positional arguments following the
     collection class path/name.
+
+    Results are streamed from a raw cursor as compact JSON lines
+    to the standard output or a file, or written into another collection
+    on the server (`--into`). Statistics are printed to the standard error.
     """
     pipeline = [ json.loads(stage) for stage in pipeline ]
     do_dry_run(dry_run, *pipeline)
-    model = get_mongo_model(path_or_name)
+    coll = get_mongo_model(path_or_name)._get_collection()
     kwds = { **parse_args(*arg), **parse_args(*parg, parser='json') }
-    cursor = model.objects.aggregate(*pipeline, **kwds)
-    for doc in cursor:
-        pprint(doc)
+    kwds.update(allow_disk_use=allow_disk_use, batch_size=batch_size,
+                max_time_ms=max_time_ms)
+    if explain:
+        res = execution_stats(coll, pipeline, **make_options(**kwds))
+        res.pop('explain')
+        pprint(res)
+        return
+    if into:
+        res = run_aggregation(coll, pipeline, into=into, into_mode=into_mode,
+                              stats=stats, **kwds)
+    else:
+        with open_output(output, compression=compress) as stream:
+            res = run_aggregation(coll, pipeline, stream=stream, mode=json_mode,
+                                  stats=stats, **kwds)
+    if stats and res.get('server'):
+        res['server'].pop('explain', None)
+    click.echo(json.dumps(res, sort_keys=True, cls=UniversalJSONEncoder), err=True)
+
+@mongo.command(name='ensure-indexes', help="Build indexes declared in a MongoDB model.")
+@click.argument('path_or_name', nargs=1, type=str)
+@click.option('--background/--foreground', default=True,
+              help="Build indexes in the background (ignored by MongoDB 4.2+).")
+@click.option('--dry-run', is_flag=True, default=False,
+              help="Dry run: only show declared indexes.")
+def _(path_or_name, background, dry_run):
+    """Build indexes declared in the `indexes` meta option of a model.
+
+    Existing indexes are not rebuilt.
+    """
+    model = get_mongo_model(path_or_name)
+    do_dry_run(dry_run, *[ i.document for i in get_index_models(model) ])
+    names = ensure_indexes(model, background=background)
+    cname = model._get_collection_name()
+    click.echo(f"Collection '{cname}' has indexes: {', '.join(names) or '-'}.")
 
 @mongo.command(name='drop', help="Drop MongoDB collection.")
 @click.argument('path_or_name', nargs=1, type=str)
@@ -140,3 +389,55 @@ def _(path_or_name):
     )
     model.drop_collection()
     click.echo(f"Collection '{cname}' has been dropped.")
+
+@mongo.command(name='slow-ops', help="Rank slow MongoDB operations by models.")
+@click.argument('path_or_name', nargs=-1, type=str)
+@click.option('--source', '-S', type=click.Choice(SOURCES), default='profile',
+              help="Read profiled ('system.profile') or currently running operations.")
+@click.option('--min-ms', '-m', type=int, default=100,
+              help="Minimum duration of operations in milliseconds.")
+@click.option('--since', type=int, default=None,
+              help="Only operations profiled in the last *n* minutes.")
+@click.option('--top', '-t', type=int, default=20, help="Number of reported groups.")
+def _(path_or_name, source, min_ms, since, top):
+    """Rank slow operations by total time.
+
+    Operations are grouped by models, operation types, query shapes
+    and plans. If models are given, then only operations
+    on their collections are reported. Otherwise all operations
+    in the default database are reported. Profiled operations
+    are available only if the database profiler is enabled
+    (i.e. with `db.setProfilingLevel(1, { slowms: 100 })`).
+    """
+    if path_or_name:
+        models = [ get_mongo_model(p) for p in path_or_name ]
+        database = models[0]._get_db()
+    else:
+        models = list(iter_mongo_models())
+        # Models initialize the connection, but the default database is used directly
+        get_component('mongo')
+        database = get_db()
+    ns_models = {
+        f"{m._get_db().name}.{m._get_collection_name()}": m.__name__ for m in models
+    }
+    namespaces = ns_models if path_or_name else None
+    if source == 'profile':
+        since = datetime.utcnow() - timedelta(minutes=since) if since else None
+        ops = read_profile(database, min_ms, namespaces=namespaces, since=since)
+    else:
+        ops = read_current_ops(database, min_ms, namespaces=namespaces)
+    pprint(rank_ops(ops, models=ns_models, top=top))
+
+@mongo.command(name='pool-stats', help="Show MongoDB connection pool statistics.")
+@click.option('--alias', type=str, default=DEFAULT_CONNECTION_NAME,
+              help="Mongoengine connection alias.")
+@click.option('--server', is_flag=True, default=False,
+              help="Include connection statistics reported by the server.")
+def _(alias, server):
+    """Show connection pool options and counters of the current process.
+
+    Connections are opened lazily, so without `--server`
+    the command does not connect to the database.
+    """
+    get_component('mongo')
+    pprint(pool_stats(alias, server=server))
@@ -19,9 +19,13 @@ def get_mongo_model(path_or_name, **kwds):
     return get_db_model(path_or_name,
                         predicate=lambda x: isinstance(x, AbstractMongoModel), **kwds)
 
+def iter_mongo_models():
+    """Iterate over registered *MongoDB* models."""
+    return iter_db_models(predicate=lambda x: isinstance(x, AbstractMongoModel))
+
 def show_mongo_models():
     """Show registered *MongoDB* models."""
-    show_unique(iter_db_models(predicate=lambda x: isinstance(x, AbstractMongoModel)))
+    show_unique(iter_mongo_models())
 
 def show_mongo_model_schema(path_or_name):
     """Show *MongoDB* model schema.
@@ -0,0 +1,40 @@
+"""CLI: debugging and profiling module."""
+import subprocess
+import click
+from {{ cookiecutter.repo_name }}.utils.startup import profile_startup, prune_tree, format_profile
+from ..utils import pprint
+
+
+@click.group()
+def debug():
+    """Debugging and profiling tools."""
+    pass
+
+@debug.command(name='startup-profile', help="Profile imports and initialization of the package.")
+@click.option('--components/--no-components', default=True,
+              help="Should application components (mongo, taskiss, scheduler) be initialized.")
+@click.option('--format', '-f', 'fmt', type=click.Choice([ 'text', 'json' ]), default='text',
+              help="Output format.")
+@click.option('--min-ms', '-m', type=float, default=1.0,
+              help="Hide imports with lower cumulative time in milliseconds.")
+@click.option('--max-depth', '-d', type=int, required=False,
+              help="Maximum depth of shown nested imports (0 shows only top-level imports).")
+def _(components, fmt, min_ms, max_depth):
+    """Profile startup of the package.
+
+    The package is imported in a subprocess with `-X importtime`
+    and imports are shown as a tree sorted by cumulative time.
+    Initialization phases (logging, mongo, taskiss and scheduler)
+    are timed as well.
+    """
+    try:
+        profile = profile_startup(components=('mongo', 'taskiss') if components else ())
+    except subprocess.CalledProcessError as exc:
+        raise click.ClickException(f"Profiled process failed:\n{exc.stderr}")
+    if not profile['imports']:
+        click.echo("No import times reported ('-X importtime' requires Python 3.7+)", err=True)
+    profile['imports'] = prune_tree(profile['imports'], min_us=min_ms*1000, max_depth=max_depth)
+    if fmt == 'json':
+        pprint(profile)
+    else:
+        click.echo(format_profile(profile))
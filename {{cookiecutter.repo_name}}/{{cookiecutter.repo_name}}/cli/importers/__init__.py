@@ -29,7 +29,22 @@ def _(path_or_name):
               help="Args passed to importer and/or persistence (i.e. -a x=10).")
 @click.option('--evalarg', '-e', type=str, multiple=True,
               help="Literal evaluated args passed to importer and/or persistence (i.e. -a x=['a']).")
-def _(importer_path_or_name, persistence_path_or_name, arg, evalarg):
+@click.option('--workers', '-w', type=int, required=False,
+              help="Number of worker processes used for parsing the data source.")
+@click.option('--checkpoint', is_flag=True, default=False,
+              help="Write a checkpoint after every batch committed by the persistence.")
+@click.option('--checkpoint-path', type=str, required=False,
+              help="Path to the checkpoint file (implies --checkpoint).")
+@click.option('--resume', is_flag=True, default=False,
+              help="Resume import from the last checkpoint.")
+def _(importer_path_or_name, persistence_path_or_name, arg, evalarg, workers,
+      checkpoint, checkpoint_path, resume):
     """Run importer."""
-    kwds = { **parse_args(*arg), **parse_args(*evalarg, eval_args=True) }
+    kwds = { **parse_args(*arg), **parse_args(*evalarg, parser='eval') }
+    if workers is not None:
+        kwds.update(workers=workers)
+    if checkpoint_path or checkpoint:
+        kwds.update(checkpoint=checkpoint_path or True)
+    if resume:
+        kwds.update(resume=True)
     run_importer(importer_path_or_name, persistence_path_or_name, log=True, **kwds)
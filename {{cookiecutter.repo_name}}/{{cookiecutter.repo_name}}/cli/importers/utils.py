@@ -40,7 +40,7 @@ def run_importer(importer, persistence, log=False, **kwds):
     persistence = get_persistence(persistence)(**kwds)
     importer = get_importer(importer)(persistence)
     importer_kwds = importer.schema.validated(kwds)
-    if not kwds:
+    if importer_kwds is None:
         raise ValueError(importer.schema.errors)
     if log:
         logger = getLogger('message')
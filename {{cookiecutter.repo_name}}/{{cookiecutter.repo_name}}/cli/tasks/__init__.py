@@ -1,7 +1,6 @@
 """CLI: task runner (Taskiss) module."""
 import click
-from celery.result import AsyncResult
-from {{ cookiecutter.repo_name }} import taskiss as ts
+from {{ cookiecutter.repo_name }} import get_component
 from {{ cookiecutter.repo_name }}.utils import safe_print
 from ..utils import to_console, parse_args, do_dry_run
 
@@ -13,40 +12,48 @@ def tasks():
     """
     pass
 
+def scheduler():
+    """Get scheduler of the *Taskiss* application.
+
+    The application is initialized on first use,
+    so showing help of the commands does not import *Celery*.
+    """
+    return get_component('taskiss').scheduler
+
 @tasks.command(name='stats', help="Show Celery stats.")
-def _(): to_console(ts.scheduler.inspector.stats())
+def _(): to_console(scheduler().inspector.stats())
 
 @tasks.command(name='report', help="Show Celery inspector report.")
-def _(): to_console(ts.scheduler.inspector.report())
+def _(): to_console(scheduler().inspector.report())
 
 @tasks.command(name='ping', help="Ping Celery process.")
-def _(): to_console(ts.scheduler.inspector.ping())
+def _(): to_console(scheduler().inspector.ping())
 
 @tasks.command(name='active-queues', help="Show active Celery queues.")
-def _(): to_console(ts.scheduler.inspector.active_queues())
+def _(): to_console(scheduler().inspector.active_queues())
 
 @tasks.command(name='registered', help="Show registered tasks.")
-def _(): to_console(ts.scheduler.get_registered_tasks())
+def _(): to_console(scheduler().get_registered_tasks())
 
 @tasks.command(name='active', help="Show active tasks.")
-def _(): to_console(ts.scheduler.inspector.active())
+def _(): to_console(scheduler().inspector.active())
 
 @tasks.command(name='scheduled', help="Show scheduled tasks.")
-def _(): to_console(ts.scheduler.inspector.scheduled())
+def _(): to_console(scheduler().inspector.scheduled())
 
 @tasks.command(name='reserved', help="Show reverved tasks.")
-def _(): to_console(ts.scheduler.inspector.reserved())
+def _(): to_console(scheduler().inspector.reserved())
 
 @tasks.command(name='revoked', help="Show revoked tasks.")
-def _(): to_console(ts.scheduler.inspector.revoked())
+def _(): to_console(scheduler().inspector.revoked())
 
 @tasks.command(name='conf', help="Get Celery configuration.")
-def _(): to_console(ts.scheduler.inspector.conf())
+def _(): to_console(scheduler().inspector.conf())
 
 @tasks.command(name='query-tasks', help="Query tasks by id.")
 @click.argument('ids', nargs=-1, type=str)
 def _(ids):
-    to_console(ts.scheduler.inspector.query_task(*ids))
+    to_console(scheduler().inspector.query_task(*ids))
 
 @tasks.command(name='graph', help="Show dependency graph.")
 @click.argument('task', nargs=1, type=str, required=False)
@@ -63,7 +70,7 @@ def _(task, labels):
     depends on the first. This means that in some cases it should be
     automatically run after its dependencies are executed.
     """
-    ts.scheduler.show_dependency_graph(task, with_labels=labels)
+    scheduler().show_dependency_graph(task, with_labels=labels)
 
 @tasks.command(name='run', help="Run a task.")
 @click.argument('task', nargs=1, type=str, required=True)
@@ -87,7 +94,7 @@ def _(task, recursive, timeout, wait, arg, parg, get, argparser, dry_run):
     """Run task."""
     kwds = { **parse_args(*arg), **parse_args(*parg, parser=argparser) }
     do_dry_run(dry_run, kwds)
-    queue = ts.scheduler.run_task(
+    queue = scheduler().run_task(
         task=task,
         timeout=timeout,
         propagate=recursive,
@@ -108,5 +115,5 @@ def _(task, recursive, timeout, wait, arg, parg, get, argparser, dry_run):
 @click.argument('task', nargs=1, type=str, required=True)
 def _(task):
     """Show task schema that specifies its arguments."""
-    task = ts.scheduler.get_task(task)
+    task = scheduler().get_task(task)
     to_console(task.interface.schema)
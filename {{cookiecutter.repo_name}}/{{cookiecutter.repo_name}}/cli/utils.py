@@ -6,7 +6,7 @@ from types import GeneratorType
 from ast import literal_eval
 import click
 from {{ cookiecutter.repo_name }}.config import cfg, MODE
-from {{ cookiecutter.repo_name }}.utils import safe_print
+from {{ cookiecutter.repo_name }}.utils import safe_print, import_python
 from {{ cookiecutter.repo_name }}.utils.serializers import UniversalJSONEncoder
 from .exceptions import MalformedArgumentError, RepeatedArgumentError
 
@@ -130,3 +130,52 @@ def do_dry_run(dry, *args):
             to_console(arg)
         ctx = click.get_current_context()
         ctx.exit()
+
+
+class LazyGroup(click.Group):
+    """Group of commands importing subcommands on first use.
+
+    Subcommands are imported only when they are run (or their help is shown),
+    so startup time of the command-line interface does not depend
+    on dependencies of all its submodules.
+
+    Attributes
+    ----------
+    lazy_subcommands : dict
+        Mapping from subcommand names to tuples of python paths
+        (i.e. `package.module:command`) and short help strings
+        shown in help of the group.
+    """
+    def __init__(self, *args, lazy_subcommands=None, **kwds):
+        """Initialization method."""
+        super().__init__(*args, **kwds)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        """List names of subcommands."""
+        return sorted({ *super().list_commands(ctx), *self.lazy_subcommands })
+
+    def get_command(self, ctx, cmd_name):
+        """Get subcommand importing it if necessary."""
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            path, _ = self.lazy_subcommands[cmd_name]
+            self.add_command(import_python(path), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        """Write help of subcommands without importing them."""
+        rows = []
+        for name in self.list_commands(ctx):
+            cmd = self.commands.get(name)
+            if cmd is None:
+                _, help = self.lazy_subcommands[name]
+            elif getattr(cmd, 'hidden', False):
+                continue
+            elif hasattr(cmd, 'get_short_help_str'):
+                help = cmd.get_short_help_str()
+            else:
+                help = cmd.short_help or ''
+            rows.append((name, help))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
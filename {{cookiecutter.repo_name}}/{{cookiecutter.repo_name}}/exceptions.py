@@ -25,3 +25,41 @@ class AmbiguousMatchError(Exception):
         else:
             message =  f"Matching mutliple targets (\'{', '.join(matches)}\'"
         return cls(message, *args, **kwds)
+
+
+class FailedWritesError(Exception):
+    """Failed writes exception class.
+
+    It should be raised when some write operations of a batch
+    failed permanently and could not be handled otherwise
+    (i.e. written to a dead-letter file).
+
+    Attributes
+    ----------
+    failed : list of tuples
+        Pairs of failed operations and error details.
+    """
+    def __init__(self, message, failed=(), *args):
+        """Initialization method."""
+        super().__init__(message, *args)
+        self.failed = list(failed)
+
+
+class MissingIndexError(Exception):
+    """Missing index exception class.
+
+    It should be raised when queries on some fields of a collection
+    are not served by any index, so they would require collection scans.
+
+    Attributes
+    ----------
+    collection : str
+        Name of the collection.
+    fields : list of str
+        Query fields.
+    """
+    def __init__(self, message, collection=None, fields=(), *args):
+        """Initialization method."""
+        super().__init__(message, *args)
+        self.collection = collection
+        self.fields = list(fields)
@@ -9,15 +9,23 @@ Attributes
 # pylint: disable=W0613,W0221,W0212
 import os
 import json
+from copy import copy
 from collections import deque
 from logging import getLogger
 from itertools import count
+from threading import Lock
+from {{ cookiecutter.repo_name }}.config import cfg, MODE
 from {{ cookiecutter.repo_name }}.utils.app import get_persistence_path
 from {{ cookiecutter.repo_name }}.utils.path import make_path, make_filepath
 from {{ cookiecutter.repo_name }}.utils.serializers import JSONEncoder
-from {{ cookiecutter.repo_name }}.utils import safe_print
+from {{ cookiecutter.repo_name }}.utils.progress import ProgressMeter
+from {{ cookiecutter.repo_name }}.utils.lines import LineIndex
+from {{ cookiecutter.repo_name }}.utils.concurrency import BackgroundWorker
+from {{ cookiecutter.repo_name }}.utils.fetch import get_persistence
+from .queues import SpillQueue
 from {{ cookiecutter.repo_name }}.base.meta import Composable
 from {{ cookiecutter.repo_name }}.base.interface import DiskPersistenceInterface, DBPersistenceInterface
+from {{ cookiecutter.repo_name }}.base.interface import CompositePersistenceInterface
 from {{ cookiecutter.repo_name }}.base.validators import BaseValidator
 from {{ cookiecutter.repo_name }}.base.abc import AbstractPersistenceMetaclass
 
@@ -38,6 +46,12 @@ class BasePersistence(metaclass=AbstractComposablePersistenceMetaclass):
         Persistence settings.
     item_name : str
         Name of the items being processed.
+    commit_hooks : list of callable
+        Callables notified with the number of items
+        that were durably committed to the storage.
+    progress : :py:class:`{{ cookiecutter.repo_name }}.utils.progress.ProgressMeter`
+        Progress meter. Its refresh interval (in milliseconds)
+        is set with `progress_interval` config option.
     """
     _interface = None
 
@@ -58,6 +72,12 @@ class BasePersistence(metaclass=AbstractComposablePersistenceMetaclass):
         self._count = 0
         self.item_name = item_name
         self.queue = deque()
+        self.commit_hooks = []
+        self._n_committed = 0
+        self.progress = ProgressMeter(
+            item_name,
+            interval=cfg.getint(MODE, 'progress_interval', fallback=200) / 1000
+        )
 
     def __enter__(self):
         """Enter hook."""
@@ -65,7 +85,10 @@ class BasePersistence(metaclass=AbstractComposablePersistenceMetaclass):
 
     def __exit__(self, type, value, traceback):
         """Exit hook."""
-        self.finalize()
+        try:
+            self.finalize()
+        finally:
+            self.progress.close()
 
     @property
     def interface(self):
@@ -80,6 +103,30 @@ class BasePersistence(metaclass=AbstractComposablePersistenceMetaclass):
         """Count of processed items getter."""
         return self._count
 
+    @property
+    def n_committed(self):
+        """Count of committed items getter."""
+        return self._n_committed
+
+    def notify_committed(self, n):
+        """Notify commit hooks that items were committed.
+
+        Items are always committed in the order they were passed
+        to `persist`, so hooks may rely on that.
+
+        Parameters
+        ----------
+        n : int
+            Number of items committed since the last notification.
+        """
+        if n <= 0:
+            return
+        self._n_committed += n
+        for hook in self.commit_hooks:
+            hook(n)
+        if self.logger:
+            self.progress.log(self.logger, f"Committed {self._n_committed} {self.item_name}s")
+
     def finalize(self):
         """Finalize update."""
         pass
@@ -96,9 +143,12 @@ class BasePersistence(metaclass=AbstractComposablePersistenceMetaclass):
         raise NotImplementedError(errmsg)
 
     def inc(self, print_num=True, item_name=None,
-            msg="\rProcessing {item_name} no. {n}", **kwds):
+            msg="\rProcessing {item_name} no. {n}", n_bytes=0, **kwds):
         """Increment counter of processed items.
 
+        The progress line is refreshed at most once per the interval
+        of the progress meter and only if *stdout* is a terminal.
+
         Parameters
         ----------
         print_num : bool
@@ -110,14 +160,16 @@ class BasePersistence(metaclass=AbstractComposablePersistenceMetaclass):
             It needs to have at least two interpolated parts with named
             `item_name` and `n`. More named interpolated parts may be used
             adn they can be supplied via `**kwds`.
+        n_bytes : int
+            Size of the item in bytes (if known).
         **kwds :
             Optional keyword arguments used to format the message string.
         """
         item_name = item_name if item_name else self.item_name
         n = next(self._counter)
         self._count = n
-        if print_num and n > 1:
-            safe_print(msg.format(item_name=item_name, n=n, **kwds), nl=False)
+        if self.progress.update(n_bytes=n_bytes) and print_num and n > 1:
+            self.progress.display(msg.format(item_name=item_name, n=n, **kwds))
         return n
 
 # Disk persistence classes ----------------------------------------------------
@@ -222,10 +274,14 @@ class JSONLinesPersistence(DiskPersistence):
             self.inc(print_num=print_num)
             line = self.dump(doc)
             f.write(line+"\n")
-            if batch_size and batch_size > 0 and self.count % batch_size == 0 \
-            and self.logger:
+        if batch_size and batch_size > 0 and self.count % batch_size == 0:
+            self.notify_committed(self.count - self.n_committed)
+            if self.logger:
                 self.logger.info(f"Processed {batch_size} items ({self.count} in total).")
 
+    def finalize(self):
+        """Notify about items written since the last batch."""
+        self.notify_committed(self.count - self.n_committed)
 
     def dump(self, obj):
         """Dump an object to JSON string.
@@ -249,14 +305,25 @@ class JSONLinesPersistence(DiskPersistence):
         """
         return json.loads(data.strip())
 
-    def load_persisted_data(self, filepath=None):
+    def load_persisted_data(self, filepath=None, start=None, stop=None, step=None):
         """Load data persisted to disk.
 
+        If any of `start`, `stop` or `step` is defined, then records are
+        read through a memory-mapped line index
+        (see :py:class:`{{ cookiecutter.repo_name }}.utils.lines.LineIndex`),
+        so no records before `start` are read.
+
         Parameters
         ----------
         filepath : str or None
             Filepath to read from.
             If `None` then defaults to the instance attribute.
+        start : int or None
+            Number of the first record.
+        stop : int or None
+            Number of the record to stop before.
+        step : int or None
+            Step between subsequent records.
 
         Yields
         ------
@@ -264,15 +331,41 @@ class JSONLinesPersistence(DiskPersistence):
             Persisted items.
         """
         filepath = filepath if filepath else self.filepath
-        with open(filepath, 'r') as f:
-            for line in f:
-                yield self.load(line)
+        if start is None and stop is None and step is None:
+            with open(filepath, 'r') as f:
+                for line in f:
+                    yield self.load(line)
+            return
+        with LineIndex(filepath) as index:
+            for line in index.iter_range(start, stop, step):
+                yield self.load(line.decode('utf-8'))
+
+    def load_persisted_item(self, n, filepath=None):
+        """Load a single record persisted to disk by its number.
+
+        Parameters
+        ----------
+        n : int
+            Record number. Negative numbers are counted from the end.
+        filepath : str or None
+            Filepath to read from.
+            If `None` then defaults to the instance attribute.
+        """
+        filepath = filepath if filepath else self.filepath
+        with LineIndex(filepath) as index:
+            return self.load(index[n].decode('utf-8'))
 
 
 # Database persistence classes ------------------------------------------------
 
 class DBPersistence(BasePersistence):
-    """Database persistence base class."""
+    """Database persistence base class.
+
+    If `max_queue_memory` setting is set, then
+    :py:class:`{{ cookiecutter.repo_name }}.persistence.queues.SpillQueue`
+    is used as the queue, so records over the memory limit
+    are spilled to disk.
+    """
     _interface = DBPersistenceInterface
 
     def __init__(self, item_name='record', **kwds):
@@ -287,6 +380,8 @@ class DBPersistence(BasePersistence):
             if `settings=None`.
         """
         super().__init__(item_name, **kwds)
+        if self.max_queue_memory:
+            self.queue = SpillQueue(self.max_queue_memory)
 
     def get_model_name(self):
         """Get model name."""
@@ -320,10 +415,135 @@ class DBPersistence(BasePersistence):
             raise ValueError("'query' is not callable")
         mname = self.get_model_name()
         m = f"Model '{mname}' cleared with result {res}"
-        self.logger.info(m)
+        if self.logger:
+            self.logger.info(m)
         return res
 
     def prepare(self):
         """Prepare model before update."""
         if self.clear_model is not None:
             self.drop_model_data()
+
+
+# Composite persistence classes -----------------------------------------------
+
+def _call(method, *args, **kwds):
+    """Call a method (used as a function of sink workers)."""
+    return method(*args, **kwds)
+
+
+class CompositePersistence(BasePersistence):
+    """Composite persistence writing items to many persistence objects (sinks).
+
+    Every sink has its own bounded queue and a worker thread
+    (see :py:class:`{{ cookiecutter.repo_name }}.utils.concurrency.BackgroundWorker`),
+    so a slow sink does not stall the other ones until its queue is full.
+    Every sink gets a shallow copy of an item, as persistence objects
+    may modify items in place. `prepare` and `finalize` are propagated
+    to all sinks.
+
+    Items are counted as committed when they are committed by all sinks,
+    so commit hooks (i.e. import checkpoints) are safe to use.
+
+    It may be used with importers CLI, i.e. to write a JSON lines archive
+    and a database in one pass::
+
+        ts importers import-data JSONLinesImporter CompositePersistence \\
+            -a sinks=JSONLinesPersistence,MongoPersistence -a model=... -a ...
+
+    Attributes
+    ----------
+    sinks : list of :py:class:`{{ cookiecutter.repo_name }}.persistence.BasePersistence`
+        Persistence objects.
+    workers : list of :py:class:`{{ cookiecutter.repo_name }}.utils.concurrency.BackgroundWorker`
+        Sink workers.
+    """
+    _interface = CompositePersistenceInterface
+
+    def __init__(self, item_name='item', **kwds):
+        """Initialization method.
+
+        Parameters
+        ----------
+        item_name : str
+            Item name.
+        **kwds :
+            Keyword arguments used to construct `CompositePersistenceInterface`.
+            They are also passed to the constructors of sinks
+            specified as classes or names, so every sink picks up
+            the settings defined in its interface.
+        """
+        super().__init__(item_name, **kwds)
+        kwds = { k: v for k, v in kwds.items() if k not in self.interface.schema.schema }
+        sink_kwds = self.sink_kwds or []
+        if len(sink_kwds) > len(self.sinks):
+            raise ValueError("'sink_kwds' has more elements than 'sinks'")
+        self.sinks = []
+        for i, sink in enumerate(self.settings.sinks):
+            if isinstance(sink, str):
+                sink = get_persistence(sink)
+            if isinstance(sink, type):
+                _kwds = sink_kwds[i] if i < len(sink_kwds) else None
+                sink = sink(item_name=item_name, **{ **kwds, **(_kwds or {}) })
+            sink.commit_hooks.append(self._make_commit_hook(i))
+            self.sinks.append(sink)
+        self.workers = [
+            BackgroundWorker(_call, maxsize=self.queue_size,
+                             name=f"{self.__class__.__name__}-{sink.__class__.__name__}-{i}")
+            for i, sink in enumerate(self.sinks)
+        ]
+        self._sink_committed = [ 0 for _ in self.sinks ]
+        self._lock = Lock()
+
+    def _make_commit_hook(self, i):
+        def commit_hook(n):
+            with self._lock:
+                self._sink_committed[i] += n
+                self.notify_committed(min(self._sink_committed) - self.n_committed)
+        return commit_hook
+
+    def prepare(self):
+        """Prepare all sinks."""
+        for sink in self.sinks:
+            sink.prepare()
+
+    def persist(self, doc, print_num=True, **kwds):
+        """Persist an item in all sinks.
+
+        Parameters
+        ----------
+        doc : any
+            Item.
+        print_num : bool
+            Should number of processed items be printed.
+        **kwds :
+            Keyword arguments passed to `persist` methods of sinks.
+        """
+        self.inc(print_num=print_num)
+        for sink, worker in zip(self.sinks, self.workers):
+            worker.submit(sink.persist, copy(doc), print_num=False, **kwds)
+
+    def finalize(self):
+        """Finalize all sinks concurrently and stop the workers.
+
+        All sinks are finalized even if some of them failed.
+        The first exception is reraised afterwards.
+        """
+        errors = []
+        for sink, worker in zip(self.sinks, self.workers):
+            try:
+                worker.submit(sink.finalize)
+            except Exception as exc:    # pylint: disable=broad-except
+                errors.append(exc)
+        for worker in self.workers:
+            try:
+                worker.close()
+            except Exception as exc:    # pylint: disable=broad-except
+                # Failed workers reraise the same exception on every call
+                if not any(exc is e for e in errors):
+                    errors.append(exc)
+        if errors:
+            if self.logger:
+                for exc in errors:
+                    self.logger.error("Sink failed: %r", exc)
+            raise errors[0]
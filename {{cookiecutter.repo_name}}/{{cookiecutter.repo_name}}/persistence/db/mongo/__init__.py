@@ -1,30 +1,64 @@
 """*MongoDB* connector based on *pymongo* and *Mongoengine*
 
+Attributes
+----------
+pool_monitor : :py:class:`{{ cookiecutter.repo_name }}.persistence.db.mongo.pool.PoolMonitor`
+    Connection pool listener registered in clients created with :py:func:`init`.
+
 See Also
 --------
 pymongo
 mongoengine
 """
 import os
+import json
 import re
 import time
 import math
 from collections import Iterable, Mapping
-from pymongo import UpdateOne, UpdateMany
-from pymongo.errors import OperationFailure
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait
+from pymongo import MongoClient, UpdateOne, UpdateMany
+from pymongo.errors import OperationFailure, BulkWriteError
 import mongoengine
-from .utils import update_action_hook, query_factory
+from mongoengine.base import DocumentMetaclass
+from mongoengine.connection import DEFAULT_CONNECTION_NAME
+from .pool import PoolMonitor, get_pool_options
+from .utils import update_action_hook, query_factory, partition_ops
+from .utils import get_failed_ops, is_retryable, backoff_delay, DeadLetterWriter
+from .utils import coalesce_updates, content_hash, dumps_key
 from .interface import MongoPersistenceInterface
+from .batching import AdaptiveBatchController
+from .indexes import check_query_index
 from ....persistence import DBPersistence
+from ....persistence.queues import SpillQueue
+from {{ cookiecutter.repo_name }}.utils.concurrency import BackgroundWorker
+from {{ cookiecutter.repo_name }}.exceptions import FailedWritesError, MissingIndexError
 from {{ cookiecutter.repo_name }}.base.interface import DBPersistenceInterface
 from {{ cookiecutter.repo_name }}.base.interface import DBPersistenceInterface
 from {{ cookiecutter.repo_name }}.base.validators import BaseValidator
+from {{ cookiecutter.repo_name }}.base.abc import AbstractDBConnector, AbstractMongoModel
+
+# Registered here and not in the top-level package, so importing it
+# does not import *pymongo* and *Mongoengine*
+AbstractDBConnector.register(MongoClient)
+AbstractMongoModel.register(DocumentMetaclass)
+
+pool_monitor = PoolMonitor()
+_connections = {}
 
 
 def init(user, password, host, port, db, authentication_db=None,
-         use_envvars=True, handle_double_auth_error=False):
+         use_envvars=True, handle_double_auth_error=False, connect=False,
+         alias=DEFAULT_CONNECTION_NAME, **kwds):
     """Initilize Mongoengine ODM.
 
+    The client is created with `connect=False` by default, so no connection
+    is opened until the first operation. Then it is safe to create the client
+    before forking (i.e. in *Celery* prefork workers), as long as
+    :py:func:`reconnect` is called in every child process
+    before the client is used.
+
     Parameters
     ----------
     user : str
@@ -46,10 +80,25 @@ def init(user, password, host, port, db, authentication_db=None,
         and thus disables any further operations.
         The hacky way to deal with it is just to force log out when
         an operational error of this kind happends and then log again.
+    connect : bool
+        Should connection be opened immediately.
+    alias : str
+        *Mongoengine* connection alias.
+    **kwds :
+        Other client options such as `maxPoolSize`, `minPoolSize`
+        and `waitQueueTimeoutMS` passed to :py:class:`pymongo.MongoClient`.
     """
-    def connect(uri, authentication_source):
+    _connections[alias] = dict(
+        user=user, password=password, host=host, port=port, db=db,
+        authentication_db=authentication_db, use_envvars=use_envvars,
+        handle_double_auth_error=handle_double_auth_error,
+        connect=connect, alias=alias, **kwds
+    )
+    def connect_(uri, authentication_source):
         """Connect to MongoDB."""
-        return mongoengine.connect(host=uri, authentication_source=authentication_db)
+        return mongoengine.connect(host=uri, authentication_source=authentication_db,
+                                   alias=alias, connect=connect,
+                                   event_listeners=[ pool_monitor ], **kwds)
     mongo_uri = 'mongodb://{username}:{password}@{host}:{port}/{db}'
     if not authentication_db:
         authentication_db = db
@@ -60,7 +109,7 @@ def init(user, password, host, port, db, authentication_db=None,
         port=port,
         db=db
     )
-    mongo = connect(uri, authentication_db)
+    mongo = connect_(uri, authentication_db)
     if handle_double_auth_error:
         pass
         # try:
@@ -77,10 +126,102 @@ def init(user, password, host, port, db, authentication_db=None,
         #     raise exc
     return mongo
 
+def reconnect(alias=DEFAULT_CONNECTION_NAME):
+    """Replace client with a new one created with the same settings.
+
+    It should be called in child processes (i.e. on *Celery*
+    `worker_process_init` signal), so they do not use
+    the client (and the connection pool) inherited from the parent process.
+
+    Parameters
+    ----------
+    alias : str
+        *Mongoengine* connection alias.
+
+    Returns
+    -------
+    :py:class:`pymongo.MongoClient` or None
+        New client or `None` if the connection was never initialized.
+    """
+    if alias not in _connections:
+        return None
+    mongoengine.disconnect(alias)
+    return init(**_connections[alias])
+
+def pool_stats(alias=DEFAULT_CONNECTION_NAME, server=False):
+    """Get connection pool statistics of the current process.
+
+    Parameters
+    ----------
+    alias : str
+        *Mongoengine* connection alias.
+    server : bool
+        Should connection statistics reported by the server
+        (`serverStatus` command) be included.
+        This requires a round trip to the server.
+
+    Returns
+    -------
+    dict
+        Pool options and connection counters.
+    """
+    stats = { 'alias': alias, 'initialized': alias in _connections }
+    if not stats['initialized']:
+        return stats
+    client = mongoengine.get_connection(alias)
+    stats.update(options=get_pool_options(client), connections=pool_monitor.stats)
+    if server:
+        status = client.admin.command('serverStatus')
+        stats.update(server=status.get('connections'))
+    return stats
+
 
 class MongoPersistence(DBPersistence):
     """MongoDB persistence class.
 
+    When `n_inflight` setting is positive, full batches are written
+    by a background flusher thread while the next batch is being filled,
+    so the producer is not blocked by round trips to the database
+    unless `n_inflight` batches are already waiting to be written.
+    Errors raised in the flusher thread are reraised
+    on the next flush or on `finalize`.
+
+    When `n_writers` setting is greater than 1, every batch is split
+    into partitions written concurrently by a pool of threads.
+
+    When `adaptive_batching` setting is `True`, batch sizes are controlled
+    by :py:class:`{{ cookiecutter.repo_name }}.persistence.db.mongo.batching.AdaptiveBatchController`
+    based on measured write latencies and *BSON* sizes of documents.
+    Its decisions are logged and available via `stats`.
+
+    When `coalesce` setting is `True`, `$set` updates of the same documents
+    within a batch are merged in arrival order, so only one operation
+    per document is sent.
+
+    When `skip_unchanged` setting is `True`, a content hash is stored
+    in `hash_field` of every document and documents with hashes equal
+    to the cached ones are skipped. The cache is loaded in bulk
+    on `prepare` from `hash_cache` file or from the database
+    (this requires `query` defined with field names).
+    Hashes are cached only after documents are written successfully.
+    In insert mode with *Mongoengine* documents the model
+    must define `hash_field`.
+
+    When `raw_insert` setting is `True`, documents are inserted
+    in insert mode as plain dicts with unordered
+    :py:meth:`pymongo.collection.Collection.insert_many`,
+    skipping construction of *Mongoengine* documents.
+
+    Failed writes are retried (at most `n_retry` times with jittered
+    exponential backoff based on `backoff_time` and `backoff_base` settings).
+    If a bulk write fails only partially, then only the failed operations
+    are retried. Operations failing with non-retryable errors
+    (i.e. duplicate keys) or failing in all attempts are appended
+    to the `dead_letter` file or :py:exc:`{{ cookiecutter.repo_name }}.exceptions.FailedWritesError`
+    is raised if it is not set. Partial failures can not be detected
+    for inserts with *Mongoengine* documents, so the whole batch is retried
+    in this case.
+
     See Also
     --------
     mongoengine
@@ -102,6 +243,73 @@ class MongoPersistence(DBPersistence):
             when `settings=None`.
         """
         super().__init__(item_name, **kwds)
+        self._flusher = None
+        self._writers = None
+        self._dead_letter = None
+        self.hashes = {}
+        self._n_skipped = 0
+        self._n_skipped_pending = 0
+        self.batcher = None
+        if self.adaptive_batching:
+            self.batcher = AdaptiveBatchController(
+                batch_size=self.batch_size if self.batch_size > 0 else None,
+                target_flush_time=self.target_flush_time,
+                max_batch_bytes=self.max_batch_bytes,
+                min_batch_size=self.batch_size_min,
+                max_batch_size=self.batch_size_max,
+                logger=self.logger
+            )
+
+    @property
+    def stats(self):
+        """dict: Persistence statistics."""
+        stats = {
+            'count': self.count,
+            'n_committed': self.n_committed,
+            'queued': len(self.queue)
+        }
+        if self.skip_unchanged:
+            stats['skipped'] = self._n_skipped
+        if self.batcher is not None:
+            stats['batching'] = self.batcher.stats
+        return stats
+
+    @property
+    def flusher(self):
+        """Background flusher getter.
+
+        It is `None` if `n_inflight` is not positive.
+        """
+        if self._flusher is None and self.n_inflight and self.n_inflight > 0:
+            self._flusher = BackgroundWorker(
+                self.write_batch,
+                maxsize=self.n_inflight,
+                name=f"{self.__class__.__name__}-flusher"
+            )
+        return self._flusher
+
+    @property
+    def writers(self):
+        """Thread pool of concurrent writers getter.
+
+        It is `None` if `n_writers` is not greater than 1.
+        """
+        if self._writers is None and self.n_writers and self.n_writers > 1:
+            self._writers = ThreadPoolExecutor(
+                max_workers=self.n_writers,
+                thread_name_prefix=f"{self.__class__.__name__}-writer"
+            )
+        return self._writers
+
+    @property
+    def dead_letter_writer(self):
+        """Dead-letter writer getter.
+
+        It is `None` if `dead_letter` setting is not set.
+        """
+        if self._dead_letter is None and self.dead_letter:
+            self._dead_letter = DeadLetterWriter(self.dead_letter)
+        return self._dead_letter
 
     def persist(self, doc, print_num=True, **kwds):
         """Persist documents in MongoDB in batches.
@@ -118,12 +326,209 @@ class MongoPersistence(DBPersistence):
         self.inc(print_num=print_num)
         if hasattr(self.model, 'from_dict'):
             doc = self.model.from_dict(doc, only_dict=True)
+        if self.skip_unchanged and self.is_unchanged(doc):
+            self._n_skipped += 1
+            self._n_skipped_pending += 1
+            return
+        if self.batcher is not None:
+            self.batcher.add(doc)
         self.queue.appendleft(doc)
         self.do_update(**kwds)
 
     def finalize(self):
-        """Update last batch regardless of the size."""
-        self.do_update(min_batch_size=1)
+        """Update last batch regardless of the size.
+
+        If the background flusher is used, then wait until
+        all batches are written and reraise flusher errors.
+        Background threads and temporary files are released
+        also when writing fails.
+        """
+        try:
+            self.do_update(min_batch_size=1)
+            if self._flusher is not None:
+                self._flusher.close()
+            n_skipped, self._n_skipped_pending = self._n_skipped_pending, 0
+            self.notify_committed(n_skipped)
+            if self.skip_unchanged:
+                if self.hash_cache:
+                    self.save_hashes()
+                if self.logger:
+                    m = f"Skipped {self._n_skipped} unchanged records."
+                    self.logger.info(m)
+        finally:
+            if self._flusher is not None:
+                self._flusher.close(reraise=False)
+                self._flusher = None
+            if self._writers is not None:
+                self._writers.shutdown()
+                self._writers = None
+            if self._dead_letter is not None:
+                self._dead_letter.close()
+            if isinstance(self.queue, SpillQueue):
+                self.queue.close()
+
+    def prepare(self):
+        """Prepare model before update.
+
+        Check indexes serving update queries (see `check_indexes` setting)
+        and load content hashes if `skip_unchanged` setting is `True`.
+
+        Raises
+        ------
+        ValueError
+            If `skip_unchanged` setting is `True` and the model does not
+            define `hash_field` in insert mode without `raw_insert`,
+            as *Mongoengine* documents can not be made with it.
+        """
+        super().prepare()
+        if self.update and self.check_indexes != 'ignore':
+            self.check_query_index()
+        if self.skip_unchanged:
+            if self.hash_field not in self.model._fields:
+                m = (f"Model '{self.model.__name__}' does not define "
+                     f"content hash field '{self.hash_field}'.")
+                if not self.update and not self.raw_insert:
+                    raise ValueError(m)
+                if self.logger:
+                    self.logger.warning(m)
+            self.load_hashes()
+
+    def check_query_index(self):
+        """Check if update queries are served by an index.
+
+        Returns
+        -------
+        str or None
+            Name of the index. `None` if there is no such index
+            or the check could not be done (i.e. for query functions
+            without known fields).
+
+        Raises
+        ------
+        {{ cookiecutter.repo_name }}.exceptions.MissingIndexError
+            If there is no index and `check_indexes` is `'fail'`.
+        """
+        fields = getattr(self.query, 'fields', None)
+        if not fields:
+            return None
+        try:
+            index = check_query_index(self.model, fields)
+        except OperationFailure as exc:
+            if self.logger:
+                self.logger.warning("Could not check indexes: %s", exc)
+            return None
+        if index is None:
+            name = self.model._get_collection_name()
+            m = (f"Update query fields ({', '.join(fields)}) of collection '{name}' "
+                 f"are not indexed, so every update is a collection scan. "
+                 f"Declare indexes in the model and run 'db mongo ensure-indexes'.")
+            if self.check_indexes == 'fail':
+                raise MissingIndexError(m, collection=name, fields=fields)
+            if self.logger:
+                self.logger.warning(m)
+        return index
+
+    def load_hashes(self):
+        """Load cache of content hashes.
+
+        It is loaded from `hash_cache` file if it exists
+        or otherwise from the database.
+        """
+        if self.hash_cache and os.path.exists(self.hash_cache):
+            with open(self.hash_cache) as f:
+                self.hashes = json.load(f)
+            return
+        fields = getattr(self.query, 'fields', None)
+        if not fields:
+            if self.logger:
+                m = "Content hashes can not be loaded for custom query functions."
+                self.logger.warning(m)
+            return
+        db_fields = { f: self.get_db_field(f) for f in fields }
+        hash_field = self.get_db_field(self.hash_field)
+        projection = { f: 1 for f in db_fields.values() }
+        projection.update({ hash_field: 1, '_id': 0 })
+        cursor = self.model._get_collection().find(
+            { hash_field: { '$exists': True } },
+            projection=projection,
+            batch_size=10000
+        )
+        hashes = {}
+        for doc in cursor:
+            key = dumps_key({ f: doc.get(db_f) for f, db_f in db_fields.items() })
+            hashes[key] = doc[hash_field]
+        self.hashes = hashes
+        if self.logger:
+            m = f"Loaded {len(hashes)} content hashes."
+            self.logger.info(m)
+
+    def save_hashes(self):
+        """Save cache of content hashes to `hash_cache` file."""
+        tmp_path = self.hash_cache + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.hashes, f)
+        os.replace(tmp_path, self.hash_cache)
+
+    def get_db_field(self, name):
+        """Get database field name of a model field."""
+        field = self.model._fields.get(name)
+        return field.db_field if field is not None else name
+
+    def get_hash_key(self, doc):
+        """Get key of a document in the cache of content hashes.
+
+        Parameters
+        ----------
+        doc : Mapping
+            Document normalized according to the model.
+        """
+        fields = getattr(self.query, 'fields', None)
+        if fields:
+            query = { f: doc.get(f) for f in fields }
+        else:
+            query = self.query(dict(doc))
+        return dumps_key(query)
+
+    def is_unchanged(self, doc):
+        """Check if document content is unchanged.
+
+        Content hash is stored in `hash_field` of the document.
+        It is cached when the document is written
+        (see :py:meth:`record_hashes`).
+
+        Parameters
+        ----------
+        doc : dict
+            Document normalized according to the model.
+        """
+        hash_ = content_hash(doc, exclude=(self.hash_field,))
+        doc[self.hash_field] = hash_
+        return self.hashes.get(self.get_hash_key(doc)) == hash_
+
+    def record_hashes(self, hashes, ops, failed, update):
+        """Cache content hashes of successfully written documents.
+
+        Parameters
+        ----------
+        hashes : list of tuples
+            Pairs of keys and content hashes of written documents.
+        ops : list
+            Write operations or documents made from the documents.
+            In insert mode they are in the same order as `hashes`.
+        failed : list of tuples
+            Pairs of failed operations and error details.
+        update : bool
+            Were `ops` update operations.
+        """
+        if update:
+            # Update queries are the keys, also for coalesced updates
+            failed_keys = { dumps_key(op._filter) for op, _ in failed }
+        else:
+            op_keys = { id(op): key for op, (key, _) in zip(ops, hashes) }
+            failed_keys = { op_keys[id(op)] for op, _ in failed }
+        for key, hash_ in hashes:
+            if key not in failed_keys:
+                self.hashes[key] = hash_
 
     def make_update_op(self, doc, multiple=None, upsert=None, **kwds):
         """Make :py:module:`pymongo` update op.
@@ -139,38 +544,204 @@ class MongoPersistence(DBPersistence):
         **kwds :
             Other arguments passed to :py:class:`UpdateOne` or :py:class:`UpdateMany`.
         """
+        return self.make_op(self.query(doc), self.processor(doc),
+                            multiple=multiple, upsert=upsert, **kwds)
+
+    def make_op(self, update_query, update, multiple=None, upsert=None, **kwds):
+        """Make :py:module:`pymongo` update op from a query and an update.
+
+        Parameters
+        ----------
+        update_query : Mapping
+            Update query (filter).
+        update : Mapping
+            Update document.
+        multiple : bool
+            Should :py:class:`UpdateOne` or :py:class:`UpdateMany` be used.
+        upsert : bool
+            Should upsert mode be used instead of update.
+        **kwds :
+            Other arguments passed to :py:class:`UpdateOne` or :py:class:`UpdateMany`.
+        """
         if multiple is None:
             multiple = self.multiple
         if upsert is None:
             upsert = self.upsert
-        update_query = self.query(doc)
-        update = self.processor(doc)
         if multiple:
             op = UpdateMany(update_query, update, upsert=upsert, **kwds)
         else:
             op = UpdateOne(update_query, update, upsert=upsert, **kwds)
         return op
 
-    def make_bulk_update(self, bulk_write_kwds=None, **kwds):
-        """Make bulk update.
+    def make_bulk_update(self, docs, coalesce=None, **kwds):
+        """Make bulk update operations.
 
         Parameters
         ----------
-        bulk_write_kwds : dict or None
-            Arguments passed to :py:func:`pymongo.bulk_write`.
-            If `None` then `ordered=False` is passed.
+        docs : list of Mapping
+            Documents to update.
+        coalesce : bool or None
+            Should updates of the same documents be coalesced.
+            Use configuration value if `None`.
         **kwds :
             Other arguments passed to
             :py:meth:`{{ cookiecutter.repo_name }}.persistence.db.mongo.MongoPersistence.make_update.op`.
+
+        Returns
+        -------
+        list
+            :py:module:`pymongo` update operations.
+        """
+        if coalesce is None:
+            coalesce = self.coalesce
+        multiple = kwds.get('multiple')
+        if multiple is None:
+            multiple = self.multiple
+        if not coalesce or multiple:
+            return [ self.make_update_op(doc, **kwds) for doc in docs ]
+        updates = coalesce_updates(
+            (self.query(doc), self.processor(doc)) for doc in docs
+        )
+        if self.logger and len(updates) < len(docs):
+            m = f"Coalesced {len(docs)} updates into {len(updates)} operations."
+            self.logger.debug(m)
+        return [ self.make_op(q, u, **kwds) for q, u in updates ]
+
+    def bulk_write(self, ops, bulk_write_kwds=None):
+        """Execute bulk write operations.
+
+        Parameters
+        ----------
+        ops : list
+            :py:module:`pymongo` write operations.
+        bulk_write_kwds : dict or None
+            Arguments passed to :py:func:`pymongo.bulk_write`.
+            If `None` then `ordered=False` is passed.
+
+        Returns
+        -------
+        list of tuples
+            Pairs of failed operations and error details.
         """
         if bulk_write_kwds is None:
             bulk_write_kwds = { 'ordered': False }
-        bulk_ops = []
-        while self.queue:
-            op = self.make_update_op(self.queue.pop(), **kwds)
-            bulk_ops.append(op)
-        if bulk_ops:
-            self.model._get_collection().bulk_write(bulk_ops, **bulk_write_kwds)
+        if not ops:
+            return []
+        func = partial(
+            self.try_write,
+            self.model._get_collection().bulk_write,
+            **bulk_write_kwds
+        )
+        if self.writers is None or len(ops) < 2:
+            return func(ops)
+        parts = partition_ops(ops, self.n_writers)
+        return self.run_concurrently(func, parts)
+
+    @staticmethod
+    def try_write(func, ops, **kwds):
+        """Run bulk write function and collect failed operations.
+
+        Parameters
+        ----------
+        func : callable
+            Bulk write function.
+        ops : list
+            Write operations or documents.
+        **kwds :
+            Keyword arguments passed to `func`.
+
+        Returns
+        -------
+        list of tuples
+            Pairs of failed operations and error details.
+
+        Raises
+        ------
+        pymongo.errors.BulkWriteError
+            If the error does not report failed operations
+            (i.e. only write concern errors).
+        """
+        try:
+            func(ops, **kwds)
+        except BulkWriteError as exc:
+            failed = get_failed_ops(ops, exc.details, ordered=kwds.get('ordered', True))
+            if not failed:
+                raise
+            return failed
+        return []
+
+    def make_raw_doc(self, doc):
+        """Make raw *MongoDB* document from a normalized dict.
+
+        Field names are mapped to database field names
+        and class name is added for models allowing inheritance.
+
+        Parameters
+        ----------
+        doc : Mapping
+            Document normalized according to the model.
+        """
+        fields = self.model._fields
+        raw = {}
+        for k, v in doc.items():
+            field = fields.get(k)
+            raw[field.db_field if field is not None else k] = v
+        if self.model._meta.get('allow_inheritance'):
+            raw['_cls'] = self.model._class_name
+        return raw
+
+    def insert(self, docs):
+        """Insert documents.
+
+        Parameters
+        ----------
+        docs : list of :py:class:`mongoengine.Document` or dicts
+            Documents to insert. Raw documents (dicts) are expected
+            if `raw_insert` setting is `True`.
+
+        Returns
+        -------
+        list of tuples
+            Pairs of failed documents and error details.
+            Always empty for *Mongoengine* documents, which
+            raise errors for the whole batch instead.
+        """
+        if not docs:
+            return []
+        if self.raw_insert:
+            func = partial(
+                self.try_write,
+                self.model._get_collection().insert_many,
+                ordered=False
+            )
+        else:
+            def func(docs):
+                self.model.objects.insert(docs)
+                return []
+        if self.writers is None or len(docs) < 2:
+            return func(docs)
+        n = self.n_writers
+        parts = [ docs[i::n] for i in range(n) if docs[i::n] ]
+        return self.run_concurrently(func, parts)
+
+    def run_concurrently(self, func, parts, **kwds):
+        """Run function over partitions of operations in the writers pool.
+
+        All partitions are waited for and the first error is reraised.
+        Otherwise results (lists) are concatenated.
+
+        Parameters
+        ----------
+        func : callable
+            Function called on every partition.
+        parts : list
+            Partitions.
+        **kwds :
+            Keyword arguments passed to `func`.
+        """
+        futures = [ self.writers.submit(func, part, **kwds) for part in parts ]
+        wait(futures)
+        return [ x for future in futures for x in future.result() ]
 
     def do_update(self, min_batch_size=None, update=None, **kwds):
         """Persist a batch of documents in MongoDB.
@@ -180,22 +751,27 @@ class MongoPersistence(DBPersistence):
         min_batch_size : int or None
             Minimal batch size.
             No minimal size if non-positive.
-            Use configuration value if `None`.
+            Use configuration value (or adaptive batch size) if `None`.
         update : bool
             Should update mode be used instead of insert.
         **kwds :
-            Parameters passed to `make_bulk_update`.
+            Parameters passed to `write_batch`.
 
         Returns
         -------
         bool
-            True if successful update has been done.
+            True if a batch has been flushed.
+            If the background flusher is used this means only
+            that the batch was handed over to the flusher.
         """
         if update is None:
             update = self.update
-        coll_name = self.model._get_collection_name()
         n_docs = len(self.queue)
         # Check if update should be done considering selected batch size
+        if min_batch_size is None and self.batcher is not None:
+            if not self.batcher.should_flush(n_docs):
+                return False
+            min_batch_size = 1
         if min_batch_size is None:
             if not self.batch_size or self.batch_size <= 0:
                 min_batch_size = math.inf
@@ -203,38 +779,136 @@ class MongoPersistence(DBPersistence):
                 min_batch_size = self.batch_size
         elif min_batch_size <= 0:
             min_batch_size = math.inf
-        if n_docs < min_batch_size:
+        if n_docs < min_batch_size or n_docs == 0:
             return False
-        # Perform update
-        n_attempts = 1 + self.n_retry
+        n_bytes = self.batcher.take() if self.batcher is not None else None
+        n_skipped, self._n_skipped_pending = self._n_skipped_pending, 0
+        kwds = { 'update': update, 'n_bytes': n_bytes, 'n_skipped': n_skipped, **kwds }
+        # Stream large (possibly spilled) queues in chunks
+        chunk_size = self.flush_chunk_size if self.max_queue_memory else n_docs
+        n_total = n_docs
+        while n_docs > 0:
+            docs = [ self.queue.pop() for _ in range(min(chunk_size, n_docs)) ]
+            n_docs -= len(docs)
+            if n_bytes is not None:
+                kwds['n_bytes'] = n_bytes * len(docs) // n_total
+            if self.flusher is not None:
+                self.flusher.submit(docs, **kwds)
+            else:
+                self.write_batch(docs, **kwds)
+            kwds['n_skipped'] = 0
+        return True
+
+    def write_batch(self, docs, update=None, bulk_write_kwds=None,
+                    n_bytes=None, n_skipped=0, **kwds):
+        """Write a batch of documents to MongoDB.
+
+        Parameters
+        ----------
+        docs : list of Mapping
+            Documents to write.
+        update : bool
+            Should update mode be used instead of insert.
+        bulk_write_kwds : dict or None
+            Arguments passed to `bulk_write`.
+        n_bytes : int or None
+            Size of documents in bytes reported to the adaptive batch controller.
+        n_skipped : int
+            Number of unchanged documents skipped before the batch
+            (or after the previous one) reported as committed with it.
+        **kwds :
+            Parameters passed to `make_bulk_update`.
+        """
+        if update is None:
+            update = self.update
+        coll_name = self.model._get_collection_name()
+        n_docs = len(docs)
+        if self.skip_unchanged:
+            # Keys are taken before update queries pop fields from documents
+            hashes = [ (self.get_hash_key(doc), doc[self.hash_field]) for doc in docs ]
+        if not update and self.raw_insert:
+            ops = [ self.make_raw_doc(doc) for doc in docs ]
+        elif not update:
+            ops = [ self.model(**doc) for doc in docs ]
+        else:
+            ops = self.make_bulk_update(docs, **kwds)
+        n_attempts = 1 + max(self.n_retry, 0)
         attempt = 0
-        exc = None
-        while attempt < n_attempts:
+        elapsed = 0
+        pending = ops
+        failed = []
+        while pending:
             attempt += 1
+            n_left = n_attempts - attempt
             try:
+                t0 = time.perf_counter()
                 if not update:
-                    docs = [ self.model(**self.queue.pop()) for _ in range(n_docs) ]
-                    self.model.objects.insert(docs)
+                    errors = self.insert(pending)
                 else:
-                    self.make_bulk_update(**kwds)
-                exc = None
-                break
-            except Exception as exc:
-                n_left = n_attempts - attempt
+                    errors = self.bulk_write(pending, bulk_write_kwds=bulk_write_kwds)
+                elapsed += time.perf_counter() - t0
+            except Exception:
                 if n_attempts == 1:
                     m = f"Update attempt for collection '{coll_name}' failed."
                 elif n_left > 0:
                     m = f"Update attempt no. {attempt} for collection '{coll_name}' failed. Retrying {n_left} times."
                 else:
-                    m = f"Last update attempt for collection '{coll_name}' (no. {attempt} failed. Stop trying."
+                    m = f"Last update attempt for collection '{coll_name}' (no. {attempt}) failed. Stop trying."
                 if self.logger:
                     self.logger.exception(m)
-        if exc:
-            raise exc
-        m = f"Updated {n_docs} records in collection '{coll_name}' ({self.count} in total)."
+                if n_left <= 0:
+                    raise
+                time.sleep(backoff_delay(attempt, self.backoff_time, self.backoff_base))
+                continue
+            retry = []
+            for op, error in errors:
+                if n_left > 0 and is_retryable(error):
+                    retry.append(op)
+                else:
+                    failed.append((op, error))
+            if retry:
+                m = (f"{len(retry)} of {len(pending)} operations failed in attempt "
+                     f"no. {attempt} for collection '{coll_name}'. Retrying {n_left} times.")
+                if self.logger:
+                    self.logger.warning(m)
+                time.sleep(backoff_delay(attempt, self.backoff_time, self.backoff_base))
+            pending = retry
+        if self.skip_unchanged:
+            self.record_hashes(hashes, ops, failed, update)
+        if failed:
+            self.handle_failed(failed)
+        if self.batcher is not None:
+            self.batcher.record(n_docs, n_bytes or 0, elapsed)
+        self.notify_committed(n_docs + n_skipped)
+        m = f"Updated {n_docs - len(failed)} records in collection '{coll_name}' ({self.count} in total)."
         if self.logger:
             self.logger.info(m)
 
+    def handle_failed(self, failed):
+        """Handle permanently failed write operations.
+
+        Parameters
+        ----------
+        failed : list of tuples
+            Pairs of failed operations and error details.
+
+        Raises
+        ------
+        {{ cookiecutter.repo_name }}.exceptions.FailedWritesError
+            If `dead_letter` setting is not set.
+        """
+        coll_name = self.model._get_collection_name()
+        if self.dead_letter_writer is None:
+            raise FailedWritesError(
+                f"{len(failed)} write operations for collection '{coll_name}' failed",
+                failed
+            )
+        self.dead_letter_writer.write(failed, collection=coll_name)
+        m = (f"{len(failed)} failed write operations for collection "
+             f"'{coll_name}' written to '{self.dead_letter}'.")
+        if self.logger:
+            self.logger.warning(m)
+
     def get_model_name(self):
         """Get collection model name."""
         return self.model._get_collection_name()
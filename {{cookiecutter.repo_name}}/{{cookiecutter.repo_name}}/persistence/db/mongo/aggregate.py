@@ -0,0 +1,160 @@
+"""Streaming runner of *MongoDB* aggregation pipelines.
+
+Results of a pipeline are either streamed from a raw cursor
+as JSON lines (see :py:mod:`{{ cookiecutter.repo_name }}.persistence.db.mongo.export`)
+or written by the server into another collection
+with a `$merge` or `$out` stage, so they never have to pass
+through the client.
+
+Attributes
+----------
+INTO_MODES : tuple of str
+    Supported stages writing results into a collection.
+"""
+import time
+from .export import write_documents
+from .explain import explain, aggregate_command, summarize
+
+INTO_MODES = ('merge', 'out')
+
+
+def into_stage(into, mode='merge', on=None, when_matched='replace',
+               when_not_matched='insert'):
+    """Make a stage writing results into a collection.
+
+    Parameters
+    ----------
+    into : str
+        Name of the target collection. It may be prefixed
+        with a database name (`db.collection`).
+    mode : {'merge', 'out'}
+        `$merge` merges results into the collection.
+        `$out` replaces the collection with the results.
+    on : str or list of str or None
+        Fields identifying documents in `$merge`. Defaults to `_id`.
+    when_matched : str
+        `whenMatched` action of `$merge`.
+    when_not_matched : str
+        `whenNotMatched` action of `$merge`.
+    """
+    if mode not in INTO_MODES:
+        raise ValueError(f"Unknown mode '{mode}'")
+    db, _, coll = into.rpartition('.')
+    target = { 'db': db, 'coll': coll } if db else coll
+    if mode == 'out':
+        return { '$out': target }
+    stage = {
+        'into': target,
+        'whenMatched': when_matched,
+        'whenNotMatched': when_not_matched
+    }
+    if on:
+        stage['on'] = on
+    return { '$merge': stage }
+
+def make_options(allow_disk_use=True, batch_size=None, max_time_ms=None, **kwds):
+    """Make options of :py:meth:`pymongo.collection.Collection.aggregate`.
+
+    Parameters
+    ----------
+    allow_disk_use : bool
+        Should stages be allowed to spill to temporary files
+        instead of failing on the memory limit.
+    batch_size : int or None
+        Number of documents returned in a single batch of the cursor.
+    max_time_ms : int or None
+        Time limit of the aggregation on the server in milliseconds.
+    **kwds :
+        Other options.
+    """
+    options = { 'allowDiskUse': allow_disk_use, **kwds }
+    if batch_size:
+        options['batchSize'] = batch_size
+    if max_time_ms:
+        options['maxTimeMS'] = max_time_ms
+    return options
+
+def execution_stats(collection, pipeline, **kwds):
+    """Get server-side execution statistics of a pipeline.
+
+    The pipeline is run by the server with `explain`
+    in the `executionStats` verbosity, so it is executed once again
+    (but results are not returned nor written).
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    pipeline : list of dict
+        Pipeline without stages writing results.
+    **kwds :
+        Options passed to the `aggregate` command.
+
+    Returns
+    -------
+    dict
+        Summary of the execution statistics (see
+        :py:func:`{{ cookiecutter.repo_name }}.persistence.db.mongo.explain.summarize`).
+        Raw explain output is available under `explain` key.
+    """
+    res = explain(collection, aggregate_command(collection, pipeline, **kwds))
+    return { **summarize(res), 'explain': res }
+
+def run_aggregation(collection, pipeline, stream=None, into=None, into_mode='merge',
+                    into_kwds=None, mode='plain', stats=False, **kwds):
+    """Run aggregation pipeline and stream results.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    pipeline : list of dict
+        Aggregation pipeline.
+    stream : file-like or None
+        Binary writable stream for JSON lines.
+        Results are consumed and discarded if `None` and `into` is not set.
+    into : str or None
+        Target collection. If set, then a `$merge` or `$out` stage
+        is appended to the pipeline and no results are returned.
+    into_mode : {'merge', 'out'}
+        Stage writing results into `into` collection.
+    into_kwds : dict or None
+        Other arguments passed to :py:func:`into_stage`.
+    mode : {'plain', 'relaxed', 'canonical'}
+        JSON serialization mode.
+    stats : bool
+        Should server-side execution statistics be included
+        (see :py:func:`execution_stats`).
+    **kwds :
+        Options passed to :py:func:`make_options`.
+
+    Returns
+    -------
+    dict
+        Client-side statistics: number of results,
+        elapsed time and the target collection count (if `into` is set)
+        and optionally server-side statistics under `server` key.
+    """
+    options = make_options(**kwds)
+    run_pipeline = list(pipeline)
+    if into:
+        run_pipeline.append(into_stage(into, into_mode, **(into_kwds or {})))
+    start = time.monotonic()
+    cursor = collection.aggregate(run_pipeline, **options)
+    try:
+        if into or stream is None:
+            n = sum(1 for _ in cursor)
+        else:
+            n = write_documents(cursor, stream, mode=mode,
+                                block_size=options.get('batchSize', 1000))
+    finally:
+        cursor.close()
+    res = { 'n_results': n, 'elapsed': time.monotonic() - start }
+    if into:
+        db, _, coll = into.rpartition('.')
+        target = collection.database.client[db] if db else collection.database
+        res.update(into=into, into_count=target[coll].estimated_document_count())
+    if stats:
+        res['server'] = execution_stats(collection, list(pipeline), **options)
+    return res
+
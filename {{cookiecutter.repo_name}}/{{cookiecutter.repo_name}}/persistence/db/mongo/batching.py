@@ -0,0 +1,220 @@
+"""Adaptive batch sizing for *MongoDB* bulk writes.
+
+Attributes
+----------
+MAX_BATCH_BYTES : int
+    Maximum size of a *MongoDB* document (and a single write command message
+    payload) in bytes.
+MAX_BATCH_SIZE : int
+    Maximum number of operations in a single *MongoDB* write command.
+"""
+from threading import Lock
+from bson import BSON
+from bson.errors import InvalidDocument
+
+MAX_BATCH_BYTES = 16*1024*1024
+MAX_BATCH_SIZE = 100000
+
+
+class AdaptiveBatchController:
+    """Adaptive batch size controller.
+
+    The controller tracks encoded *BSON* size of queued documents
+    and measured latencies of flushes. After every flush the batch size is
+    set so the next flush should take about `target_flush_time` seconds
+    given the smoothed write throughput, but without exceeding
+    the bytes budget given the smoothed document size.
+    The batch size is always kept within `min_batch_size` and `max_batch_size`
+    and may change at most by `max_step` factor at once,
+    so single outliers do not cause oscillations.
+
+    Attributes
+    ----------
+    batch_size : int
+        Current batch size.
+    target_flush_time : float
+        Target duration of a single flush in seconds.
+    max_batch_bytes : int
+        Maximum size of a batch in bytes.
+    min_batch_size : int
+        Minimum batch size.
+    max_batch_size : int
+        Maximum batch size.
+    smoothing : float
+        Weight of the most recent observation in exponential
+        moving averages. Must be in `(0, 1]`.
+    max_step : float
+        Maximum factor of batch size change after a single flush.
+    tolerance : float
+        Minimum relative change of batch size that is applied.
+        Smaller changes are ignored to avoid needless resizing.
+    logger : :py:class:`logging.Logger` or None
+        Optional logger object used to report decisions.
+    pending_bytes : int
+        Total size of documents queued since the last flush.
+    """
+    def __init__(self, batch_size=None, target_flush_time=1.0,
+                 max_batch_bytes=MAX_BATCH_BYTES//2, min_batch_size=100,
+                 max_batch_size=MAX_BATCH_SIZE, smoothing=.3, max_step=2,
+                 tolerance=.1, logger=None):
+        """Initialization method.
+
+        Parameters
+        ----------
+        batch_size : int or None
+            Initial batch size. Defaults to `min_batch_size`.
+        **Other parameters** are described in class attributes.
+        """
+        if min_batch_size < 1 or max_batch_size < min_batch_size:
+            raise ValueError("Incorrect batch size bounds")
+        if not 0 < smoothing <= 1:
+            raise ValueError("'smoothing' must be in (0, 1]")
+        self.target_flush_time = target_flush_time
+        self.max_batch_bytes = min(max_batch_bytes, MAX_BATCH_BYTES)
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = min(max_batch_size, MAX_BATCH_SIZE)
+        self.smoothing = smoothing
+        self.max_step = max_step
+        self.tolerance = tolerance
+        self.logger = logger
+        self.batch_size = self.clip(batch_size or min_batch_size)
+        self.pending_bytes = 0
+        self._lock = Lock()
+        self._doc_bytes = None
+        self._latency = None
+        self._throughput = None
+        self._n_flushes = 0
+        self._n_resizes = 0
+        self._n_docs = 0
+        self._n_bytes = 0
+        self._total_time = 0
+
+    @property
+    def stats(self):
+        """dict: Statistics and current state of the controller."""
+        return {
+            'batch_size': self.batch_size,
+            'n_flushes': self._n_flushes,
+            'n_resizes': self._n_resizes,
+            'n_docs': self._n_docs,
+            'n_bytes': self._n_bytes,
+            'total_time': self._total_time,
+            'avg_doc_bytes': self._doc_bytes,
+            'avg_latency': self._latency,
+            'docs_per_sec': self._throughput
+        }
+
+    def clip(self, n):
+        """Clip batch size to the bounds."""
+        return int(max(self.min_batch_size, min(self.max_batch_size, n)))
+
+    def add(self, doc):
+        """Register a queued document.
+
+        Parameters
+        ----------
+        doc : Mapping
+            Document. Its size is estimated with the average
+            document size if it can not be encoded as *BSON*.
+
+        Returns
+        -------
+        int
+            Size of the document in bytes.
+        """
+        try:
+            n_bytes = len(BSON.encode(doc))
+        except (InvalidDocument, TypeError):
+            n_bytes = int(self._doc_bytes or 0)
+        self.pending_bytes += n_bytes
+        return n_bytes
+
+    def should_flush(self, n_docs):
+        """Check if a batch of queued documents should be flushed.
+
+        Parameters
+        ----------
+        n_docs : int
+            Number of queued documents.
+        """
+        return n_docs >= self.batch_size or self.pending_bytes >= self.max_batch_bytes
+
+    def take(self):
+        """Take size of pending documents when a batch is drained.
+
+        Returns
+        -------
+        int
+            Size of the drained documents in bytes.
+        """
+        n_bytes, self.pending_bytes = self.pending_bytes, 0
+        return n_bytes
+
+    def record(self, n_docs, n_bytes, elapsed):
+        """Record a flush and resize batches.
+
+        This may be called from a different thread than
+        the other methods.
+
+        Parameters
+        ----------
+        n_docs : int
+            Number of flushed documents.
+        n_bytes : int
+            Size of flushed documents in bytes.
+        elapsed : float
+            Duration of the flush in seconds.
+
+        Returns
+        -------
+        int
+            New batch size.
+        """
+        if n_docs <= 0:
+            return self.batch_size
+        with self._lock:
+            self._n_flushes += 1
+            self._n_docs += n_docs
+            self._n_bytes += n_bytes
+            self._total_time += elapsed
+            self._doc_bytes = self._smooth(self._doc_bytes, n_bytes / n_docs)
+            self._latency = self._smooth(self._latency, elapsed)
+            if elapsed > 0:
+                self._throughput = self._smooth(self._throughput, n_docs / elapsed)
+            old = self.batch_size
+            new = self.propose(old)
+            at_bound = new in (self.min_batch_size, self.max_batch_size)
+            if new != old and (at_bound or abs(new - old) > self.tolerance*old):
+                self.batch_size = new
+                self._n_resizes += 1
+            else:
+                return old
+        if self.logger:
+            m = (f"Adaptive batching: batch size {old} -> {new} "
+                 f"(last flush: {n_docs} docs, {n_bytes} bytes, {elapsed:.3f}s; "
+                 f"avg: {self._throughput or 0:.1f} docs/s, "
+                 f"{self._doc_bytes or 0:.0f} bytes/doc).")
+            self.logger.info(m)
+        return new
+
+    def propose(self, current):
+        """Propose new batch size based on current estimates.
+
+        Parameters
+        ----------
+        current : int
+            Current batch size.
+        """
+        target = current
+        if self._throughput:
+            target = self._throughput * self.target_flush_time
+        if self._doc_bytes:
+            target = min(target, self.max_batch_bytes / self._doc_bytes)
+        if self.max_step and self.max_step > 1:
+            target = max(current / self.max_step, min(current * self.max_step, target))
+        return self.clip(target)
+
+    def _smooth(self, avg, value):
+        if avg is None:
+            return value
+        return self.smoothing*value + (1 - self.smoothing)*avg
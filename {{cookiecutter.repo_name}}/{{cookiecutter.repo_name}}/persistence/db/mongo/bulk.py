@@ -0,0 +1,261 @@
+"""Bulk updates of *MongoDB* collections driven by JSON lines files.
+
+Every line of an input file is an update record::
+
+    {"filter": {...}, "update": {...}, "upsert": false}
+
+Records are parsed as *MongoDB* Extended JSON (so i.e. `{"$oid": ...}`
+values are understood), grouped into unordered `bulk_write` batches
+and the batches are executed concurrently in a thread pool.
+
+Failed operations are written to a reject file with
+:py:class:`{{ cookiecutter.repo_name }}.persistence.db.mongo.utils.DeadLetterWriter`.
+Rejected write operations keep the input record format (with additional
+`error` field), so a reject file written with :py:class:`ExtendedJSONEncoder`
+may be fed back to :py:func:`bulk_update` once the cause of the failures is fixed.
+Invalid input lines can not be replayed as they are, so they are not
+written to the reject file, but verbatim to a separate stream.
+"""
+import sys
+import bz2
+import gzip
+import lzma
+import time
+import json
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from bson import json_util
+from pymongo import UpdateOne, UpdateMany
+from pymongo.errors import BulkWriteError, PyMongoError
+from .export import infer_compression
+from .utils import get_failed_ops
+
+_READERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open
+}
+
+
+class ExtendedJSONEncoder(json.JSONEncoder):
+    """JSON encoder writing *BSON* types as *MongoDB* Extended JSON."""
+    def default(self, o):
+        return json_util.default(o)
+
+
+def open_input(path=None, compression=None):
+    """Open text input stream.
+
+    Parameters
+    ----------
+    path : str or None
+        Input file path. Standard input is used if `None` or `'-'`.
+    compression : {'gzip', 'bz2', 'xz'} or None
+        Compression. Inferred from the file extension if `None`.
+    """
+    if compression is not None and compression not in _READERS:
+        raise ValueError(f"Unknown compression '{compression}'")
+    if path in (None, '-'):
+        return sys.stdin
+    if compression is None:
+        compression = infer_compression(path)
+    if compression:
+        return _READERS[compression](path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def make_update_op(record, multiple=False):
+    """Make update operation from a record.
+
+    Parameters
+    ----------
+    record : Mapping
+        Record with `filter` and `update` and optional `upsert` fields.
+    multiple : bool
+        Should `UpdateMany` be used instead of `UpdateOne`.
+        It may be overriden by a `multi` field of the record.
+
+    Raises
+    ------
+    ValueError
+        If the record is not valid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record is not a JSON object")
+    missing = [ k for k in ('filter', 'update') if k not in record ]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    op_cls = UpdateMany if record.get('multi', multiple) else UpdateOne
+    try:
+        return op_cls(record['filter'], record['update'],
+                      upsert=bool(record.get('upsert', False)))
+    except (TypeError, ValueError) as exc:
+        raise ValueError(str(exc))
+
+def read_ops(lines, multiple=False, on_invalid=None):
+    """Parse JSON lines into update operations.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        JSON lines with update records. Empty lines are skipped.
+    multiple : bool
+        Default multiple mode. See :py:func:`make_update_op`.
+    on_invalid : callable or None
+        Function called with line number (starting from 1),
+        line and an error for every invalid line.
+        Invalid lines are skipped silently if `None`.
+
+    Yields
+    ------
+    :py:class:`pymongo.UpdateOne` or :py:class:`pymongo.UpdateMany`
+        Update operations.
+    """
+    for i, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield make_update_op(json_util.loads(line), multiple=multiple)
+        except ValueError as exc:
+            if on_invalid:
+                on_invalid(i, line, exc)
+
+def iter_batches(iterable, batch_size):
+    """Iterate over lists of at most `batch_size` consecutive items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def write_batch(collection, ops):
+    """Execute unordered bulk write of update operations.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    ops : list
+        Update operations.
+
+    Returns
+    -------
+    dict
+        Matched, modified and upserted counts and pairs of failed operations
+        and error details under `failed` key. If the bulk write fails
+        with an error not related to single operations (i.e. a network error)
+        then all operations are reported as failed, even though some
+        of them may have been applied (updates should be idempotent
+        to be safely retried).
+
+    Raises
+    ------
+    pymongo.errors.BulkWriteError
+        If the error does not report failed operations
+        (i.e. only write concern errors).
+    """
+    try:
+        res = collection.bulk_write(ops, ordered=False)
+    except BulkWriteError as exc:
+        failed = get_failed_ops(ops, exc.details, ordered=False)
+        if not failed:
+            raise
+        return {
+            'matched': exc.details.get('nMatched', 0),
+            'modified': exc.details.get('nModified', 0),
+            'upserted': exc.details.get('nUpserted', 0),
+            'failed': failed
+        }
+    except PyMongoError as exc:
+        error = { 'errmsg': str(exc) }
+        return { 'matched': 0, 'modified': 0, 'upserted': 0,
+                 'failed': [ (op, error) for op in ops ] }
+    return {
+        'matched': res.matched_count,
+        'modified': res.modified_count,
+        'upserted': res.upserted_count,
+        'failed': []
+    }
+
+def bulk_update(collection, lines, batch_size=1000, workers=4, multiple=False,
+                reject=None, invalid=None, callback=None):
+    """Run bulk updates from JSON lines.
+
+    Input is read lazily and at most two batches per worker
+    are in flight, so memory usage does not depend on the input size.
+
+    Batches are unordered and executed concurrently, so the order
+    of operations is not preserved. If several operations match
+    the same documents (i.e. a corrections file with repeated filters),
+    the final state is not deterministic, unless the operations commute.
+    Such input should be deduplicated first.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    lines : iterable of str
+        JSON lines with update records.
+    batch_size : int
+        Number of operations in a single `bulk_write` call.
+    workers : int
+        Number of concurrently executed batches.
+    multiple : bool
+        Default multiple mode. See :py:func:`make_update_op`.
+    reject : :py:class:`{{ cookiecutter.repo_name }}.persistence.db.mongo.utils.DeadLetterWriter` or None
+        Writer of failed operations.
+    invalid : file-like or None
+        Text stream to which invalid lines are written verbatim,
+        so they may be fixed and fed back.
+    callback : callable or None
+        Function called with the current statistics after every batch.
+
+    Returns
+    -------
+    dict
+        Numbers of operations, batches, matched, modified and upserted
+        documents, failed operations, invalid records and elapsed time.
+    """
+    stats = {
+        'n_ops': 0, 'batches': 0, 'matched': 0, 'modified': 0,
+        'upserted': 0, 'failed': 0, 'invalid': 0, 'elapsed': 0.
+    }
+    start = time.monotonic()
+
+    def on_invalid(_lineno, line, _error):
+        stats['invalid'] += 1
+        if invalid is not None:
+            invalid.write(line + "\n")
+
+    def collect(future):
+        res = future.result()
+        stats['batches'] += 1
+        for k in ('matched', 'modified', 'upserted'):
+            stats[k] += res[k]
+        stats['failed'] += len(res['failed'])
+        if reject is not None:
+            reject.write(res['failed'])
+        stats['elapsed'] = time.monotonic() - start
+        if callback:
+            callback(dict(stats))
+
+    ops = read_ops(lines, multiple=multiple, on_invalid=on_invalid)
+    pending = set()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        try:
+            for batch in iter_batches(ops, batch_size):
+                stats['n_ops'] += len(batch)
+                pending.add(executor.submit(write_batch, collection, batch))
+                if len(pending) >= 2 * max(workers, 1):
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+            done, pending = wait(pending)
+            for future in done:
+                collect(future)
+        finally:
+            for future in pending:
+                future.cancel()
+    stats['elapsed'] = time.monotonic() - start
+    return stats
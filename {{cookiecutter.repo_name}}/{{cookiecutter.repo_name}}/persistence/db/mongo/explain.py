@@ -0,0 +1,172 @@
+"""Query plans and execution statistics of *MongoDB* commands.
+
+Commands are explained by the server in the `executionStats` verbosity,
+so they are executed (without returning results or applying writes)
+and the output is condensed by :py:func:`summarize` to the winning plan,
+indexes used, numbers of examined and returned documents and time.
+
+Explain output differs between server versions (classic and slot-based
+execution engines), sharded clusters and aggregation pipelines,
+so summaries are built from the first sections found in it.
+"""
+
+
+def find_command(collection, query=None, projection=None, sort=None, skip=0, limit=0):
+    """Make `find` command.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    query : dict or None
+        Query filter.
+    projection : dict or None
+        Projection.
+    sort : list of tuple or None
+        Sort specification.
+    skip : int
+        Number of documents to skip.
+    limit : int
+        Maximum number of documents. No limit if 0.
+    """
+    cmd = { 'find': collection.name, 'filter': query or {} }
+    if projection:
+        cmd['projection'] = projection
+    if sort:
+        cmd['sort'] = dict(sort)
+    if skip:
+        cmd['skip'] = skip
+    if limit:
+        cmd['limit'] = limit
+    return cmd
+
+def update_command(collection, query, update, upsert=False, multiple=False):
+    """Make `update` command with a single update statement."""
+    return {
+        'update': collection.name,
+        'updates': [ { 'q': query, 'u': update, 'upsert': upsert, 'multi': multiple } ]
+    }
+
+def aggregate_command(collection, pipeline, **kwds):
+    """Make `aggregate` command.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    pipeline : list of dict
+        Pipeline. Stages writing results (`$merge` and `$out`)
+        should not be included, as they can not be explained
+        with execution statistics.
+    **kwds :
+        Options of the command (i.e. `allowDiskUse`).
+        Cursor batch size is ignored.
+    """
+    kwds.pop('batchSize', None)
+    return { 'aggregate': collection.name, 'pipeline': pipeline, 'cursor': {}, **kwds }
+
+def explain(collection, command, verbosity='executionStats'):
+    """Explain a command.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    command : dict
+        Command to explain.
+    verbosity : {'queryPlanner', 'executionStats', 'allPlansExecution'}
+        Verbosity mode.
+
+    Returns
+    -------
+    dict
+        Raw explain output.
+    """
+    return collection.database.command('explain', command, verbosity=verbosity)
+
+def summarize(res):
+    """Condense explain output.
+
+    Parameters
+    ----------
+    res : dict
+        Raw explain output.
+
+    Returns
+    -------
+    dict
+        Winning plan as a chain of stage names (from the root),
+        names of indexes used, collection scan flag, numbers
+        of returned documents, examined keys and documents
+        and execution time in milliseconds. If the output
+        describes an aggregation pipeline, then stages
+        with their estimated times are also included.
+    """
+    plan = get_winning_plan(res)
+    stats = find_execution_stats(res)
+    nodes = list(iter_plan(plan))
+    summary = {
+        'winningPlan': " <- ".join(n['stage'] for n in nodes if 'stage' in n) or None,
+        'indexes': sorted({ n['indexName'] for n in nodes if 'indexName' in n }),
+        'collectionScan': any(n.get('stage') == 'COLLSCAN' for n in nodes),
+        'nReturned': stats.get('nReturned'),
+        'totalKeysExamined': stats.get('totalKeysExamined'),
+        'totalDocsExamined': stats.get('totalDocsExamined'),
+        'executionTimeMillis': stats.get('executionTimeMillis')
+    }
+    stages = res.get('stages')
+    if stages:
+        summary['stages'] = [
+            { 'stage': next(k for k in s if k.startswith('$')),
+              'nReturned': s.get('nReturned'),
+              'executionTimeMillisEstimate': s.get('executionTimeMillisEstimate') }
+            for s in stages
+        ]
+    return summary
+
+def find_execution_stats(res):
+    """Find `executionStats` section in explain output."""
+    return _find_section(res, 'executionStats')
+
+def get_winning_plan(res):
+    """Find winning plan in explain output.
+
+    Returns
+    -------
+    dict
+        Root node of the plan. Empty if not found.
+    """
+    planner = _find_section(res, 'queryPlanner')
+    plan = planner.get('winningPlan', {})
+    # Slot-based execution engine
+    plan = plan.get('queryPlan', plan)
+    # Sharded clusters (only the first shard is described)
+    shards = plan.get('shards')
+    if shards:
+        plan = shards[0].get('winningPlan', {})
+        plan = plan.get('queryPlan', plan)
+    return plan
+
+def iter_plan(plan):
+    """Iterate over nodes of a plan in depth-first order."""
+    if not plan:
+        return
+    yield plan
+    if 'inputStage' in plan:
+        yield from iter_plan(plan['inputStage'])
+    for stage in plan.get('inputStages', []):
+        yield from iter_plan(stage)
+
+
+def _find_section(res, key):
+    if key in res:
+        return res[key]
+    for stage in res.get('stages', []):
+        cursor = stage.get('$cursor', {})
+        if key in cursor:
+            return cursor[key]
+    for shard in res.get('shards', {}).values():
+        section = _find_section(shard, key)
+        if section:
+            return section
+    return {}
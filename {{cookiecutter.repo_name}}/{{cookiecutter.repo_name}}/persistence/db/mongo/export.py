@@ -0,0 +1,222 @@
+"""Streaming export of *MongoDB* collections to JSON lines.
+
+Documents are read with raw *pymongo* cursors (no *Mongoengine*
+documents are built) and written as compact JSON lines
+in blocks through a buffered (and optionally compressing) writer.
+
+Attributes
+----------
+COMPRESSION : dict
+    Mapping from compression names to file extensions.
+JSON_MODES : tuple of str
+    Supported JSON serialization modes.
+"""
+import io
+import sys
+import bz2
+import gzip
+import lzma
+from functools import partial
+from bson import json_util
+from {{ cookiecutter.repo_name }}.utils.serializers import UniversalJSONEncoder
+
+COMPRESSION = {
+    'gzip': '.gz',
+    'bz2': '.bz2',
+    'xz': '.xz'
+}
+JSON_MODES = ('plain', 'relaxed', 'canonical')
+_OPENERS = {
+    'gzip': lambda f: gzip.GzipFile(fileobj=f, mode='wb', compresslevel=6),
+    'bz2': lambda f: bz2.BZ2File(f, mode='wb'),
+    'xz': lambda f: lzma.LZMAFile(f, mode='wb')
+}
+
+
+def infer_compression(path):
+    """Infer compression from a file extension.
+
+    Returns
+    -------
+    str or None
+        Compression name or `None` if the extension is not recognized.
+    """
+    if path:
+        for name, ext in COMPRESSION.items():
+            if path.endswith(ext):
+                return name
+    return None
+
+def open_output(path=None, compression=None, buffer_size=io.DEFAULT_BUFFER_SIZE*256):
+    """Open binary output stream.
+
+    Parameters
+    ----------
+    path : str or None
+        Output file path. Standard output is used if `None` or `'-'`.
+    compression : {'gzip', 'bz2', 'xz'} or None
+        Compression. Inferred from the file extension if `None`.
+    buffer_size : int
+        Size of the write buffer in bytes.
+
+    Returns
+    -------
+    OutputStream
+        Binary writable stream.
+    """
+    if compression is not None and compression not in _OPENERS:
+        raise ValueError(f"Unknown compression '{compression}'")
+    if path in (None, '-'):
+        stream = getattr(sys.stdout, 'buffer', sys.stdout)
+        return OutputStream(stream, compression, close_stream=False)
+    if compression is None:
+        compression = infer_compression(path)
+    return OutputStream(open(path, 'wb', buffering=buffer_size), compression)
+
+def make_dumps(mode='plain'):
+    """Make compact JSON serializer.
+
+    Parameters
+    ----------
+    mode : {'plain', 'relaxed', 'canonical'}
+        If `'plain'` then documents are serialized with
+        :py:class:`{{ cookiecutter.repo_name }}.utils.serializers.UniversalJSONEncoder`,
+        so dates are written as ISO strings and other *BSON* types
+        (i.e. object ids) as strings. Otherwise *MongoDB* Extended JSON
+        in the given mode is written (it is understood by `mongoimport`).
+    """
+    if mode == 'plain':
+        return UniversalJSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+    if mode not in JSON_MODES:
+        raise ValueError(f"Unknown JSON mode '{mode}'")
+    json_mode = json_util.JSONMode.RELAXED if mode == 'relaxed' else json_util.JSONMode.CANONICAL
+    options = json_util.JSONOptions(json_mode=json_mode)
+    return partial(json_util.dumps, json_options=options, separators=(',', ':'),
+                   ensure_ascii=False)
+
+def export_collection(collection, stream, query=None, projection=None,
+                      batch_size=1000, sort=None, skip=0, limit=0, mode='plain'):
+    """Export documents from a collection as JSON lines.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    stream : file-like
+        Binary writable stream.
+    query : dict or None
+        Query filter.
+    projection : dict or list or None
+        Projection.
+    batch_size : int
+        Number of documents fetched in a single round trip.
+        Lines are also written in blocks of this size.
+    sort : list of tuple or None
+        Sort specification.
+    skip : int
+        Number of documents to skip.
+    limit : int
+        Maximum number of documents. No limit if 0.
+    mode : {'plain', 'relaxed', 'canonical'}
+        JSON serialization mode. See :py:func:`make_dumps`.
+
+    Returns
+    -------
+    int
+        Number of exported documents.
+    """
+    cursor = collection.find(query or {}, projection, batch_size=batch_size,
+                             skip=skip, limit=limit, sort=sort)
+    return write_documents(cursor, stream, mode=mode, block_size=batch_size)
+
+def write_documents(docs, stream, mode='plain', block_size=1000):
+    """Write documents as JSON lines.
+
+    Parameters
+    ----------
+    docs : iterable of dict
+        Documents (i.e. a cursor).
+    stream : file-like
+        Binary writable stream.
+    mode : {'plain', 'relaxed', 'canonical'}
+        JSON serialization mode. See :py:func:`make_dumps`.
+    block_size : int
+        Number of lines written at once.
+
+    Returns
+    -------
+    int
+        Number of written documents.
+    """
+    dumps = make_dumps(mode)
+    n = 0
+    block = []
+    for doc in docs:
+        block.append(dumps(doc))
+        if len(block) >= block_size:
+            n += _write_block(stream, block)
+    n += _write_block(stream, block)
+    stream.flush()
+    return n
+
+
+def _write_block(stream, block):
+    if not block:
+        return 0
+    block.append('')
+    stream.write('\n'.join(block).encode('utf-8'))
+    n = len(block) - 1
+    block.clear()
+    return n
+
+
+class OutputStream:
+    """Binary output stream with optional compression.
+
+    Attributes
+    ----------
+    stream : file-like
+        Underlying binary stream.
+    compression : str or None
+        Compression name.
+    close_stream : bool
+        Should the underlying stream be closed on `close`.
+    """
+    def __init__(self, stream, compression=None, close_stream=True):
+        """Initialization method.
+
+        Parameters
+        ----------
+        **Parameters** are described in class attributes.
+        """
+        self.stream = stream
+        self.compression = compression
+        self.close_stream = close_stream
+        self._file = _OPENERS[compression](stream) if compression else stream
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def write(self, data):
+        """Write bytes."""
+        return self._file.write(data)
+
+    def flush(self):
+        """Flush the stream."""
+        self._file.flush()
+        if self._file is not self.stream:
+            self.stream.flush()
+
+    def close(self):
+        """Finish compression and close (or flush) the underlying stream."""
+        try:
+            if self._file is not self.stream:
+                self._file.close()
+        finally:
+            if self.close_stream:
+                self.stream.close()
+            else:
+                self.stream.flush()
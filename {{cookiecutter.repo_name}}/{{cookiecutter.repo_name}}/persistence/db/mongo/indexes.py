@@ -0,0 +1,129 @@
+"""Index management of *MongoDB* collections.
+
+Indexes are declared in models with the standard *Mongoengine*
+`indexes` meta option. Models should also set `auto_create_index`
+to `False`, so indexes are not built implicitly on the first access
+to a collection (i.e. in the middle of an import), but explicitly
+with :py:func:`ensure_indexes` (`db mongo ensure-indexes` command).
+
+Attributes
+----------
+CHECK_MODES : tuple of str
+    Supported modes of handling update queries not covered by indexes.
+"""
+from pymongo import IndexModel
+
+CHECK_MODES = ('ignore', 'warn', 'fail')
+
+
+def get_index_models(model):
+    """Get indexes declared in a model.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document`
+        *Mongoengine* model class.
+
+    Returns
+    -------
+    list of :py:class:`pymongo.operations.IndexModel`
+        Index models built from index specifications of the model
+        with global `index_opts` applied.
+    """
+    index_opts = model._meta.get('index_opts') or {}
+    models = []
+    for spec in model._meta.get('index_specs') or []:
+        spec = { **index_opts, **spec }
+        fields = spec.pop('fields')
+        spec.pop('cls', None)
+        models.append(IndexModel(fields, **spec))
+    return models
+
+def ensure_indexes(model, background=True):
+    """Build indexes declared in a model.
+
+    Existing indexes are not rebuilt.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document`
+        *Mongoengine* model class.
+    background : bool
+        Should indexes be built in the background.
+        Ignored by *MongoDB* 4.2+, which always uses an optimized build
+        holding exclusive locks only at its beginning and end.
+
+    Returns
+    -------
+    list of str
+        Names of the declared indexes.
+    """
+    indexes = get_index_models(model)
+    if not indexes:
+        return []
+    if background:
+        for index in indexes:
+            index.document.setdefault('background', True)
+    return model._get_collection().create_indexes(indexes)
+
+def get_db_fields(model, fields):
+    """Map model field names to database field names.
+
+    Names not defined in the model are returned as they are.
+    """
+    model_fields = getattr(model, '_fields', {})
+    return [
+        (getattr(model_fields[f], 'db_field', None) or f) if f in model_fields else f
+        for f in fields
+    ]
+
+def find_index(fields, index_info):
+    """Find the best index serving equality queries on fields.
+
+    An index can be used by a query if its leading key field
+    is one of the query fields. The index with the longest key prefix
+    consisting only of query fields is the best one.
+
+    Parameters
+    ----------
+    fields : iterable of str
+        Query fields (database names).
+    index_info : Mapping
+        Output of :py:meth:`pymongo.collection.Collection.index_information`.
+
+    Returns
+    -------
+    str or None
+        Name of the index or `None` if there is no usable index.
+    """
+    fields = set(fields)
+    if '_id' in fields:
+        return '_id_'
+    best, best_len = None, 0
+    for name, info in index_info.items():
+        n = 0
+        for key, _ in info['key']:
+            if key not in fields:
+                break
+            n += 1
+        if n > best_len:
+            best, best_len = name, n
+    return best
+
+def check_query_index(model, fields):
+    """Check if equality queries on fields are served by an index.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document`
+        *Mongoengine* model class.
+    fields : iterable of str
+        Query fields (model names).
+
+    Returns
+    -------
+    str or None
+        Name of the index or `None` if queries require collection scans.
+    """
+    db_fields = get_db_fields(model, fields)
+    return find_index(db_fields, model._get_collection().index_information())
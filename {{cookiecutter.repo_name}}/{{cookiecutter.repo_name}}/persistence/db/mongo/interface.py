@@ -1,8 +1,11 @@
 """Mongo persistence interface."""
 from .utils import query_factory, update_action_hook
+from .batching import MAX_BATCH_BYTES, MAX_BATCH_SIZE
+from .indexes import CHECK_MODES
 from {{ cookiecutter.repo_name }}.base.interface import DBPersistenceInterface
 from {{ cookiecutter.repo_name }}.base.validators import BaseValidator
 from {{ cookiecutter.repo_name }}.utils.fetch import get_db_model
+from {{ cookiecutter.repo_name }}.utils.processors import parse_bool
 
 
 class MongoPersistenceInterface(DBPersistenceInterface):
@@ -22,6 +25,55 @@ class MongoPersistenceInterface(DBPersistenceInterface):
         Should upsert be used in update mode.
     multiple : bool
         Should multiple updates be used in update mode.
+    n_inflight : int
+        Maximum number of batches handed over to the background flusher
+        thread (being written or waiting). Batches are written synchronously
+        if non-positive.
+    n_writers : int
+        Number of threads writing partitions of each batch concurrently
+        over the connection pool. Operations are partitioned by hashes
+        of their update queries, so updates of the same document
+        are always applied in order.
+    adaptive_batching : bool
+        Should batch size be adapted to write latency and documents size.
+        If `True` then `batch_size` is only the initial batch size.
+        See :py:class:`{{ cookiecutter.repo_name }}.persistence.db.mongo.batching.AdaptiveBatchController`.
+    target_flush_time : float
+        Target duration of a single flush in seconds in adaptive mode.
+    max_batch_bytes : int
+        Maximum size of a batch of *BSON* encoded documents in adaptive mode.
+    batch_size_min : int
+        Minimum batch size in adaptive mode.
+    batch_size_max : int
+        Maximum batch size in adaptive mode.
+    raw_insert : bool
+        Should documents be inserted in insert mode directly
+        with :py:meth:`pymongo.collection.Collection.insert_many`
+        instead of building *Mongoengine* documents first.
+        Documents are then not validated by the model
+        (they are still normalized by `from_dict` if the model defines it).
+    coalesce : bool
+        Should `$set`-only updates of the same documents (with the same
+        update queries) be coalesced within batches.
+        Ignored if `multiple=True`.
+    skip_unchanged : bool
+        Should documents with unchanged content be skipped.
+        Content hashes are stored in documents in `hash_field`
+        and cached in memory.
+    hash_field : str
+        Name of the field storing content hashes.
+    hash_cache : str or None
+        Path to a file with the cache of content hashes.
+        If it does not exist, the cache is loaded from the database.
+        The cache is saved on `finalize`.
+    dead_letter : str or None
+        Path to a JSON lines file to which write operations that keep failing
+        are appended. If `None` then an error is raised instead.
+    check_indexes : {'ignore', 'warn', 'fail'}
+        What to do on `prepare` in update mode, if update query fields
+        are not served by any index of the collection (so every update
+        would be a collection scan). Only queries built from field names
+        are checked.
     **kwds :
         Other arguments passed to
         :py:class:`{{ cookiecutter.repo_name }}.base.interface.DBPersistenceInterface`.
@@ -40,7 +92,42 @@ class MongoPersistenceInterface(DBPersistenceInterface):
         },
         'update': { 'type': 'boolean', 'default': True },
         'upsert': { 'type': 'boolean', 'default': True },
-        'multiple': { 'type': 'boolean', 'default': False }
+        'multiple': { 'type': 'boolean', 'default': False },
+        'n_inflight': { 'type': 'integer', 'coerce': int, 'min': 0, 'default': 0 },
+        'n_writers': { 'type': 'integer', 'coerce': int, 'min': 1, 'default': 1 },
+        'adaptive_batching': {
+            'type': 'boolean',
+            'coerce': parse_bool,
+            'default': False
+        },
+        'target_flush_time': {
+            'type': 'number',
+            'coerce': float,
+            'min': 0,
+            'default': 1.0
+        },
+        'max_batch_bytes': {
+            'type': 'integer',
+            'coerce': int,
+            'min': 1,
+            'max': MAX_BATCH_BYTES,
+            'default': MAX_BATCH_BYTES // 2
+        },
+        'batch_size_min': { 'type': 'integer', 'coerce': int, 'min': 1, 'default': 100 },
+        'batch_size_max': {
+            'type': 'integer',
+            'coerce': int,
+            'min': 1,
+            'max': MAX_BATCH_SIZE,
+            'default': MAX_BATCH_SIZE
+        },
+        'raw_insert': { 'type': 'boolean', 'coerce': parse_bool, 'default': False },
+        'coalesce': { 'type': 'boolean', 'coerce': parse_bool, 'default': False },
+        'skip_unchanged': { 'type': 'boolean', 'coerce': parse_bool, 'default': False },
+        'hash_field': { 'type': 'string', 'empty': False, 'default': '_content_hash' },
+        'hash_cache': { 'type': 'string', 'nullable': True, 'default': None },
+        'dead_letter': { 'type': 'string', 'nullable': True, 'default': None },
+        'check_indexes': { 'type': 'string', 'allowed': CHECK_MODES, 'default': 'warn' }
     })
 
     def __init__(self, **kwds):
@@ -6,8 +6,10 @@ easy adjusting input data to a given model schema.
 """
 from mongoengine.base.fields import BaseField
 from cerberus import Validator
+from {{ cookiecutter.repo_name }} import get_component
 from {{ cookiecutter.repo_name }}.utils.processors import parse_date, parse_bool
 from {{ cookiecutter.repo_name }}.base.abc import AbstractDBMixin
+from {{ cookiecutter.repo_name }}.base.registry import registry
 
 
 BASESCHEMA = {
@@ -78,14 +80,30 @@ ATTRMAP = Validator({
 
 
 class BaseDocumentMixin:
-    """Base document class mixin providing helper methods."""
+    """Base document class mixin providing helper methods.
+
+    The mixin has to precede :py:class:`mongoengine.Document` in base classes,
+    so *MongoDB* connection is initialized (if it was not yet)
+    when the database of a model is used for the first time.
+    """
     _field_names_map = {}
     _schema = None
     _ignore_fields = [ '_id', 'id' ]
     _baseschema = BASESCHEMA
 
+    def __init_subclass__(cls, **kwds):
+        # Models use Mongoengine metaclasses, so they are registered here
+        super().__init_subclass__(**kwds)
+        registry.register('models', cls)
+
     # Class methods and properties --------------------------------------------
 
+    @classmethod
+    def _get_db(cls):
+        """Get database of the model initializing the connection if needed."""
+        get_component('mongo')
+        return super()._get_db()
+
     @classmethod
     def _get_fields_defs(cls, ignore_fields=True, *args):
         """Get fields definitions."""
@@ -7,10 +7,14 @@ from {{ cookiecutter.repo_name }}.base.abc import AbstractMongoModelMetaclass
 
 
 
-class ExampleMongoModel(Document, BaseDocumentMixin):
+class ExampleMongoModel(BaseDocumentMixin, Document):
     """Example MongoDB model."""
     _id = ObjectIdField(primary_key=True)
     text = StringField(required=True)
     number = IntField(min=0, default=0)
     # Collection settings
-    meta = { 'collection': 'example_collection' }
+    meta = {
+        'collection': 'example_collection',
+        'indexes': [ 'text' ],
+        'auto_create_index': False
+    }
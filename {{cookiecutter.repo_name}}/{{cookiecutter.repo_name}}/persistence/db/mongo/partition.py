@@ -0,0 +1,415 @@
+"""Partitioned parallel scans of *MongoDB* collections.
+
+Collections are split into contiguous `_id` ranges, which are then
+processed independently (i.e. in a process pool or as separate
+*Taskiss* tasks). Every range is read with its own raw cursor,
+so many cursors may be used at once to saturate disk or network.
+
+Range boundaries may be computed with one of the methods:
+
+* `'sample'`: quantiles of a random sample of `_id` values
+  (`$sample` aggregation stage).
+* `'splitvector'`: `splitVector` command used by the sharding balancer.
+  It requires privileges to run the command.
+* `'interpolate'`: evenly spaced values between the minimum and
+  the maximum `_id`. It requires only two queries, but ranges are
+  balanced only if `_id` values are evenly distributed
+  (i.e. object ids of documents inserted at a constant rate).
+* `'auto'`: `'sample'` and `'interpolate'` if sampling fails.
+
+Attributes
+----------
+METHODS : tuple of str
+    Methods of computing range boundaries.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from bson import ObjectId, json_util
+from pymongo.errors import OperationFailure
+from . import reconnect
+from .export import open_output, export_collection, COMPRESSION
+from {{ cookiecutter.repo_name }}.utils import import_python
+from {{ cookiecutter.repo_name }}.utils.fetch import get_db_model
+
+METHODS = ('auto', 'sample', 'splitvector', 'interpolate')
+_pid = os.getpid()
+
+
+def range_query(lower=None, upper=None, query=None):
+    """Make query selecting documents in an `_id` range.
+
+    Parameters
+    ----------
+    lower : any
+        Inclusive lower bound. No bound if `None`.
+    upper : any
+        Exclusive upper bound. No bound if `None`.
+    query : dict or None
+        Optional query combined with the range condition.
+    """
+    cond = {}
+    if lower is not None:
+        cond['$gte'] = lower
+    if upper is not None:
+        cond['$lt'] = upper
+    if not cond:
+        return query or {}
+    if not query:
+        return { '_id': cond }
+    return { '$and': [ query, { '_id': cond } ] }
+
+def make_ranges(boundaries):
+    """Make ranges from sorted boundaries.
+
+    Parameters
+    ----------
+    boundaries : sequence
+        Sorted boundaries. Duplicates are removed.
+
+    Returns
+    -------
+    list of tuple
+        Pairs of lower and upper bounds. The first range has no
+        lower bound and the last one has no upper bound.
+    """
+    bounds = []
+    for b in boundaries:
+        if not bounds or b != bounds[-1]:
+            bounds.append(b)
+    return list(zip([ None, *bounds ], [ *bounds, None ]))
+
+def select_quantiles(values, n_partitions):
+    """Select `n_partitions - 1` evenly spaced values from sorted values."""
+    n = len(values)
+    if n == 0 or n_partitions <= 1:
+        return []
+    return [ values[i*n // n_partitions] for i in range(1, n_partitions) ]
+
+def sample_boundaries(collection, n_partitions, query=None, oversampling=100):
+    """Compute boundaries from a random sample of `_id` values.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    n_partitions : int
+        Number of partitions.
+    query : dict or None
+        Optional query.
+    oversampling : int
+        Number of sampled documents per partition.
+    """
+    pipeline = [ { '$match': query } ] if query else []
+    pipeline += [
+        { '$sample': { 'size': n_partitions*oversampling } },
+        { '$project': { '_id': 1 } }
+    ]
+    ids = sorted({ doc['_id'] for doc in collection.aggregate(pipeline, allowDiskUse=True) })
+    return select_quantiles(ids, n_partitions)
+
+def splitvector_boundaries(collection, n_partitions):
+    """Compute boundaries with `splitVector` command.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    n_partitions : int
+        Number of partitions.
+    """
+    db = collection.database
+    size = db.command('collStats', collection.name).get('size', 0)
+    max_chunk_size = max(size // (n_partitions*4), 1024*1024)
+    res = db.command('splitVector', collection.full_name, keyPattern={ '_id': 1 },
+                     maxChunkSizeBytes=max_chunk_size)
+    keys = [ k['_id'] for k in res.get('splitKeys', []) ]
+    if len(keys) >= n_partitions:
+        keys = select_quantiles(keys, n_partitions)
+    return keys
+
+def interpolate_boundaries(collection, n_partitions, query=None):
+    """Compute evenly spaced boundaries between minimum and maximum `_id`.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    n_partitions : int
+        Number of partitions.
+    query : dict or None
+        Optional query.
+
+    Raises
+    ------
+    TypeError
+        If `_id` values are not object ids or numbers.
+    """
+    first = collection.find_one(query or {}, { '_id': 1 }, sort=[ ('_id', 1) ])
+    last = collection.find_one(query or {}, { '_id': 1 }, sort=[ ('_id', -1) ])
+    if first is None:
+        return []
+    lo, hi = first['_id'], last['_id']
+    if isinstance(lo, ObjectId) and isinstance(hi, ObjectId):
+        # Exact integer arithmetic, as 96-bit ids do not fit in floats
+        lo, hi = int.from_bytes(lo.binary, 'big'), int.from_bytes(hi.binary, 'big')
+        return [
+            ObjectId((lo + (hi - lo)*i // n_partitions).to_bytes(12, 'big'))
+            for i in range(1, n_partitions)
+        ]
+    if isinstance(lo, (int, float)) and isinstance(hi, (int, float)):
+        step = (hi - lo) / n_partitions
+        cast = int if isinstance(lo, int) and isinstance(hi, int) else float
+        return [ cast(lo + step*i) for i in range(1, n_partitions) ]
+    raise TypeError(f"Can not interpolate between '{lo!r}' and '{hi!r}'")
+
+def split_ranges(collection, n_partitions, method='auto', query=None, **kwds):
+    """Split collection into `_id` ranges.
+
+    Parameters
+    ----------
+    collection : :py:class:`pymongo.collection.Collection`
+        Collection object.
+    n_partitions : int
+        Maximum number of partitions. Less ranges may be returned
+        if there are not enough distinct `_id` values.
+    method : {'auto', 'sample', 'splitvector', 'interpolate'}
+        Method of computing range boundaries.
+    query : dict or None
+        Optional query. It is used only to compute boundaries.
+    **kwds :
+        Keyword arguments passed to :py:func:`sample_boundaries`.
+
+    Returns
+    -------
+    list of tuple
+        Pairs of inclusive lower and exclusive upper bounds.
+        Open bounds are `None`.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'")
+    if n_partitions <= 1:
+        return [ (None, None) ]
+    if method == 'auto':
+        try:
+            boundaries = sample_boundaries(collection, n_partitions, query, **kwds)
+        except OperationFailure:
+            boundaries = interpolate_boundaries(collection, n_partitions, query)
+    elif method == 'sample':
+        boundaries = sample_boundaries(collection, n_partitions, query, **kwds)
+    elif method == 'splitvector':
+        boundaries = splitvector_boundaries(collection, n_partitions)
+    else:
+        boundaries = interpolate_boundaries(collection, n_partitions, query)
+    return make_ranges(boundaries)
+
+def dumps_ranges(ranges):
+    """Serialize ranges as *MongoDB* Extended JSON string."""
+    return json_util.dumps([ list(r) for r in ranges ])
+
+def loads_ranges(data):
+    """Deserialize ranges from *MongoDB* Extended JSON string."""
+    return [ tuple(r) for r in json_util.loads(data) ]
+
+def get_collection(model):
+    """Get collection of a model in the current process.
+
+    If the process was forked after the connection was created,
+    the client is recreated first, so it is not shared with the parent.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document` or str
+        Model class or its path or name.
+    """
+    global _pid
+    if isinstance(model, str):
+        model = get_db_model(model)
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        if reconnect() is not None:
+            model._collection = None
+    return model._get_collection()
+
+def export_partition(model, lower, upper, path, query=None, **kwds):
+    """Export documents in an `_id` range to a JSON lines file.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document` or str
+        Model class or its path or name.
+    lower : any
+        Inclusive lower bound.
+    upper : any
+        Exclusive upper bound.
+    path : str
+        Output file path.
+    query : dict or None
+        Optional query.
+    **kwds :
+        Keyword arguments passed to
+        :py:func:`{{ cookiecutter.repo_name }}.persistence.db.mongo.export.export_collection`.
+
+    Returns
+    -------
+    dict
+        Output path and the number of exported documents.
+    """
+    collection = get_collection(model)
+    with open_output(path) as stream:
+        n = export_collection(collection, stream, range_query(lower, upper, query), **kwds)
+    return { 'path': path, 'count': n }
+
+def scan_partition(model, lower, upper, func, query=None, projection=None, batch_size=1000):
+    """Apply a function to documents in an `_id` range.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document` or str
+        Model class or its path or name.
+    lower : any
+        Inclusive lower bound.
+    upper : any
+        Exclusive upper bound.
+    func : callable or str
+        Function called on an iterator of raw documents (dicts)
+        or its python path. Its result is returned.
+    query : dict or None
+        Optional query.
+    projection : dict or None
+        Optional projection.
+    batch_size : int
+        Number of documents fetched in a single round trip.
+    """
+    if isinstance(func, str):
+        func = import_python(func)
+    collection = get_collection(model)
+    cursor = collection.find(range_query(lower, upper, query), projection,
+                             batch_size=batch_size)
+    try:
+        return func(cursor)
+    finally:
+        cursor.close()
+
+def map_partitions(partition_func, model, ranges, workers=None, per_range=None, **kwds):
+    """Call a partition function on ranges in a process pool.
+
+    Parameters
+    ----------
+    partition_func : callable
+        Partition function taking model, bounds and `**kwds`.
+    model : :py:class:`mongoengine.Document` or str
+        Model class or its path or name.
+        It is pickled, so it must be importable.
+    ranges : list of tuple
+        Ranges.
+    workers : int or None
+        Number of worker processes.
+        Ranges are processed serially in the current process if 1.
+    per_range : list of dict or None
+        Keyword arguments passed to the function for every range.
+        It must be of the same length as `ranges`.
+    **kwds :
+        Keyword arguments passed to the function for all ranges.
+
+    Returns
+    -------
+    list
+        Results in the order of ranges.
+    """
+    per_range = per_range or [ {} for _ in ranges ]
+    if len(per_range) != len(ranges):
+        raise ValueError("'per_range' and 'ranges' have different lengths")
+    if workers == 1:
+        return [
+            partition_func(model, lo, hi, **kwds, **rkwds)
+            for (lo, hi), rkwds in zip(ranges, per_range)
+        ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(partition_func, model, lo, hi, **kwds, **rkwds)
+            for (lo, hi), rkwds in zip(ranges, per_range)
+        ]
+        return [ f.result() for f in futures ]
+
+def shard_path(path, n):
+    """Make path of a shard from a template.
+
+    Parameters
+    ----------
+    path : str
+        Path template. `{n}` is replaced with a zero-padded shard number.
+        If it is missing, then the number is inserted
+        before the `.jl` extension (or appended).
+    n : int
+        Shard number.
+    """
+    if '{n}' in path:
+        return path.replace('{n}', f"{n:04d}")
+    exts = [ '.jl' + ext for ext in COMPRESSION.values() ] + [ '.jl' ]
+    for ext in exts:
+        if path.endswith(ext):
+            return f"{path[:-len(ext)]}-{n:04d}{ext}"
+    return f"{path}-{n:04d}"
+
+def export_partitioned(model, path, n_partitions, workers=None, method='auto',
+                       query=None, **kwds):
+    """Export collection to sharded JSON lines files in parallel.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document` or str
+        Model class or its path or name.
+    path : str
+        Path template of shards (see :py:func:`shard_path`).
+    n_partitions : int
+        Number of partitions (shards).
+    workers : int or None
+        Number of worker processes.
+    method : str
+        Method of computing range boundaries.
+    query : dict or None
+        Optional query.
+    **kwds :
+        Keyword arguments passed to
+        :py:func:`{{ cookiecutter.repo_name }}.persistence.db.mongo.export.export_collection`.
+
+    Returns
+    -------
+    list of dict
+        Paths and numbers of documents of shards.
+    """
+    ranges = split_ranges(get_collection(model), n_partitions, method, query)
+    per_range = [ { 'path': shard_path(path, i) } for i in range(len(ranges)) ]
+    return map_partitions(export_partition, model, ranges, workers=workers,
+                          per_range=per_range, query=query, **kwds)
+
+def scan_partitioned(model, func, n_partitions, workers=None, method='auto',
+                     query=None, **kwds):
+    """Apply a function to partitions of a collection in parallel.
+
+    Parameters
+    ----------
+    model : :py:class:`mongoengine.Document` or str
+        Model class or its path or name.
+    func : callable or str
+        Function called on an iterator of documents of every partition.
+        It must be picklable (or be given as a python path).
+    n_partitions : int
+        Number of partitions.
+    workers : int or None
+        Number of worker processes.
+    method : str
+        Method of computing range boundaries.
+    query : dict or None
+        Optional query.
+    **kwds :
+        Keyword arguments passed to :py:func:`scan_partition`.
+
+    Returns
+    -------
+    list
+        Results of the function in the order of partitions.
+    """
+    ranges = split_ranges(get_collection(model), n_partitions, method, query)
+    return map_partitions(scan_partition, model, ranges, workers=workers,
+                          func=func, query=query, **kwds)
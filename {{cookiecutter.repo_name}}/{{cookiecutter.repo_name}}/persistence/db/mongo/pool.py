@@ -0,0 +1,120 @@
+"""Connection pool monitoring for *MongoDB* clients.
+
+*pymongo* does not expose the state of its connection pools directly,
+so it is tracked with a connection pool event listener
+registered when a client is created.
+
+See Also
+--------
+pymongo.monitoring
+"""
+import os
+from threading import Lock
+from collections import Counter
+from pymongo.monitoring import ConnectionPoolListener
+
+
+class PoolMonitor(ConnectionPoolListener):
+    """Connection pool listener counting pool events.
+
+    Counters are kept per process, as clients (and their pools)
+    must not be shared between forked processes.
+
+    Attributes
+    ----------
+    pid : int
+        Id of the process the counters were collected in.
+    counts : :py:class:`collections.Counter`
+        Event counters.
+    """
+    def __init__(self):
+        """Initialization method."""
+        self.pid = os.getpid()
+        self.counts = Counter()
+        self._lock = Lock()
+
+    def _inc(self, event, n=1):
+        """Increment event counter, resetting counters in a new process."""
+        with self._lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.counts.clear()
+            self.counts[event] += n
+
+    @property
+    def stats(self):
+        """dict: Connection statistics of the current process."""
+        with self._lock:
+            counts = Counter() if self.pid != os.getpid() else self.counts.copy()
+        return {
+            'pid': os.getpid(),
+            'open': counts['connection_created'] - counts['connection_closed'],
+            'checked_out': counts['connection_checked_out'] - counts['connection_checked_in'],
+            'created': counts['connection_created'],
+            'closed': counts['connection_closed'],
+            'checkouts': counts['connection_checked_out'],
+            'checkout_failures': counts['connection_check_out_failed'],
+            'pools': counts['pool_created'] - counts['pool_closed'],
+            'pools_cleared': counts['pool_cleared']
+        }
+
+    def pool_created(self, event):
+        """Count created connection pools."""
+        self._inc('pool_created')
+
+    def pool_ready(self, event):
+        """Count connection pools marked as ready."""
+        self._inc('pool_ready')
+
+    def pool_cleared(self, event):
+        """Count cleared connection pools."""
+        self._inc('pool_cleared')
+
+    def pool_closed(self, event):
+        """Count closed connection pools."""
+        self._inc('pool_closed')
+
+    def connection_created(self, event):
+        """Count created connections."""
+        self._inc('connection_created')
+
+    def connection_ready(self, event):
+        """Count connections ready to be used."""
+        self._inc('connection_ready')
+
+    def connection_closed(self, event):
+        """Count closed connections."""
+        self._inc('connection_closed')
+
+    def connection_check_out_started(self, event):
+        """Count started connection checkouts."""
+        self._inc('connection_check_out_started')
+
+    def connection_check_out_failed(self, event):
+        """Count failed connection checkouts."""
+        self._inc('connection_check_out_failed')
+
+    def connection_checked_out(self, event):
+        """Count checked out connections."""
+        self._inc('connection_checked_out')
+
+    def connection_checked_in(self, event):
+        """Count connections checked back in."""
+        self._inc('connection_checked_in')
+
+
+def get_pool_options(client):
+    """Get connection pool options of a client.
+
+    Parameters
+    ----------
+    client : :py:class:`pymongo.MongoClient`
+        *MongoDB* client.
+    """
+    options = client.options.pool_options
+    return {
+        'maxPoolSize': options.max_pool_size,
+        'minPoolSize': options.min_pool_size,
+        'waitQueueTimeoutMS': None if options.wait_queue_timeout is None \
+            else int(options.wait_queue_timeout * 1000)
+    }
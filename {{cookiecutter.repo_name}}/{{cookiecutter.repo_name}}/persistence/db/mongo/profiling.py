@@ -0,0 +1,166 @@
+"""Reports of slow *MongoDB* operations.
+
+Operations are read either from the database profiler collection
+(`system.profile`, the profiler has to be enabled first, i.e. with
+`db.setProfilingLevel(1, { slowms: 100 })`) or from currently running
+operations (`currentOp` command). They are grouped by collections
+(models), operation types, query shapes and plans and ranked
+by the total time spent.
+
+Attributes
+----------
+SOURCES : tuple of str
+    Supported sources of operations.
+"""
+import json
+
+SOURCES = ('profile', 'currentop')
+_COMMAND_KEYS = ('filter', 'q', 'query', 'pipeline', 'updates', 'deletes')
+
+
+def query_shape(obj):
+    """Get shape of a query.
+
+    Values are replaced with `'?'`, so queries differing only
+    in values have the same shape. Field names and operators are kept.
+    """
+    if isinstance(obj, dict):
+        return { k: query_shape(v) for k, v in obj.items() }
+    if isinstance(obj, (list, tuple)):
+        shapes = [ query_shape(x) for x in obj ]
+        return shapes if any(isinstance(x, (dict, list)) for x in shapes) else '?'
+    return '?'
+
+def get_command_shape(command):
+    """Get shape of a command as a string.
+
+    Parameters
+    ----------
+    command : dict
+        Command of a profiled or running operation.
+    """
+    if not isinstance(command, dict):
+        return None
+    shape = { k: query_shape(command[k]) for k in _COMMAND_KEYS if k in command }
+    return json.dumps(shape, sort_keys=True) if shape else None
+
+def normalize_op(op, millis):
+    """Convert profiler entry or running operation to a common record."""
+    command = op.get('command') or op.get('query') or {}
+    return {
+        'ns': op.get('ns'),
+        'op': op.get('op'),
+        'millis': millis,
+        'plan': op.get('planSummary'),
+        'shape': get_command_shape(command),
+        'keys_examined': op.get('keysExamined', 0),
+        'docs_examined': op.get('docsExamined', 0),
+        'n_returned': op.get('nreturned', 0)
+    }
+
+def read_profile(database, min_ms=100, namespaces=None, since=None, limit=10000):
+    """Read slow operations from the profiler collection.
+
+    Parameters
+    ----------
+    database : :py:class:`pymongo.database.Database`
+        Database object.
+    min_ms : int
+        Minimum duration of operations in milliseconds.
+    namespaces : iterable of str or None
+        Namespaces (`db.collection`) to limit to.
+    since : :py:class:`datetime.datetime` or None
+        Only operations started after this time.
+    limit : int
+        Maximum number of operations (the most recent ones).
+        No limit if 0.
+
+    Returns
+    -------
+    list of dict
+        Normalized operation records.
+    """
+    query = { 'millis': { '$gte': min_ms } }
+    if namespaces:
+        query['ns'] = { '$in': list(namespaces) }
+    if since:
+        query['ts'] = { '$gte': since }
+    cursor = database['system.profile'].find(query, sort=[ ('ts', -1) ], limit=limit)
+    return [ normalize_op(op, op.get('millis', 0)) for op in cursor ]
+
+def read_current_ops(database, min_ms=100, namespaces=None):
+    """Read slow currently running operations.
+
+    Parameters
+    ----------
+    database : :py:class:`pymongo.database.Database`
+        Database object. Operations are read with `currentOp` command
+        run in the `admin` database of its client.
+    min_ms : int
+        Minimum running time of operations in milliseconds.
+    namespaces : iterable of str or None
+        Namespaces (`db.collection`) to limit to.
+        Only operations in the database are read if `None`.
+
+    Returns
+    -------
+    list of dict
+        Normalized operation records.
+    """
+    if namespaces:
+        ns_filter = { '$in': list(namespaces) }
+    else:
+        ns_filter = { '$regex': '^' + database.name + r'\.' }
+    # Filters have to be top-level fields of the command document
+    res = database.client.admin.command(
+        'currentOp', 1,
+        active=True,
+        ns=ns_filter,
+        microsecs_running={ '$gte': min_ms * 1000 }
+    )
+    return [
+        normalize_op(op, op.get('microsecs_running', 0) / 1000)
+        for op in res.get('inprog', [])
+    ]
+
+def rank_ops(ops, models=None, top=20):
+    """Group operations and rank groups by total time.
+
+    Parameters
+    ----------
+    ops : iterable of dict
+        Normalized operation records.
+    models : Mapping or None
+        Mapping from namespaces to model names.
+        Namespaces not found are reported as they are.
+    top : int
+        Maximum number of reported groups. No limit if 0.
+
+    Returns
+    -------
+    list of dict
+        Groups by model, operation type, query shape and plan
+        with counts, total, mean and maximum times in milliseconds
+        and total numbers of examined keys and documents and returned documents.
+    """
+    models = models or {}
+    groups = {}
+    for op in ops:
+        model = models.get(op['ns'], op['ns'])
+        key = (model, op['op'], op['shape'], op['plan'])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'model': model, 'op': op['op'], 'shape': op['shape'], 'plan': op['plan'],
+                'count': 0, 'total_ms': 0, 'max_ms': 0,
+                'keys_examined': 0, 'docs_examined': 0, 'n_returned': 0
+            }
+        group['count'] += 1
+        group['total_ms'] += op['millis']
+        group['max_ms'] = max(group['max_ms'], op['millis'])
+        for k in ('keys_examined', 'docs_examined', 'n_returned'):
+            group[k] += op[k] or 0
+    ranked = sorted(groups.values(), key=lambda g: g['total_ms'], reverse=True)
+    for group in ranked:
+        group['mean_ms'] = group['total_ms'] / group['count']
+    return ranked[:top] if top else ranked
@@ -1,11 +1,40 @@
 """*MongoDB* / *Mongoengine* related utilities.
 
+Attributes
+----------
+NON_RETRYABLE_CODES : frozenset
+    Server error codes of write errors that will not succeed when retried
+    (i.e. duplicate keys or validation failures).
+
 See Also
 --------
 pymongo
 mongoengine
 """
-from collections import Iterable
+import os
+import json
+import random
+from threading import Lock
+from collections import Iterable, Mapping
+from pymongo import UpdateMany
+from {{ cookiecutter.repo_name }}.utils.serializers import UniversalJSONEncoder
+from {{ cookiecutter.repo_name }}.utils.string import hash_string
+
+NON_RETRYABLE_CODES = frozenset([
+    2,      # BadValue
+    9,      # FailedToParse
+    14,     # TypeMismatch
+    52,     # DollarPrefixedFieldName
+    55,     # InvalidDBRef
+    56,     # EmptyFieldName
+    57,     # DottedFieldName
+    66,     # ImmutableField
+    121,    # DocumentValidationFailure
+    10334,  # BSONObjectTooLarge
+    11000,  # DuplicateKey
+    11001,  # DuplicateKey (legacy)
+    17419   # DocumentTooLarge
+])
 
 
 def update_action_hook(doc, hook='$set', processor=None):
@@ -26,11 +55,297 @@ def update_action_hook(doc, hook='$set', processor=None):
     return action
 
 def query_factory(query_or_fields):
-    """Query function factory."""
+    """Query function factory.
+
+    Query functions made from field names have `fields` attribute
+    with the list of the names.
+    """
     if callable(query_or_fields):
         return query_or_fields
     if isinstance(query_or_fields, str) or not isinstance(query_or_fields, Iterable):
         query_or_fields = [query_or_fields]
+    query_or_fields = list(query_or_fields)
     def query(dct):
         return { f: dct.pop(f) for f in query_or_fields }
+    query.fields = query_or_fields
     return query
+
+def dumps_key(dct):
+    """Dump (query) dict to a string that can be used as a mapping key."""
+    return json.dumps(dct, sort_keys=True, cls=UniversalJSONEncoder)
+
+def content_hash(doc, exclude=()):
+    """Get hash of document content.
+
+    Parameters
+    ----------
+    doc : Mapping
+        Document.
+    exclude : iterable of str
+        Fields excluded from hashing.
+    """
+    if exclude:
+        doc = { k: v for k, v in doc.items() if k not in exclude }
+    return hash_string(dumps_key(doc))
+
+def freeze(obj):
+    """Make hashable representation of a (nested) document.
+
+    Mappings are converted to tuples of items sorted by keys,
+    other iterables (except strings and bytes) to tuples
+    and sets to frozensets. Unhashable leaves are represented by `repr`.
+
+    Parameters
+    ----------
+    obj : any
+        Object to freeze.
+    """
+    if isinstance(obj, Mapping):
+        return tuple(sorted(
+            ((k, freeze(v)) for k, v in obj.items()),
+            key=lambda x: str(x[0])
+        ))
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(freeze(x) for x in obj)
+    if isinstance(obj, Iterable) and not isinstance(obj, (str, bytes)):
+        return tuple(freeze(x) for x in obj)
+    try:
+        hash(obj)
+    except TypeError:
+        return repr(obj)
+    return obj
+
+def is_retryable(error):
+    """Check if a write error may succeed when retried.
+
+    Parameters
+    ----------
+    error : Mapping or None
+        Write error details as reported in
+        :py:attr:`pymongo.errors.BulkWriteError.details`.
+        `None` means that the operation was not executed.
+    """
+    if error is None:
+        return True
+    return error.get('code') not in NON_RETRYABLE_CODES
+
+def get_failed_ops(ops, details, ordered=False):
+    """Get failed operations from bulk write error details.
+
+    Parameters
+    ----------
+    ops : list
+        Write operations passed to the bulk write.
+    details : Mapping
+        :py:attr:`pymongo.errors.BulkWriteError.details`.
+    ordered : bool
+        Was the bulk write ordered. If `True` then all operations
+        following the failed one were not executed and are also returned
+        (with `None` instead of error details).
+
+    Returns
+    -------
+    list of tuples
+        Pairs of failed operations and error details.
+    """
+    errors = sorted(details.get('writeErrors', []), key=lambda e: e['index'])
+    failed = [ (ops[e['index']], e) for e in errors ]
+    if ordered and errors:
+        failed.extend((op, None) for op in ops[errors[-1]['index']+1:])
+    return failed
+
+def backoff_delay(attempt, backoff_time, backoff_base=2):
+    """Get jittered exponential backoff delay.
+
+    Half of the delay is fixed and the other half is random,
+    so concurrent writers do not retry at the same moments.
+
+    Parameters
+    ----------
+    attempt : int
+        Number of the failed attempt (starting from 1).
+    backoff_time : numeric
+        Base delay in seconds. No delay if non-positive or *falsy*.
+    backoff_base : numeric
+        Base of the exponential scaling.
+    """
+    if not backoff_time or backoff_time <= 0:
+        return 0
+    delay = backoff_time * backoff_base**(attempt - 1)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def op_to_record(op):
+    """Convert write operation to a serializable record.
+
+    Update operations are represented as `{filter, update, upsert, multi}`
+    records (accepted by :py:func:`{{ cookiecutter.repo_name }}.persistence.db.mongo.bulk.make_update_op`)
+    and inserts as `{document}` records.
+
+    Parameters
+    ----------
+    op : :py:module:`pymongo` operation, :py:class:`mongoengine.Document` or Mapping
+        Write operation or document to insert.
+    """
+    if hasattr(op, '_filter') and hasattr(op, '_doc'):
+        return {
+            'filter': op._filter,
+            'update': op._doc,
+            'upsert': getattr(op, '_upsert', False),
+            'multi': isinstance(op, UpdateMany)
+        }
+    if hasattr(op, 'to_mongo'):
+        return { 'document': op.to_mongo().to_dict() }
+    return { 'document': dict(op) }
+
+
+class DeadLetterWriter:
+    """Thread-safe writer of failed operations to a JSON lines file.
+
+    The file is opened lazily in append mode and every batch
+    of records is flushed right away.
+
+    Attributes
+    ----------
+    path : str
+        Path to the dead-letter file.
+    encoder : type
+        JSON encoder class.
+    n_written : int
+        Number of written records.
+    """
+    def __init__(self, path, encoder=UniversalJSONEncoder):
+        """Initialization method."""
+        self.path = path
+        self.encoder = encoder
+        self.n_written = 0
+        self._file = None
+        self._lock = Lock()
+
+    def write(self, failed, **kwds):
+        """Write failed operations.
+
+        Parameters
+        ----------
+        failed : iterable of tuples
+            Pairs of failed operations and error details.
+        **kwds :
+            Additional fields added to every record.
+        """
+        lines = []
+        for op, error in failed:
+            record = { **kwds, **op_to_record(op) }
+            if error is not None:
+                record['error'] = {
+                    k: error.get(k) for k in ('code', 'errmsg') if k in error
+                }
+            lines.append(json.dumps(record, cls=self.encoder) + "\n")
+        if not lines:
+            return
+        with self._lock:
+            if self._file is None:
+                dirpath = os.path.dirname(self.path)
+                if dirpath:
+                    os.makedirs(dirpath, exist_ok=True)
+                self._file = open(self.path, 'a')
+            self._file.writelines(lines)
+            self._file.flush()
+            self.n_written += len(lines)
+
+    def close(self):
+        """Close the file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def merge_set(target, update):
+    """Merge `$set` payload into another one in place.
+
+    Later values take precedence. Fields in the target that are
+    overwritten by a parent path (i.e. `a.b` by `a`) are removed.
+
+    Parameters
+    ----------
+    target : dict
+        Target `$set` payload.
+    update : Mapping
+        `$set` payload merged into the target.
+
+    Returns
+    -------
+    bool
+        `False` if payloads could not be merged, because a field
+        in `update` is nested in a field of `target` (i.e. `a.b` in `a`).
+        In this case the target is not modified.
+    """
+    for k in update:
+        if any(k.startswith(t + '.') for t in target):
+            return False
+    for k, v in update.items():
+        for t in [ t for t in target if t.startswith(k + '.') ]:
+            del target[t]
+        target[k] = v
+    return True
+
+def coalesce_updates(updates):
+    """Coalesce `$set`-only updates with the same filters.
+
+    `$set` payloads of updates with equal filters are merged
+    in arrival order into the first of them. An update with other
+    operators (or payloads that can not be merged) seals the filter,
+    so it and all subsequent updates with the same filter
+    are kept after it and the order of updates of every single document
+    is preserved.
+
+    Parameters
+    ----------
+    updates : iterable of tuples
+        Pairs of filters and updates.
+
+    Returns
+    -------
+    list of tuples
+        Pairs of filters and coalesced updates.
+    """
+    coalesced = []
+    open_sets = {}
+    for flt, update in updates:
+        key = freeze(flt)
+        if isinstance(update, Mapping) and list(update) == [ '$set' ]:
+            payload = open_sets.get(key)
+            if payload is not None and merge_set(payload, update['$set']):
+                continue
+            payload = dict(update['$set'])
+            open_sets[key] = payload
+            coalesced.append((flt, { '$set': payload }))
+        else:
+            open_sets.pop(key, None)
+            coalesced.append((flt, update))
+    return coalesced
+
+def partition_ops(ops, n):
+    """Partition write operations by a hash of their filters.
+
+    Operations with the same filter always end up in the same partition
+    and keep their relative order. Operations without filters
+    (i.e. inserts) are distributed in round-robin fashion.
+
+    Parameters
+    ----------
+    ops : list
+        :py:module:`pymongo` write operations.
+    n : int
+        Number of partitions.
+
+    Returns
+    -------
+    list of lists
+        Non-empty partitions.
+    """
+    parts = [ [] for _ in range(n) ]
+    for i, op in enumerate(ops):
+        flt = getattr(op, '_filter', None)
+        key = hash(freeze(flt)) if flt is not None else i
+        parts[key % n].append(op)
+    return [ p for p in parts if p ]
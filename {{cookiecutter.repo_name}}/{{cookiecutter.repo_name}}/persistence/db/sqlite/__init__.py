@@ -0,0 +1,334 @@
+"""*SQLite* persistence based on the standard library :py:mod:`sqlite3`.
+
+It is meant for single-node pipelines and tests that do not need
+a database server. Records (dicts) are written to a single table
+that is created (and extended with new columns) as needed.
+Non-scalar values are stored as JSON strings.
+
+See Also
+--------
+sqlite3
+"""
+import os
+import json
+import math
+import sqlite3
+from itertools import groupby
+from collections import Mapping
+from datetime import date, datetime
+from .interface import SQLitePersistenceInterface
+from ....persistence import DBPersistence
+from ....persistence.queues import SpillQueue
+from {{ cookiecutter.repo_name }}.utils.app import get_persistence_path
+from {{ cookiecutter.repo_name }}.utils.serializers import JSONEncoder
+
+_SCALARS = (str, int, float, bytes, type(None))
+
+
+def quote(name):
+    """Quote *SQLite* identifier."""
+    return '"' + name.replace('"', '""') + '"'
+
+def adapt_value(value):
+    """Adapt value so it can be stored in *SQLite*.
+
+    Scalars are stored as they are, dates as ISO strings
+    and all other values as JSON strings.
+    """
+    if isinstance(value, _SCALARS):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return json.dumps(value, cls=JSONEncoder)
+
+
+class SQLitePersistence(DBPersistence):
+    """SQLite persistence class.
+
+    Batches of records are written with `executemany` in explicit
+    transactions. In update mode (and if key columns are defined in `query`)
+    records are upserted with `INSERT ... ON CONFLICT DO UPDATE`,
+    so only the columns present in a record are updated,
+    similarly to `$set` updates in
+    :py:class:`{{ cookiecutter.repo_name }}.persistence.db.mongo.MongoPersistence`.
+
+    Connection is opened lazily with `check_same_thread=False`,
+    so the persistence may be used from a different thread
+    than the one it was created in (but not from many threads at once).
+    """
+    _interface = SQLitePersistenceInterface
+
+    def __init__(self, item_name='record', **kwds):
+        """Initialization method.
+
+        Parameters
+        ----------
+        item_name : str
+            Item name.
+        **kwds :
+            Keyword arguments used to construct `SQLitePersistenceInterface`
+            if `settings=None`.
+        """
+        super().__init__(item_name, **kwds)
+        self._connection = None
+        self._columns = None
+
+    @property
+    def path(self):
+        """str: Path to the database file."""
+        if self.database:
+            return self.database
+        return get_persistence_path('db.sqlite3')
+
+    @property
+    def connection(self):
+        """:py:class:`sqlite3.Connection`: Database connection getter."""
+        if self._connection is None:
+            if self.path != ':memory:':
+                dirpath = os.path.dirname(self.path)
+                if dirpath:
+                    os.makedirs(dirpath, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            for k, v in self.pragmas.items():
+                conn.execute(f"PRAGMA {k} = {v}")
+            self._connection = conn
+        return self._connection
+
+    @property
+    def columns(self):
+        """list of str: Columns of the table (empty if it does not exist)."""
+        if self._columns is None:
+            cursor = self.connection.execute(f"PRAGMA table_info({quote(self.model)})")
+            self._columns = [ row[1] for row in cursor ]
+        return self._columns
+
+    def close(self):
+        """Close database connection."""
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+        self._columns = None
+
+    def get_model_name(self):
+        """Get table name."""
+        return self.model
+
+    def ensure_table(self, columns=()):
+        """Create the table and add missing columns.
+
+        Unique index over key columns is also created.
+
+        Parameters
+        ----------
+        columns : iterable of str
+            Columns that have to exist.
+        """
+        keys = self.query or []
+        required = list(dict.fromkeys([ *keys, *columns ]))
+        table = quote(self.model)
+        if not self.columns:
+            if not required:
+                return
+            cols = ', '.join(quote(c) for c in required)
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+            self._columns = list(required)
+        else:
+            for column in required:
+                if column not in self._columns:
+                    self.connection.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {quote(column)}"
+                    )
+                    self._columns.append(column)
+        if keys:
+            index = quote(f"{self.model}__key")
+            cols = ', '.join(quote(c) for c in keys)
+            self.connection.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table} ({cols})"
+            )
+
+    def make_statement(self, columns, update=None):
+        """Make insert or upsert statement.
+
+        Parameters
+        ----------
+        columns : tuple of str
+            Columns of records.
+        update : bool
+            Should update mode be used instead of insert.
+        """
+        if update is None:
+            update = self.update
+        table = quote(self.model)
+        cols = ', '.join(quote(c) for c in columns)
+        params = ', '.join('?' for _ in columns)
+        sql = f"INSERT INTO {table} ({cols}) VALUES ({params})"
+        if update and self.query:
+            keys = ', '.join(quote(c) for c in self.query)
+            values = [ c for c in columns if c not in self.query ]
+            if values:
+                assign = ', '.join(f"{quote(c)} = excluded.{quote(c)}" for c in values)
+                sql += f" ON CONFLICT ({keys}) DO UPDATE SET {assign}"
+            else:
+                sql += f" ON CONFLICT ({keys}) DO NOTHING"
+        return sql
+
+    def persist(self, doc, print_num=True, **kwds):
+        """Persist records in SQLite in batches.
+
+        Parameters
+        ----------
+        doc : Mapping
+            Record.
+        print_num : bool
+            Should number of processed items be printed.
+        **kwds :
+            Parameters passed to `do_update`.
+        """
+        self.inc(print_num=print_num)
+        if self.processor:
+            doc = self.processor(doc)
+        self.queue.appendleft(doc)
+        self.do_update(**kwds)
+
+    def do_update(self, min_batch_size=None, update=None):
+        """Persist a batch of records in SQLite.
+
+        Parameters
+        ----------
+        min_batch_size : int or None
+            Minimal batch size.
+            No minimal size if non-positive.
+            Use configuration value if `None`.
+        update : bool
+            Should update mode be used instead of insert.
+
+        Returns
+        -------
+        bool
+            True if a batch has been written.
+        """
+        n_docs = len(self.queue)
+        if min_batch_size is None:
+            batch_size = self.batch_size
+            min_batch_size = batch_size if batch_size and batch_size > 0 else math.inf
+        elif min_batch_size <= 0:
+            min_batch_size = math.inf
+        if n_docs < min_batch_size or n_docs == 0:
+            return False
+        chunk_size = self.flush_chunk_size if self.max_queue_memory else n_docs
+        while n_docs > 0:
+            docs = [ self.queue.pop() for _ in range(min(chunk_size, n_docs)) ]
+            n_docs -= len(docs)
+            self.write_batch(docs, update=update)
+        return True
+
+    def write_batch(self, docs, update=None):
+        """Write a batch of records in a single transaction.
+
+        Parameters
+        ----------
+        docs : list of Mapping
+            Records.
+        update : bool
+            Should update mode be used instead of insert.
+        """
+        # Only consecutive records with the same columns are grouped
+        # so records are still written in the order they arrived.
+        groups = [
+            (columns, [ tuple(adapt_value(v) for v in doc.values()) for doc in group ])
+            for columns, group in groupby(docs, key=tuple)
+        ]
+        self.ensure_table(dict.fromkeys(c for columns, _ in groups for c in columns))
+        conn = self.connection
+        conn.execute("BEGIN")
+        try:
+            for columns, rows in groups:
+                conn.executemany(self.make_statement(columns, update=update), rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            if self.logger:
+                m = f"Writing {len(docs)} records to table '{self.model}' failed."
+                self.logger.exception(m)
+            raise
+        self.notify_committed(len(docs))
+        if self.logger:
+            m = f"Updated {len(docs)} records in table '{self.model}' ({self.count} in total)."
+            self.logger.info(m)
+
+    def prepare(self):
+        """Prepare table before update."""
+        if self.clear_model is not None:
+            self.drop_model_data()
+        self.ensure_table()
+
+    def finalize(self):
+        """Update last batch regardless of the size and close the connection."""
+        try:
+            self.do_update(min_batch_size=1)
+        finally:
+            if isinstance(self.queue, SpillQueue):
+                self.queue.close()
+            self.close()
+
+    def drop_model_data(self, query=None, **kwds):
+        """Drop model data.
+
+        Parameters
+        ----------
+        query : any
+            If callable then it is called on self (and `**kwds`)
+            and the results is returned.
+            If string then it is used as a raw *SQL* `WHERE` clause.
+            If mapping then rows with equal values are deleted.
+            Empty string or mapping deletes all rows.
+        **kwds :
+            Optional keyword arguments passed to either 'query' or
+            'self.clear_model' callable.
+        """
+        if query is None:
+            query = self.clear_model
+        if isinstance(query, (str, Mapping)):
+            _query = query
+            def query(self):
+                if not self.columns:
+                    return 0
+                sql = f"DELETE FROM {quote(self.model)}"
+                params = ()
+                if isinstance(_query, str) and _query:
+                    sql += f" WHERE {_query}"
+                elif _query:
+                    sql += " WHERE " + " AND ".join(f"{quote(k)} = ?" for k in _query)
+                    params = tuple(adapt_value(v) for v in _query.values())
+                return self.connection.execute(sql, params).rowcount
+        return super().drop_model_data(query, **kwds)
+
+    def load_persisted_data(self, where=None, params=()):
+        """Load persisted records.
+
+        Parameters
+        ----------
+        where : str or None
+            Optional raw *SQL* `WHERE` clause.
+        params : tuple
+            Parameters of the clause.
+
+        Yields
+        ------
+        dict
+            Records (without `NULL` values).
+        """
+        if not self.columns:
+            return
+        sql = f"SELECT * FROM {quote(self.model)}"
+        if where:
+            sql += f" WHERE {where}"
+        cursor = self.connection.execute(sql, params)
+        names = [ d[0] for d in cursor.description ]
+        for row in cursor:
+            yield { k: v for k, v in zip(names, row) if v is not None }
@@ -0,0 +1,63 @@
+"""SQLite persistence interface."""
+from {{ cookiecutter.repo_name }}.base.interface import DBPersistenceInterface
+from {{ cookiecutter.repo_name }}.base.validators import BaseValidator
+from {{ cookiecutter.repo_name }}.utils.processors import parse_bool
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -65536,
+    'mmap_size': 268435456
+}
+
+
+def columns_factory(query):
+    """Normalize key columns specification to a list (or `None`)."""
+    if query is None:
+        return None
+    if isinstance(query, str):
+        return [ query ]
+    return list(query)
+
+
+class SQLitePersistenceInterface(DBPersistenceInterface):
+    """SQLite persistence settings interface class.
+
+    model : str
+        Table name.
+    database : str or None
+        Path to the database file. Defaults to `db.sqlite3`
+        in the persistence data directory.
+    query : str or iterable of str or None
+        Key column(s) used to detect conflicts in update mode.
+        Unique index is created over them. Plain inserts are used if `None`.
+    update : bool
+        Should update (upsert) or insert mode be used.
+    pragmas : dict
+        *SQLite* pragmas set on connection.
+    timeout : float
+        How many seconds to wait for a lock on the database.
+    **kwds :
+        Other arguments passed to
+        :py:class:`{{ cookiecutter.repo_name }}.base.interface.DBPersistenceInterface`.
+    """
+    _schema = BaseValidator({
+        **DBPersistenceInterface._schema.schema,
+        'model': { 'type': 'string', 'regex': r'[A-Za-z_][A-Za-z0-9_]*' },
+        'database': { 'type': 'string', 'nullable': True, 'default': None },
+        'query': {
+            'type': 'list',
+            'schema': { 'type': 'string' },
+            'nullable': True,
+            'default': None,
+            'coerce': columns_factory
+        },
+        'update': { 'type': 'boolean', 'coerce': parse_bool, 'default': True },
+        'pragmas': { 'type': 'dict', 'default': DEFAULT_PRAGMAS },
+        'timeout': { 'type': 'number', 'coerce': float, 'default': 30.0 }
+    })
+
+    def __init__(self, **kwds):
+        """Initialization method."""
+        super().__init__(**kwds)
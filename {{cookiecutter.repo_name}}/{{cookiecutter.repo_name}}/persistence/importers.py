@@ -5,11 +5,187 @@ facilities. They are meant to be composed of
 :py:module:`{{ cookiecutter.repo_name }}.persistence` objects.
 """
 # pylint: disable-all
-from collections import Mapping
+import os
 import json
+from collections import Mapping, deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from logging import getLogger
 from {{ cookiecutter.repo_name }}.base.validators import copy_schema
 from {{ cookiecutter.repo_name }}.base.abc import AbstractImporterMetaclass
 from {{ cookiecutter.repo_name }}.base.validators import ImporterValidator
+from {{ cookiecutter.repo_name }}.utils.lines import LineIndex
+from {{ cookiecutter.repo_name }}.utils.processors import parse_bool
+
+CHECKPOINT_EXT = '.checkpoint'
+
+
+def decode_line(line, n=None, logger=None):
+    """Decode a line of bytes as UTF-8 and log malformed content.
+
+    Parameters
+    ----------
+    line : bytes
+        Raw line.
+    n : int or None
+        Optional record number used in the error message.
+    logger : :py:class:`logging.Logger` or None
+        Logger used for reporting malformed content.
+    """
+    try:
+        return line.decode('utf-8')
+    except UnicodeDecodeError:
+        if logger:
+            errmsg = "Malformed unicode content at record no. {} [{}].".format(
+                n, str(line)
+            )
+            logger.error(errmsg)
+        return line.decode('utf-8', 'ignore')
+
+def find_chunks(path, chunk_size, start=0, size=None):
+    """Split a file into byte ranges aligned on newline boundaries.
+
+    Parameters
+    ----------
+    path : str
+        Path to a file.
+    chunk_size : int
+        Approximate size of a chunk in bytes.
+        Every chunk is extended up to the end of the line it ends in.
+    start : int
+        Offset to start from. Must point to the beginning of a line.
+    size : int or None
+        Offset to stop at. Must point to the beginning of a line.
+        Defaults to the size of the file.
+
+    Returns
+    -------
+    list of tuple
+        Pairs of `(start, end)` byte offsets.
+    """
+    if size is None:
+        size = os.path.getsize(path)
+    chunks = []
+    with open(path, 'rb') as f:
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def parse_chunk(path, start, end):
+    """Parse JSON lines contained in a byte range of a file.
+
+    This is a module level function so it can be sent
+    to worker processes.
+
+    Parameters
+    ----------
+    path : str
+        Path to a file.
+    start : int
+        Start offset. Must point to the beginning of a line.
+    end : int
+        End offset. Must point to the beginning of a line or the end of file.
+
+    Returns
+    -------
+    list of tuple
+        Pairs of end offsets and parsed records.
+    """
+    logger = getLogger(__name__)
+    records = []
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    offset = start
+    for line in data.split(b"\n"):
+        offset = min(offset + len(line) + 1, end)
+        line = decode_line(line, logger=logger).strip()
+        if line:
+            records.append((offset, json.loads(line)))
+    return records
+
+
+class ImportCheckpoint:
+    """Checkpoint of an import from a file.
+
+    Checkpoints are stored as small JSON files that are replaced atomically,
+    so they always point to the end of the last committed record.
+
+    Attributes
+    ----------
+    path : str
+        Path to the checkpoint file.
+    source : str
+        Absolute path to the data source.
+    offset : int
+        Byte offset of the end of the last committed record.
+    count : int
+        Number of committed records.
+    """
+    def __init__(self, path, source):
+        """Initialization method.
+
+        Parameters
+        ----------
+        path : str
+            Path to the checkpoint file.
+        source : str
+            Path to the data source.
+        """
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.offset = 0
+        self.count = 0
+
+    def load(self):
+        """Load checkpoint from disk.
+
+        Returns
+        -------
+        bool
+            `True` if the checkpoint file existed.
+
+        Raises
+        ------
+        ValueError
+            If the checkpoint was written for a different source
+            or the source is shorter than the committed offset.
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        if data['source'] != self.source:
+            raise ValueError(f"Checkpoint '{self.path}' was written for '{data['source']}'")
+        if data['offset'] > os.path.getsize(self.source):
+            raise ValueError(f"Source '{self.source}' is shorter than the checkpoint offset")
+        self.offset = data['offset']
+        self.count = data['count']
+        return True
+
+    def save(self, offset, count):
+        """Save checkpoint to disk.
+
+        Parameters
+        ----------
+        offset : int
+            Byte offset of the end of the last committed record.
+        count : int
+            Number of committed records.
+        """
+        self.offset = offset
+        self.count = count
+        data = { 'source': self.source, 'offset': offset, 'count': count }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
 
 
 class BaseImporterMetaclass(AbstractImporterMetaclass):
@@ -20,7 +196,7 @@ class BaseImporterMetaclass(AbstractImporterMetaclass):
         """Schema getter."""
         cn = cls.__name__
         if not getattr(cls, '_schema', None):
-            raise Attribute(f"'{cn}' does not define 'schema' attribute")
+            raise AttributeError(f"'{cn}' does not define 'schema' attribute")
         if isinstance(cls._schema, dict):
             cls._schema = ImporterValidator(cls._schema)
         return cls._schema
@@ -53,6 +229,11 @@ class BaseImporter(metaclass=BaseImporterMetaclass):
         """Schema getter."""
         return self.__class__.schema
 
+    @property
+    def logger(self):
+        """Logger getter. Uses the logger of the persistence object."""
+        return getattr(self.persistence, 'logger', None)
+
     def import_data(self, source, print_num=True, **kwds):
         """Import data function.
 
@@ -71,51 +252,349 @@ class BaseImporter(metaclass=BaseImporterMetaclass):
 
 
 class JSONLinesImporter(BaseImporter):
-    """JSON lines data importer."""
-    interface = {
+    """JSON lines data importer.
+
+    Attributes
+    ----------
+    workers : int
+        Number of worker processes used for parsing.
+        Data is read serially if lower than 2.
+    chunk_size : int
+        Approximate size (in bytes) of file chunks sent to worker processes.
+    start : int or None
+        Number of the first record to import.
+    stop : int or None
+        Number of the record to stop before.
+    step : int or None
+        Step between subsequent records.
+        Setting `start`, `stop` or `step` makes the importer use a persisted
+        line index (see :py:class:`{{ cookiecutter.repo_name }}.utils.lines.LineIndex`)
+        so records before `start` are never read.
+    checkpoint : bool or str or None
+        Should a checkpoint be written after every batch committed
+        by the persistence. If `str` then it is used as the path
+        to the checkpoint file. If `True` then the path is the source path
+        with `CHECKPOINT_EXT` appended.
+    resume : bool
+        Should import resume from the last checkpoint.
+        Implies `checkpoint=True` if it is not set.
+    """
+    _schema = {
         **BaseImporter.schema.schema,
-        'source': { 'type': 'string', 'nullable': False }
+        'source': { 'type': 'string', 'nullable': False },
+        'workers': { 'type': 'integer', 'coerce': int, 'min': 1, 'default': 1 },
+        'chunk_size': {
+            'type': 'integer',
+            'coerce': int,
+            'min': 1,
+            'default': 16777216
+        },
+        'start': { 'type': 'integer', 'coerce': int, 'nullable': True, 'default': None },
+        'stop': { 'type': 'integer', 'coerce': int, 'nullable': True, 'default': None },
+        'step': { 'type': 'integer', 'coerce': int, 'nullable': True, 'default': None },
+        'checkpoint': {
+            'type': [ 'boolean', 'string' ],
+            'nullable': True,
+            'default': None
+        },
+        'resume': { 'type': 'boolean', 'coerce': parse_bool, 'default': False }
     }
 
-    def read_data(self, src):
-        """Read JSON lines file and import to a storage facility.
+    def read_data(self, src, start=None, stop=None, step=None):
+        """Read JSON lines file.
 
         Parameters
         ----------
         src : str
             Path to the data source.
-        print_num : bool
-            Should number of processed documents be printed.
-        **kwds :
-            Other arguments passed to `persist` method.
+        start : int or None
+            Number of the first record.
+        stop : int or None
+            Number of the record to stop before.
+        step : int or None
+            Step between subsequent records.
+
+        Yields
+        ------
+        dict
+            Parsed records.
+        """
+        for _, record in self.iter_records(src, start=start, stop=stop, step=step):
+            yield record
+
+    def iter_records(self, src, start=None, stop=None, step=None, offset=0):
+        """Iterate over records of JSON lines file together with their offsets.
+
+        Parameters
+        ----------
+        src : str
+            Path to the data source.
+        start : int or None
+            Number of the first record.
+        stop : int or None
+            Number of the record to stop before.
+        step : int or None
+            Step between subsequent records.
+        offset : int
+            Byte offset to start reading from if `start`, `stop`
+            and `step` are not defined.
+            Must point to the beginning of a line.
+
+        Yields
+        ------
+        tuple
+            Pairs of byte offsets of record ends and parsed records.
         """
         if not src:
             raise ValueError(
                 "{}: no data source path.".format(self.__class__.__name__)
             )
-        with open(src, 'rb') as f:
-            for line in f:
-                try:
-                    line = line.decode('utf-8')
-                except UnicodeDecodeError:
-                    if self.logger:
-                        errmsg = "Malformed unicode content at record no. {} [{}].".format(
-                            self.n_processed, str(line)
-                        )
-                        self.logger.error(errmsg)
-                    line = line.decode('utf-8', 'ignore')
-                data = json.loads(line.strip())
-                yield data
+        if start is None and stop is None and step is None:
+            with open(src, 'rb') as f:
+                f.seek(offset)
+                for n, line in enumerate(f, 1):
+                    offset += len(line)
+                    line = decode_line(line, n, self.logger)
+                    data = json.loads(line.strip())
+                    yield offset, data
+            return
+        with LineIndex(src) as index:
+            for n in range(*slice(start, stop, step).indices(len(index))):
+                line = decode_line(index[n], n+1, self.logger)
+                yield index.offsets[n+1], json.loads(line.strip())
 
-    def import_data(self, source, print_num=True, **kwds):
+    def read_data_parallel(self, src, workers, chunk_size=16777216,
+                           start=None, stop=None):
+        """Read JSON lines file using a pool of worker processes.
+
+        The file is split into byte ranges aligned on newline boundaries
+        which are parsed in separate processes. Records are yielded
+        as soon as chunks are parsed, so the original order of records
+        is not preserved.
+
+        Parameters
+        ----------
+        src : str
+            Path to the data source.
+        workers : int
+            Number of worker processes.
+        chunk_size : int
+            Approximate size of file chunks in bytes.
+        start : int or None
+            Number of the first record.
+        stop : int or None
+            Number of the record to stop before.
+
+        Yields
+        ------
+        dict
+            Parsed records.
+        """
+        records = self.iter_records_parallel(src, workers, chunk_size,
+                                             start=start, stop=stop)
+        for _, record in records:
+            yield record
+
+    def iter_records_parallel(self, src, workers, chunk_size=16777216,
+                              start=None, stop=None, offset=0, ordered=False):
+        """Iterate over records and their offsets using a pool of worker processes.
+
+        Parameters
+        ----------
+        src : str
+            Path to the data source.
+        workers : int
+            Number of worker processes.
+        chunk_size : int
+            Approximate size of file chunks in bytes.
+        start : int or None
+            Number of the first record.
+        stop : int or None
+            Number of the record to stop before.
+        offset : int
+            Byte offset to start reading from if `start` and `stop`
+            are not defined. Must point to the beginning of a line.
+        ordered : bool
+            Should chunks be yielded in the order of the file
+            instead of the order of completion.
+
+        Yields
+        ------
+        tuple
+            Pairs of byte offsets of record ends and parsed records.
+        """
+        if not src:
+            raise ValueError(
+                "{}: no data source path.".format(self.__class__.__name__)
+            )
+        size = None
+        if start is not None or stop is not None:
+            with LineIndex(src) as index:
+                first, last, _ = slice(start, stop).indices(len(index))
+                offset = index.offsets[first]
+                size = index.offsets[max(first, last)]
+        chunks = iter(find_chunks(src, chunk_size, start=offset, size=size))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep the number of parsed chunks waiting in memory bounded
+            futures = [
+                executor.submit(parse_chunk, src, start, end)
+                for start, end in islice(chunks, 2*workers)
+            ]
+            if ordered:
+                pending = deque(futures)
+                while pending:
+                    future = pending.popleft()
+                    for start, end in islice(chunks, 1):
+                        pending.append(executor.submit(parse_chunk, src, start, end))
+                    yield from future.result()
+                return
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for start, end in islice(chunks, len(done)):
+                    pending.add(executor.submit(parse_chunk, src, start, end))
+                for future in done:
+                    yield from future.result()
+
+    def import_data(self, source, print_num=True, workers=1,
+                    chunk_size=16777216, start=None, stop=None, step=None,
+                    checkpoint=None, resume=False, **kwds):
         """Import data method.
 
         Parameters
         ----------
         source : str
             Path to the data source.
+        print_num : bool
+            Should number of processed documents be printed.
+        workers : int
+            Number of worker processes used for parsing.
+            Data is read serially if lower than 2.
+        chunk_size : int
+            Approximate size of file chunks (in bytes) in the parallel mode.
+        start : int or None
+            Number of the first record.
+        stop : int or None
+            Number of the record to stop before.
+        step : int or None
+            Step between subsequent records.
+            The parallel mode is not used if `step` is defined.
+        checkpoint : bool or str or None
+            Should a checkpoint be written after every committed batch.
+            If `str` then it is used as the path to the checkpoint file.
+        resume : bool
+            Should import resume from the last checkpoint.
         **kwds :
             Other arguments passed to `persist` method.
+
+        Raises
+        ------
+        ValueError
+            If checkpoints are used together with `start`, `stop` or `step`.
         """
-        data = self.read_data(source)
+        if resume and checkpoint is None:
+            checkpoint = True
+        if checkpoint:
+            if start is not None or stop is not None or step is not None:
+                raise ValueError("Checkpoints can not be used with 'start', 'stop' or 'step'")
+            path = checkpoint if isinstance(checkpoint, str) else source + CHECKPOINT_EXT
+            self.import_data_with_checkpoint(source, path, resume=resume,
+                                             print_num=print_num, workers=workers,
+                                             chunk_size=chunk_size, **kwds)
+            return
+        if start is None and stop is None and step is None:
+            if workers > 1:
+                records = self.iter_records_parallel(source, workers, chunk_size)
+            else:
+                records = self.iter_records(source)
+            data = ( record for _, record in self.track_progress(source, records) )
+        elif workers > 1 and step is None:
+            data = self.read_data_parallel(source, workers, chunk_size,
+                                           start=start, stop=stop)
+        else:
+            data = self.read_data(source, start=start, stop=stop, step=step)
         super().import_data(data, print_num=print_num, **kwds)
+
+    def track_progress(self, src, records, offset=0):
+        """Pass records through and report bytes read to the progress meter.
+
+        The size of the source is set as the total number of bytes,
+        so the remaining time of the import may be estimated.
+
+        Parameters
+        ----------
+        src : str
+            Path to the data source.
+        records : iterable
+            Pairs of byte offsets of record ends and parsed records.
+        offset : int
+            Byte offset the records are read from.
+
+        Yields
+        ------
+        tuple
+            Pairs of byte offsets of record ends and parsed records.
+        """
+        progress = getattr(self.persistence, 'progress', None)
+        if progress is None:
+            yield from records
+            return
+        progress.total_bytes = os.path.getsize(src) - offset
+        for end, record in records:
+            # Records parsed in parallel may come out of order
+            if end - offset > progress.n_bytes:
+                progress.n_bytes = end - offset
+            yield end, record
+
+    def import_data_with_checkpoint(self, source, path, resume=False, print_num=True,
+                                    workers=1, chunk_size=16777216, **kwds):
+        """Import data and write a checkpoint after every committed batch.
+
+        The checkpoint is advanced only when the persistence notifies
+        its commit hooks, that is after a batch is successfully written.
+        Chunks parsed in the parallel mode are consumed in the order
+        of the file, so committed records always form a prefix of the source.
+
+        Parameters
+        ----------
+        source : str
+            Path to the data source.
+        path : str
+            Path to the checkpoint file.
+        resume : bool
+            Should import start from the offset stored in the checkpoint.
+        print_num : bool
+            Should number of processed documents be printed.
+        workers : int
+            Number of worker processes used for parsing.
+        chunk_size : int
+            Approximate size of file chunks (in bytes) in the parallel mode.
+        **kwds :
+            Other arguments passed to `persist` method.
+        """
+        checkpoint = ImportCheckpoint(path, source)
+        if resume and checkpoint.load() and self.logger:
+            self.logger.info("Resuming import of '%s' from offset %d (%d records committed).",
+                             source, checkpoint.offset, checkpoint.count)
+        if workers > 1:
+            records = self.iter_records_parallel(source, workers, chunk_size,
+                                                 offset=checkpoint.offset, ordered=True)
+        else:
+            records = self.iter_records(source, offset=checkpoint.offset)
+        records = self.track_progress(source, records, offset=checkpoint.offset)
+        pending = deque()
+
+        def commit_hook(n):
+            """Advance checkpoint to the end of the last committed record."""
+            for _ in range(n-1):
+                pending.popleft()
+            checkpoint.save(pending.popleft(), checkpoint.count + n)
+
+        self.persistence.commit_hooks.append(commit_hook)
+        try:
+            with self.persistence:
+                for offset, record in records:
+                    pending.append(offset)
+                    self.persistence.persist(record, print_num=print_num, **kwds)
+        finally:
+            self.persistence.commit_hooks.remove(commit_hook)
@@ -0,0 +1,155 @@
+"""Persistence queues.
+
+Persistence classes use :py:class:`collections.deque` as the queue
+of records waiting to be written (records are added with `appendleft`
+and taken with `pop`). This module provides alternative implementations
+of the same interface for cases when the standard deque is not enough.
+"""
+import pickle
+import struct
+import tempfile
+from collections import deque
+
+_HEADER = struct.Struct('<Q')
+
+
+class SpillQueue:
+    """FIFO queue with bounded memory spilling overflow to disk.
+
+    Records are kept pickled, so the memory used by the queue can be
+    accounted for exactly. Once the memory ceiling is reached all subsequent
+    records are appended to a temporary segment file until the spilled
+    records are consumed, so the FIFO order is always preserved.
+    When the in-memory part is exhausted, it is refilled with the oldest
+    spilled records read sequentially from the segment file.
+
+    It implements the subset of :py:class:`collections.deque`
+    interface used by persistence classes.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Maximum size of pickled records kept in memory.
+        At least one record is always kept in memory.
+    dirpath : str or None
+        Directory for the temporary segment file.
+        Use default temporary directory if `None`.
+    protocol : int
+        Pickle protocol.
+    n_spilled : int
+        Total number of records spilled to disk.
+    """
+    def __init__(self, max_bytes, dirpath=None, protocol=pickle.HIGHEST_PROTOCOL):
+        """Initialization method.
+
+        Parameters
+        ----------
+        max_bytes : int
+            Maximum size of pickled records kept in memory.
+        dirpath : str or None
+            Directory for the temporary segment file.
+        protocol : int
+            Pickle protocol.
+        """
+        if max_bytes <= 0:
+            raise ValueError("'max_bytes' must be positive")
+        self.max_bytes = max_bytes
+        self.dirpath = dirpath
+        self.protocol = protocol
+        self.n_spilled = 0
+        self._mem = deque()
+        self._mem_bytes = 0
+        self._file = None
+        self._n_disk = 0
+        self._read_pos = 0
+        self._write_pos = 0
+
+    def __len__(self):
+        """Number of queued records."""
+        return len(self._mem) + self._n_disk
+
+    def __bool__(self):
+        """Is queue non-empty."""
+        return len(self) > 0
+
+    @property
+    def memory_bytes(self):
+        """int: Size of pickled records kept in memory."""
+        return self._mem_bytes
+
+    @property
+    def disk_bytes(self):
+        """int: Size of spilled records not consumed yet."""
+        return self._write_pos - self._read_pos
+
+    def appendleft(self, item):
+        """Add a record to the queue."""
+        data = pickle.dumps(item, protocol=self.protocol)
+        if not self._n_disk and (not self._mem or self._mem_bytes + len(data) <= self.max_bytes):
+            self._mem.appendleft(data)
+            self._mem_bytes += len(data)
+        else:
+            self._spill(data)
+
+    def pop(self):
+        """Remove and return the oldest record.
+
+        Raises
+        ------
+        IndexError
+            If the queue is empty.
+        """
+        if not self._mem:
+            if not self._n_disk:
+                raise IndexError("pop from an empty queue")
+            self._refill()
+        data = self._mem.pop()
+        self._mem_bytes -= len(data)
+        return pickle.loads(data)
+
+    def clear(self):
+        """Remove all records."""
+        self._mem.clear()
+        self._mem_bytes = 0
+        self._reset_file()
+
+    def close(self):
+        """Remove all records and the segment file."""
+        self.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _spill(self, data):
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.dirpath, suffix='.queue')
+        self._file.seek(self._write_pos)
+        self._file.write(_HEADER.pack(len(data)))
+        self._file.write(data)
+        self._write_pos = self._file.tell()
+        self._n_disk += 1
+        self.n_spilled += 1
+
+    def _refill(self):
+        f = self._file
+        f.seek(self._read_pos)
+        while self._n_disk:
+            size, = _HEADER.unpack(f.read(_HEADER.size))
+            # At least one record is read even if it exceeds the ceiling
+            if self._mem and self._mem_bytes + size > self.max_bytes:
+                f.seek(-_HEADER.size, 1)
+                break
+            self._mem.appendleft(f.read(size))
+            self._mem_bytes += size
+            self._n_disk -= 1
+        self._read_pos = f.tell()
+        if not self._n_disk:
+            self._reset_file()
+
+    def _reset_file(self):
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+        self._n_disk = 0
+        self._read_pos = 0
+        self._write_pos = 0
@@ -6,7 +6,6 @@ component to it.
 """
 from celery import Celery
 from .taskcls import TaskissTask
-from .scheduler import Scheduler
 
 
 class Taskiss(Celery):
@@ -43,9 +42,27 @@ class Taskiss(Celery):
         {{ cookiecutter.repo_name }}.scheduler.Scheduler : _Taskiss_ scheduler class
         """
         super().__init__(*args, task_cls=task_cls, **kwds)
-        self.scheduler = None
+        self._scheduler = None
+        self._scheduler_kwds = None
 
-    def setup_scheduler(self, **kwds):
+    @property
+    def scheduler(self):
+        """Scheduler object.
+
+        It is created on first access after :py:meth:`setup_scheduler`
+        was called, since building the dependency graph imports all task
+        modules (and *networkx*). It is `None` if the scheduler was not set up.
+        """
+        if self._scheduler is None and self._scheduler_kwds is not None:
+            from .scheduler import Scheduler
+            self._scheduler = Scheduler(self.conf['include'], **self._scheduler_kwds)
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, value):
+        self._scheduler = value
+
+    def setup_scheduler(self, lazy=True, **kwds):
         """Setup scheduler object.
 
         Scheduler setup must be done outside of the `__init__` method
@@ -53,7 +70,14 @@ class Taskiss(Celery):
 
         Parameters
         ----------
+        lazy : bool
+            Should the scheduler be created on first access
+            instead of immediately.
         **kwds :
             Keyword arguments passed to the _Scheduler_ init method.
         """
-        self.scheduler = Scheduler(self.conf['include'], **kwds)
+        self._scheduler = None
+        self._scheduler_kwds = kwds
+        if not lazy:
+            from .scheduler import Scheduler
+            self._scheduler = Scheduler(self.conf['include'], **kwds)
@@ -17,7 +17,6 @@ from celery.task.control import inspect
 from networkx import DiGraph, draw_shell
 from networkx.algorithms import is_directed_acyclic_graph, simple_cycles
 from networkx.algorithms import descendants, topological_sort
-import matplotlib.pyplot as pyplot
 from .utils import merge_results
 from .exceptions import CircularDependenciesError, NonExistentTaskDependencyError
 from .exceptions import AmbiguousTaskNameError, TaskNotRegisteredError
@@ -220,6 +219,8 @@ class Scheduler(object):
         if task:
             task = self.resolve_task_name(task)
             graph = graph.subgraph([ task, *descendants(graph, task)])
+        # Imported here, since it is slow and needed only for plotting
+        import matplotlib.pyplot as pyplot
         draw_shell(graph, with_labels=with_labels, **kwds)
         pyplot.show()
 
@@ -11,7 +11,10 @@ noargs : bool
     Should task be run with immutable signature if chained.
 """
 import time
+from celery import group
+from bson import json_util
 from {{ cookiecutter.repo_name }} import taskiss
+from {{ cookiecutter.repo_name }}.persistence.db.mongo import partition
 
 # Set of example tasks with complex dependency graph --------------------------
 
@@ -87,3 +90,79 @@ def long_task(x):
 def very_long_task():
     time.sleep(60*60)
     return True
+
+# Partitioned MongoDB scans ---------------------------------------------------
+#
+# Fan-out tasks split a collection into '_id' ranges and dispatch
+# one task per range. Range bounds are passed as MongoDB Extended JSON
+# strings, as task arguments are serialized as plain JSON.
+
+partition_schema = {
+    'model': { 'type': 'string', 'required': True },
+    'query': { 'type': 'dict', 'nullable': True, 'default': None },
+    'projection': { 'type': 'dict', 'nullable': True, 'default': None },
+    'batch_size': { 'type': 'integer', 'coerce': int, 'min': 1, 'default': 1000 }
+}
+fanout_schema = {
+    **partition_schema,
+    'n_partitions': { 'type': 'integer', 'coerce': int, 'min': 1, 'default': 8 },
+    'method': { 'type': 'string', 'allowed': list(partition.METHODS), 'default': 'auto' }
+}
+
+def _split(model, n_partitions, method, query):
+    """Split collection of a model into '_id' ranges."""
+    collection = partition.get_collection(model)
+    return partition.split_ranges(collection, n_partitions, method, query)
+
+def _fanout(task, model, ranges, per_range=None, **kwds):
+    """Dispatch a partition task for every range."""
+    per_range = per_range or [ {} for _ in ranges ]
+    job = group(
+        task.s(model=model, bounds=json_util.dumps(list(r)), **kwds, **rkwds)
+        for r, rkwds in zip(ranges, per_range)
+    ).apply_async()
+    return { 'group_id': job.id, 'task_ids': [ r.id for r in job.results ] }
+
+@taskiss.task(ignore_result=False, _interface={
+    **partition_schema,
+    'bounds': { 'type': 'string', 'required': True },
+    'path': { 'type': 'string', 'required': True },
+    'mode': { 'type': 'string', 'default': 'plain' }
+})
+def mongo_export_partition(model, bounds, path, query, projection, batch_size, mode):
+    lower, upper = json_util.loads(bounds)
+    return partition.export_partition(model, lower, upper, path, query=query,
+                                      projection=projection, batch_size=batch_size,
+                                      mode=mode)
+
+@taskiss.task(ignore_result=False, _interface={
+    **fanout_schema,
+    'path': { 'type': 'string', 'required': True },
+    'mode': { 'type': 'string', 'default': 'plain' }
+})
+def mongo_export_partitioned(model, path, n_partitions, method, query, projection,
+                             batch_size, mode):
+    ranges = _split(model, n_partitions, method, query)
+    per_range = [ { 'path': partition.shard_path(path, i) } for i in range(len(ranges)) ]
+    return _fanout(mongo_export_partition, model, ranges, per_range, query=query,
+                   projection=projection, batch_size=batch_size, mode=mode)
+
+@taskiss.task(ignore_result=False, _interface={
+    **partition_schema,
+    'bounds': { 'type': 'string', 'required': True },
+    'func': { 'type': 'string', 'required': True }
+})
+def mongo_scan_partition(model, bounds, func, query, projection, batch_size):
+    lower, upper = json_util.loads(bounds)
+    res = partition.scan_partition(model, lower, upper, func, query=query,
+                                   projection=projection, batch_size=batch_size)
+    return { 'result': res }
+
+@taskiss.task(ignore_result=False, _interface={
+    **fanout_schema,
+    'func': { 'type': 'string', 'required': True }
+})
+def mongo_scan_partitioned(model, func, n_partitions, method, query, projection, batch_size):
+    ranges = _split(model, n_partitions, method, query)
+    return _fanout(mongo_scan_partition, model, ranges, query=query, func=func,
+                   projection=projection, batch_size=batch_size)
@@ -0,0 +1,137 @@
+"""Concurrency utilities."""
+from queue import Queue
+from threading import Thread, BoundedSemaphore
+
+_STOP = object()
+
+
+class BackgroundWorker:
+    """Background thread executing a function on submitted arguments.
+
+    Tasks are executed one after another in the order of submission.
+    The number of tasks in flight (queued or running) is bounded,
+    so `submit` blocks when the limit is reached. This provides natural
+    backpressure for producers that are faster than the worker.
+
+    The first exception raised by the function is stored and all
+    subsequent tasks are skipped. The exception is reraised in the producer
+    thread by every call to `submit`, `join` or `close` until the worker
+    is reset with :py:meth:`reset`, so no task is accepted after a failure.
+
+    Attributes
+    ----------
+    func : callable
+        Function called on arguments of submitted tasks.
+    maxsize : int
+        Maximum number of tasks in flight.
+    name : str or None
+        Optional name of the worker thread.
+    error : Exception or None
+        Exception raised by the function.
+    failed : bool
+        Has the function raised an exception.
+    """
+    def __init__(self, func, maxsize=1, name=None):
+        """Initialization method.
+
+        Parameters
+        ----------
+        func : callable
+            Function called on arguments of submitted tasks.
+        maxsize : int
+            Maximum number of tasks in flight. Must be positive.
+        name : str or None
+            Optional name of the worker thread.
+        """
+        if maxsize < 1:
+            raise ValueError("'maxsize' must be positive")
+        self.func = func
+        self.maxsize = maxsize
+        self.name = name
+        self.error = None
+        self.failed = False
+        self._queue = Queue()
+        self._slots = BoundedSemaphore(maxsize)
+        self._thread = None
+
+    @property
+    def is_alive(self):
+        """bool: Is the worker thread running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the worker thread if it is not running."""
+        if not self.is_alive:
+            self._thread = Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, *args, **kwds):
+        """Submit a task.
+
+        Blocks if the maximum number of tasks is in flight.
+
+        Parameters
+        ----------
+        *args :
+            Positional arguments passed to the function.
+        **kwds :
+            Keyword arguments passed to the function.
+        """
+        self.raise_error()
+        self.start()
+        self._slots.acquire()
+        self._queue.put((args, kwds))
+
+    def join(self):
+        """Wait until all submitted tasks are done."""
+        self._queue.join()
+        self.raise_error()
+
+    def close(self, reraise=True):
+        """Wait for submitted tasks and stop the worker thread.
+
+        Parameters
+        ----------
+        reraise : bool
+            Should the stored exception be reraised.
+            Setting to `False` is useful for cleanup after
+            the exception was already handled.
+        """
+        if self.is_alive:
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._thread = None
+        if reraise:
+            self.raise_error()
+
+    def raise_error(self):
+        """Reraise the exception stored by the worker thread."""
+        if self.error is not None:
+            raise self.error
+
+    def reset(self):
+        """Clear the stored exception, so the worker accepts tasks again.
+
+        It should be called only when no tasks are in flight,
+        i.e. after :py:meth:`join` or :py:meth:`close`.
+        """
+        self.error = None
+        self.failed = False
+
+    def _run(self):
+        """Worker thread loop."""
+        while True:
+            task = self._queue.get()
+            if task is _STOP:
+                self._queue.task_done()
+                break
+            args, kwds = task
+            try:
+                if not self.failed:
+                    self.func(*args, **kwds)
+            except Exception as exc:
+                self.failed = True
+                self.error = exc
+            finally:
+                self._slots.release()
+                self._queue.task_done()
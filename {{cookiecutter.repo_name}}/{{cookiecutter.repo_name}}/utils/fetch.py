@@ -1,7 +1,15 @@
-"""Utilities for fetching various kinds of classes and objects."""
+"""Utilities for fetching various kinds of classes and objects.
+
+Objects are looked up in
+:py:data:`{{ cookiecutter.repo_name }}.base.registry.registry`,
+so modules of the package are not scanned on every lookup.
+Modules are scanned directly (with :py:func:`{{ cookiecutter.repo_name }}.utils.iter_objects`)
+only if custom scanning arguments are passed.
+"""
 from . import iter_objects, iter_classes, findone, is_python_path, import_python
 from {{ cookiecutter.repo_name }}.base.abc import AbstractDBConnector, AbstractDBModel, AbstractDBMixin
 from {{ cookiecutter.repo_name }}.base.abc import AbstractImporterMetaclass, AbstractPersistenceMetaclass
+from {{ cookiecutter.repo_name }}.base.registry import registry
 
 
 def iter_db_connectors(predicate=None, **kwds):
@@ -14,9 +22,13 @@ def iter_db_connectors(predicate=None, **kwds):
     **kwds :
         Keyword arguments passed to
         :py:func:`.iter_objects`.
+        Registry is used if not set.
     """
+    if not kwds:
+        yield from registry.iter('connectors', predicate=predicate)
+        return
     obj_predicate=lambda x: isinstance(x, AbstractDBConnector) \
-        and (predicate(o) if predicate else True)
+        and (predicate(x) if predicate else True)
     yield from iter_objects('.{{ cookiecutter.repo_name }}',
                                obj_predicate=obj_predicate, **kwds)
 
@@ -30,7 +42,11 @@ def iter_db_models(predicate=None, **kwds):
     **kwds :
         Keyword arguments passed to
         :py:func:`.iter_classes`.
+        Registry is used if not set.
     """
+    if not kwds:
+        yield from registry.iter('models', predicate=predicate)
+        return
     obj_predicate = lambda o: isinstance(o, AbstractDBModel) \
         and issubclass(o, AbstractDBMixin) \
         and (predicate(o) if predicate else True)
@@ -53,9 +69,7 @@ def get_db_model(path_or_name, package=None, **kwds):
     """
     if is_python_path(path_or_name, object_only=True):
         return import_python(path_or_name, package=package)
-    models = iter_db_models(**kwds)
-    return findone(models, lambda x: x.__name__ == path_or_name,
-                   ambiguous_match='raise_if_not_unique')
+    return _get('models', path_or_name, iter_db_models, **kwds)
 
 def iter_importers(predicate=None, **kwds):
     """Iter over available db importers.
@@ -67,7 +81,11 @@ def iter_importers(predicate=None, **kwds):
     **kwds :
         Keyword arguments passed to
         :py:func:`.iter_objects`.
+        Registry is used if not set.
     """
+    if not kwds:
+        yield from registry.iter('importers', predicate=predicate)
+        return
     obj_predicate = lambda o: isinstance(o, AbstractImporterMetaclass) \
         and (predicate(o) if predicate else True)
     yield from iter_classes('.{{ cookiecutter.repo_name }}',
@@ -89,9 +107,7 @@ def get_importer(path_or_name, package=None, **kwds):
     """
     if is_python_path(path_or_name, object_only=True):
         return import_python(path_or_name, package=package)
-    importers = iter_importers(**kwds)
-    return findone(importers, lambda x: x.__name__ == path_or_name,
-                   ambiguous_match='raise_if_not_unique')
+    return _get('importers', path_or_name, iter_importers, **kwds)
 
 def iter_persistence(predicate=None, **kwds):
     """Iter over available persistence classes.
@@ -103,7 +119,11 @@ def iter_persistence(predicate=None, **kwds):
     **kwds :
         Keyword arguments passed to
         :py:func:`.iter_objects`.
+        Registry is used if not set.
     """
+    if not kwds:
+        yield from registry.iter('persistence', predicate=predicate)
+        return
     obj_predicate = lambda o: isinstance(o, AbstractPersistenceMetaclass) \
         and (predicate(o) if predicate else True)
     yield from iter_classes('.{{ cookiecutter.repo_name }}',
@@ -125,6 +145,13 @@ def get_persistence(path_or_name, package=None, **kwds):
     """
     if is_python_path(path_or_name, object_only=True):
         return import_python(path_or_name, package=package)
-    persistence = iter_persistence(**kwds)
-    return findone(persistence, lambda x: x.__name__ == path_or_name,
+    return _get('persistence', path_or_name, iter_persistence, **kwds)
+
+
+def _get(kind, name, iter_func, predicate=None, **kwds):
+    """Get object by name from the registry or by scanning modules."""
+    if not kwds:
+        return registry.get(kind, name, predicate=predicate)
+    objects = iter_func(predicate=predicate, **kwds)
+    return findone(objects, lambda x: x.__name__ == name,
                    ambiguous_match='raise_if_not_unique')
@@ -0,0 +1,217 @@
+"""Random access to line-oriented files.
+
+This module provides a memory-mapped reader of line-oriented files
+(such as JSON lines files) that builds a compact index of line offsets.
+The index is persisted in a sidecar file, so it has to be built only once
+per file version and afterwards any record may be accessed
+with a single seek.
+
+Attributes
+----------
+INDEX_EXT : str
+    Default extension of index sidecar files.
+INDEX_MAGIC : int
+    Number written at the beginning of index files
+    to identify them and their format version.
+"""
+import os
+import mmap
+from array import array
+
+INDEX_EXT = '.idx'
+INDEX_MAGIC = 0x4C494458_00000001
+
+
+class LineIndex:
+    """Memory-mapped line reader with a persisted line-offset index.
+
+    Line offsets are stored as :py:class:`array.array` of unsigned
+    64-bit integers. The index file consists of a header with the magic
+    number, size and modification time (in nanoseconds) of the indexed file,
+    followed by the offsets. The index is rebuilt whenever the size
+    or the modification time of the file change.
+
+    Attributes
+    ----------
+    path : str
+        Path to the indexed file.
+    index_path : str
+        Path to the index sidecar file.
+    persist : bool
+        Should the index be saved to disk after it is built.
+    offsets : :py:class:`array.array`
+        Offsets of line starts. The last element is the size of the file,
+        so line `n` spans over `offsets[n]:offsets[n+1]`.
+    """
+    def __init__(self, path, index_path=None, persist=True):
+        """Initialization method.
+
+        Parameters
+        ----------
+        path : str
+            Path to the indexed file.
+        index_path : str or None
+            Path to the index sidecar file.
+            Defaults to `path` with `INDEX_EXT` appended.
+        persist : bool
+            Should the index be saved to disk after it is built.
+        """
+        self.path = path
+        self.index_path = index_path if index_path else path + INDEX_EXT
+        self.persist = persist
+        self.offsets = None
+        self._file = None
+        self._mmap = None
+
+    def __enter__(self):
+        """Enter hook."""
+        return self.open()
+
+    def __exit__(self, type, value, traceback):
+        """Exit hook."""
+        self.close()
+
+    def __len__(self):
+        """Number of lines."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key):
+        """Get line(s) by number(s) or a slice.
+
+        Lines are returned as bytes without trailing newlines.
+        """
+        if isinstance(key, slice):
+            return list(self.iter_range(key.start, key.stop, key.step))
+        start, end = self.span(key)
+        return self._mmap[start:end].rstrip(b"\n")
+
+    @property
+    def signature(self):
+        """tuple: Size and modification time (in ns) of the indexed file."""
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def open(self):
+        """Open and memory-map the file and load or build the index."""
+        self._file = open(self.path, 'rb')
+        size, mtime = self.signature
+        if size > 0:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mmap = b''
+        if not self.load(size, mtime):
+            self.build(size)
+            if self.persist:
+                self.save(size, mtime)
+        return self
+
+    def close(self):
+        """Close the memory map and the file."""
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        if self._file:
+            self._file.close()
+        self._mmap = None
+        self._file = None
+
+    def span(self, n):
+        """Get byte offsets of a line.
+
+        Parameters
+        ----------
+        n : int
+            Line number. Negative numbers are counted from the end.
+
+        Returns
+        -------
+        tuple
+            Pair of `(start, end)` byte offsets.
+        """
+        nlines = len(self)
+        if n < 0:
+            n += nlines
+        if n < 0 or n >= nlines:
+            raise IndexError(f"Line number {n} is out of range")
+        return self.offsets[n], self.offsets[n+1]
+
+    def iter_range(self, start=None, stop=None, step=None):
+        """Iterate over lines in a range.
+
+        Parameters follow the semantics of :py:class:`slice`.
+
+        Yields
+        ------
+        bytes
+            Lines without trailing newlines.
+        """
+        offsets = self.offsets
+        mm = self._mmap
+        for n in range(*slice(start, stop, step).indices(len(self))):
+            yield mm[offsets[n]:offsets[n+1]].rstrip(b"\n")
+
+    def build(self, size):
+        """Build the index by scanning the memory-mapped file.
+
+        Parameters
+        ----------
+        size : int
+            Size of the file.
+        """
+        offsets = array('Q', [0])
+        find = self._mmap.find
+        pos = 0
+        while pos < size:
+            pos = find(b"\n", pos) + 1
+            if not pos:
+                break
+            offsets.append(pos)
+        if offsets[-1] != size:
+            offsets.append(size)
+        self.offsets = offsets
+
+    def load(self, size, mtime):
+        """Load the index from the sidecar file.
+
+        Parameters
+        ----------
+        size : int
+            Expected size of the indexed file.
+        mtime : int
+            Expected modification time (in ns) of the indexed file.
+
+        Returns
+        -------
+        bool
+            `True` if a valid index was loaded.
+        """
+        if not os.path.exists(self.index_path):
+            return False
+        offsets = array('Q')
+        nitems = os.path.getsize(self.index_path) // offsets.itemsize
+        if nitems < 4:
+            return False
+        with open(self.index_path, 'rb') as f:
+            offsets.fromfile(f, nitems)
+        if offsets[:3].tolist() != [ INDEX_MAGIC, size, mtime ]:
+            return False
+        self.offsets = offsets[3:]
+        return True
+
+    def save(self, size, mtime):
+        """Save the index to the sidecar file.
+
+        The file is first written to a temporary location
+        and then atomically moved.
+
+        Parameters
+        ----------
+        size : int
+            Size of the indexed file.
+        mtime : int
+            Modification time (in ns) of the indexed file.
+        """
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            array('Q', [ INDEX_MAGIC, size, mtime ]).tofile(f)
+            self.offsets.tofile(f)
+        os.replace(tmp_path, self.index_path)
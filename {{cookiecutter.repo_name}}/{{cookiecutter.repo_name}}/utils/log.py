@@ -1,18 +1,56 @@
-"""_{{ cookiecutter.repo_name | capitalize }}_ logging submodule."""
+"""_{{ cookiecutter.repo_name | capitalize }}_ logging submodule.
+
+Logging may work in a queue mode (enabled with `log_queue` config option).
+Then loggers have only :py:class:`logging.handlers.QueueHandler` handlers,
+which put records to a queue without formatting and I/O, and a single
+:py:class:`logging.handlers.QueueListener` thread passes them
+to the configured (i.e. file) handlers.
+The listener has to be restarted in forked processes
+(see :py:func:`restart_queue_listener`).
+
+File handlers rotate files after `log_max_bytes` bytes
+and keep `log_backup_count` old files, which are compressed with *gzip*
+if `log_compress` is enabled.
+"""
 
 # pylint: disable=C0301
 
 import os
+import gzip
+import copy
+import shutil
+import atexit
 import logging.config
-from logging import getLogger, Logger
+from queue import Queue
+from threading import RLock
+from logging import getLogger, Logger, Handler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from {{ cookiecutter.repo_name }}.config import cfg, MODE
 from .path import make_path
 
+_listener = None
+_listener_pid = None
+_listener_lock = RLock()
+_formatter = logging.Formatter()
+
 
-def init(root_path):
-    """Initialize logging module."""
+def init(root_path, queue=None):
+    """Initialize logging module.
+
+    Parameters
+    ----------
+    root_path : str
+        Path to the root folder of log files.
+    queue : bool or None
+        Should logging work in the queue mode.
+        If `None` then `log_queue` config option is used.
+    """
     settings = make_logging_settings(root_path)
     logging.config.dictConfig(settings)
+    if queue is None:
+        queue = cfg.getboolean(MODE, 'log_queue', fallback=False)
+    if queue:
+        start_queue_listener([ '', *settings['loggers'] ])
     return settings
 
 FORMATTERS = {
@@ -44,6 +82,41 @@ def get_logger(logger=True):
         return getLogger()
     return getLogger(logger)
 
+def make_file_handler(filename, level, max_bytes=None, backup_count=None, compress=None):
+    """Make settings of a rotating file handler.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the log file.
+    level : str
+        Logging level.
+    max_bytes : int or None
+        Size of the file triggering rollover.
+        If `None` then `log_max_bytes` config option is used.
+    backup_count : int or None
+        Number of kept rotated files.
+        If `None` then `log_backup_count` config option is used.
+    compress : bool or None
+        Should rotated files be compressed.
+        If `None` then `log_compress` config option is used.
+    """
+    if max_bytes is None:
+        max_bytes = cfg.getint(MODE, 'log_max_bytes', fallback=1048576)
+    if backup_count is None:
+        backup_count = cfg.getint(MODE, 'log_backup_count', fallback=3)
+    if compress is None:
+        compress = cfg.getboolean(MODE, 'log_compress', fallback=False)
+    return {
+        'class': f"{__name__}.GzipRotatingFileHandler" if compress \
+            else 'logging.handlers.RotatingFileHandler',
+        'level': level,
+        'formatter': 'default',
+        'filename': filename,
+        'maxBytes': max_bytes,
+        'backupCount': backup_count
+    }
+
 def make_logging_settings(root_path):
     """Make logging settings dict.
 
@@ -57,22 +130,14 @@ def make_logging_settings(root_path):
         'disable_existing_loggers': True,
         'formatters': FORMATTERS,
         'handlers': {
-            'default': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': cfg.getenvvar(MODE, 'log_level', fallback='INFO'),
-                'formatter': 'default',
-                'filename': make_path(root_path, '{{ cookiecutter.repo_name }}', '{{ cookiecutter.repo_name }}.log'),
-                'maxBytes': 1048576,
-                'backupCount': 3
-            },
-            'error': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': 'WARNING',
-                'formatter': 'default',
-                'filename': make_path(root_path, '{{ cookiecutter.repo_name }}', 'error.log'),
-                'maxBytes': 1048576,
-                'backupCount': 3
-            },
+            'default': make_file_handler(
+                make_path(root_path, '{{ cookiecutter.repo_name }}', '{{ cookiecutter.repo_name }}.log'),
+                level=cfg.getenvvar(MODE, 'log_level', fallback='INFO')
+            ),
+            'error': make_file_handler(
+                make_path(root_path, '{{ cookiecutter.repo_name }}', 'error.log'),
+                level='WARNING'
+            ),
             'message': {
                 'class': 'logging.StreamHandler',
                 'level': cfg.getenvvar(MODE, 'log_level', fallback='INFO'),
@@ -85,22 +150,14 @@ def make_logging_settings(root_path):
                 'formatter': 'default',
                 'stream': 'ext://sys.stdout'
             },
-            'taskiss': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': cfg.getenvvar(MODE, 'log_level', fallback='INFO'),
-                'formatter': 'default',
-                'filename': make_path(root_path, 'taskiss', 'taskiss.log'),
-                'maxBytes': 1048576,
-                'backupCount': 3
-            },
-            'taskiss_error': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': 'WARNING',
-                'formatter': 'default',
-                'filename': make_path(root_path, 'taskiss', 'error.log'),
-                'maxBytes': 1048576,
-                'backupCount': 3
-            }
+            'taskiss': make_file_handler(
+                make_path(root_path, 'taskiss', 'taskiss.log'),
+                level=cfg.getenvvar(MODE, 'log_level', fallback='INFO')
+            ),
+            'taskiss_error': make_file_handler(
+                make_path(root_path, 'taskiss', 'error.log'),
+                level='WARNING'
+            )
         },
         'root': {
             'handlers': [
@@ -125,7 +182,7 @@ def make_logging_settings(root_path):
             },
             'taskiss': {
                 'propagate': False,
-                'hanlders': [
+                'handlers': [
                     'taskiss',
                     'taskiss_error'
                 ],
@@ -148,30 +205,19 @@ def make_scrapy_logging_settings(root_path):
         'disable_existing_loggers': False,
         'formatters': FORMATTERS,
         'handlers': {
-            'scrapy': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': cfg.getenvvar(MODE, 'log_level', fallback='INFO'),
-                'formatter': 'default',
-                'filename': make_path(root_path, 'scrapy', 'scrapy.log'),
-                'maxBytes': 1048576,
-                'backupCount': 3
-            },
-            'scrapy_error': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': 'WARNING',
-                'formatter': 'default',
-                'filename': make_path(root_path, 'scrapy', 'error.log'),
-                'maxBytes': 1048576,
-                'backupCount': 3
-            },
-            'scrapy_debug': {
-                'class': 'logging.handlers.RotatingFileHandler',
-                'level': 'DEBUG',
-                'formatter': 'default',
-                'filename': make_path(root_path, 'scrapy', 'debug.log'),
-                'maxBytes': 1048576,
-                'backupCount': 2
-            }
+            'scrapy': make_file_handler(
+                make_path(root_path, 'scrapy', 'scrapy.log'),
+                level=cfg.getenvvar(MODE, 'log_level', fallback='INFO')
+            ),
+            'scrapy_error': make_file_handler(
+                make_path(root_path, 'scrapy', 'error.log'),
+                level='WARNING'
+            ),
+            'scrapy_debug': make_file_handler(
+                make_path(root_path, 'scrapy', 'debug.log'),
+                level='DEBUG',
+                backup_count=2
+            )
         },
         'root': {
             'propagate': False,
@@ -183,3 +229,174 @@ def make_scrapy_logging_settings(root_path):
         }
     }
     return settings
+
+
+class GzipRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler compressing rotated files with *gzip*.
+
+    Rotated files get `.gz` suffix (i.e. `error.log.1.gz`).
+    """
+    def __init__(self, *args, **kwds):
+        """Initialization method."""
+        super().__init__(*args, **kwds)
+        self.namer = gzip_namer
+        self.rotator = gzip_rotator
+
+
+def gzip_namer(name):
+    """Name rotated log files."""
+    return name + '.gz'
+
+def gzip_rotator(source, dest):
+    """Compress rotated log file."""
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class LoggerQueueHandler(QueueHandler):
+    """Queue handler marking records with the name of its logger.
+
+    Attributes
+    ----------
+    route : str
+        Name of the logger, which handlers are run by the listener.
+    """
+    def __init__(self, queue, route):
+        """Initialization method."""
+        super().__init__(queue)
+        self.route = route
+
+    def prepare(self, record):
+        """Prepare record for queuing.
+
+        Records are copied, since they may be queued by several handlers
+        (when propagated). Message is merged with arguments, so they are not
+        changed before the record is handled, and traceback is formatted
+        to `exc_text`, so it is written once by target handlers.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.log_route = self.route
+        return record
+
+
+class RouteHandler(Handler):
+    """Handler passing records from the queue to handlers of their loggers.
+
+    Attributes
+    ----------
+    routes : dict
+        Mapping from names of loggers to lists of their handlers.
+    """
+    def __init__(self, routes):
+        """Initialization method."""
+        super().__init__()
+        self.routes = routes
+
+    def handle(self, record):
+        """Handle record."""
+        for handler in self.routes.get(getattr(record, 'log_route', ''), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        """Emit record."""
+        self.handle(record)
+
+
+def start_queue_listener(loggers=('',)):
+    """Move handlers of loggers to a queue listener thread.
+
+    Handlers of every logger are replaced with a single
+    :py:class:`LoggerQueueHandler` and the original handlers
+    are run by a :py:class:`logging.handlers.QueueListener` thread.
+    Running listener is stopped first.
+
+    Parameters
+    ----------
+    loggers : sequence of str
+        Names of loggers. Empty string is the root logger.
+
+    Returns
+    -------
+    :py:class:`logging.handlers.QueueListener`
+        Started listener.
+    """
+    global _listener, _listener_pid
+    with _listener_lock:
+        stop_queue_listener()
+        queue = Queue()
+        routes = {}
+        for name in loggers:
+            logger = getLogger(name)
+            routes[name] = list(logger.handlers)
+            if not routes[name]:
+                continue
+            for handler in routes[name]:
+                logger.removeHandler(handler)
+            logger.addHandler(LoggerQueueHandler(queue, name))
+        _listener = QueueListener(queue, RouteHandler(routes))
+        _listener.start()
+        _listener_pid = os.getpid()
+        return _listener
+
+def stop_queue_listener(restore=True):
+    """Stop queue listener handling all queued records.
+
+    Parameters
+    ----------
+    restore : bool
+        Should original handlers be attached back to loggers.
+    """
+    global _listener, _listener_pid
+    with _listener_lock:
+        if _listener is None:
+            return
+        listener, _listener = _listener, None
+        if _listener_pid == os.getpid():
+            listener.stop()
+        _listener_pid = None
+        if restore:
+            for name, handlers in listener.handlers[0].routes.items():
+                logger = getLogger(name)
+                for handler in list(logger.handlers):
+                    if isinstance(handler, LoggerQueueHandler):
+                        logger.removeHandler(handler)
+                for handler in handlers:
+                    logger.addHandler(handler)
+
+def restart_queue_listener():
+    """Restart queue listener in a forked process.
+
+    Threads are not copied to child processes, so without a new listener
+    records would pile up in the queue. A new queue is used, since the old one
+    may be locked by the listener of the parent process.
+    It does nothing if the queue mode is disabled or the listener
+    already runs in the current process.
+    """
+    global _listener, _listener_pid, _listener_lock
+    if _listener is None or _listener_pid == os.getpid():
+        return
+    _listener_lock = RLock()
+    with _listener_lock:
+        routes = _listener.handlers[0].routes
+        queue = Queue()
+        for name in routes:
+            for handler in getLogger(name).handlers:
+                if isinstance(handler, LoggerQueueHandler):
+                    handler.queue = queue
+        _listener = QueueListener(queue, RouteHandler(routes))
+        _listener.start()
+        _listener_pid = os.getpid()
+
+
+atexit.register(stop_queue_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=restart_queue_listener)
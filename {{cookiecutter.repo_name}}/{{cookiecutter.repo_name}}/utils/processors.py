@@ -1,7 +1,6 @@
 """Serializer functions for transfering data from and to the ODM."""
 
 from datetime import datetime, date
-import dateparser
 
 
 def date_from_string(dt, fmt, preprocessor=None, **kwds):
@@ -46,6 +45,8 @@ def parse_date(dt, preprocessor=None, **kwds):
         return datetime(*dt.timetuple()[:6])
     if preprocessor:
         dt = preprocessor(dt, **kwds)
+    # Imported here, since it is slow to import
+    import dateparser
     return dateparser.parse(dt)
 
 def parse_bool(x, true=('true', 'yes', '1', 'on'), add_true=(),
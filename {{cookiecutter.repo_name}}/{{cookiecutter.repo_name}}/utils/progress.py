@@ -0,0 +1,196 @@
+"""Progress and throughput reporting.
+
+Attributes
+----------
+DEFAULT_INTERVAL : float
+    Default minimum time (in seconds) between subsequent
+    progress line refreshes.
+"""
+import sys
+from time import monotonic
+from . import safe_print
+
+DEFAULT_INTERVAL = .2
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
+def format_bytes(n):
+    """Format number of bytes in human readable units."""
+    n = float(n)
+    for unit in _UNITS[:-1]:
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} {_UNITS[-1]}"
+
+def format_time(seconds):
+    """Format duration as `HH:MM:SS`."""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressMeter:
+    """Time-throttled progress and throughput meter.
+
+    Counters are updated on every item, but the progress line
+    is written at most once per `interval` seconds, so terminal output
+    does not slow down fast loops. The line is written only if
+    the standard output is a terminal (unless `enabled` is set explicitly),
+    so otherwise displaying is a no-op. Counters are always tracked,
+    so they may be still reported with a logger.
+
+    Attributes
+    ----------
+    item_name : str
+        Name of the items being processed.
+    total : int or None
+        Total number of items if known.
+    total_bytes : int or None
+        Total number of bytes if known.
+        It is used to estimate the remaining time if `total` is not known.
+    interval : float
+        Minimum time between refreshes of the progress line in seconds.
+    enabled : bool
+        Should the progress line be written.
+    count : int
+        Number of processed items.
+    n_bytes : int
+        Number of processed bytes.
+    """
+    def __init__(self, item_name='item', total=None, total_bytes=None,
+                 interval=DEFAULT_INTERVAL, enabled=None, clock=monotonic):
+        """Initialization method.
+
+        Parameters
+        ----------
+        enabled : bool or None
+            Should the progress line be written.
+            If `None` then it is written only if *stdout* is a terminal.
+        clock : callable
+            Function returning current time in seconds.
+        **Other parameters** are described in class attributes.
+        """
+        if enabled is None:
+            isatty = getattr(sys.stdout, 'isatty', None)
+            enabled = bool(isatty and isatty())
+        self.item_name = item_name
+        self.total = total
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.enabled = enabled
+        self.clock = clock
+        self.count = 0
+        self.n_bytes = 0
+        self._start = None
+        self._next = 0
+        self._width = 0
+
+    @property
+    def elapsed(self):
+        """float: Time elapsed since the first update in seconds."""
+        if self._start is None:
+            return 0.
+        return self.clock() - self._start
+
+    @property
+    def stats(self):
+        """dict: Counters, rates and the estimated remaining time."""
+        elapsed = self.elapsed
+        items_per_sec = self.count / elapsed if elapsed > 0 else None
+        bytes_per_sec = self.n_bytes / elapsed if elapsed > 0 and self.n_bytes else None
+        eta = None
+        if self.total and items_per_sec:
+            eta = max(self.total - self.count, 0) / items_per_sec
+        elif self.total_bytes and bytes_per_sec:
+            eta = max(self.total_bytes - self.n_bytes, 0) / bytes_per_sec
+        return {
+            'count': self.count,
+            'n_bytes': self.n_bytes,
+            'elapsed': elapsed,
+            'items_per_sec': items_per_sec,
+            'bytes_per_sec': bytes_per_sec,
+            'eta': eta
+        }
+
+    def update(self, n=1, n_bytes=0):
+        """Update counters.
+
+        Parameters
+        ----------
+        n : int
+            Number of processed items.
+        n_bytes : int
+            Number of processed bytes.
+
+        Returns
+        -------
+        bool
+            Is refresh of the progress line due.
+            Always false if the meter is disabled.
+        """
+        self.count += n
+        self.n_bytes += n_bytes
+        if self._start is None:
+            self._start = self.clock()
+        if not self.enabled:
+            return False
+        now = self.clock()
+        if now < self._next:
+            return False
+        self._next = now + self.interval
+        return True
+
+    def format(self, item_name=None):
+        """Format counters as a single line.
+
+        Parameters
+        ----------
+        item_name : str or None
+            Optional item name to overwrite instance level attribute.
+        """
+        stats = self.stats
+        item_name = item_name if item_name else self.item_name
+        parts = [ f"{stats['count']}" + (f"/{self.total}" if self.total else "") ]
+        if stats['items_per_sec'] is not None:
+            parts.append(f"{stats['items_per_sec']:.1f} {item_name}s/s")
+        if stats['bytes_per_sec'] is not None:
+            parts.append(f"{format_bytes(stats['bytes_per_sec'])}/s")
+        parts.append(f"elapsed {format_time(stats['elapsed'])}")
+        if stats['eta'] is not None:
+            parts.append(f"ETA {format_time(stats['eta'])}")
+        return ", ".join(parts)
+
+    def display(self, msg):
+        """Write progress line.
+
+        Parameters
+        ----------
+        msg : str
+            Message written before the counters.
+            Carriage return is written before the line.
+        """
+        msg = msg.lstrip("\r")
+        line = f"{msg} [{self.format()}]"
+        width, self._width = self._width, len(line)
+        safe_print("\r" + line.ljust(width), nl=False)
+
+    def close(self):
+        """End the progress line if it was written."""
+        if self._width:
+            safe_print("")
+        self._width = 0
+
+    def log(self, logger, msg="Progress", item_name=None):
+        """Write counters to a logger.
+
+        Parameters
+        ----------
+        logger : :py:class:`logging.Logger` or None
+            Logger object. Nothing is logged if `None`.
+        msg : str
+            Message written before the counters.
+        item_name : str or None
+            Optional item name to overwrite instance level attribute.
+        """
+        if logger:
+            logger.info("%s: %s.", msg, self.format(item_name))
@@ -1,9 +1,9 @@
 """Serializer and deserializer functions and classes."""
 # pylint: disable=E0202
+import sys
 from datetime import datetime, date
 from json import JSONEncoder as _JSONEncoder
 from json import JSONDecoder as _JSONDecoder
-from scrapy import Item
 from cerberus import Validator
 from cerberus.schema import DefinitionSchema
 
@@ -18,13 +18,19 @@ class JSONEncoder(_JSONEncoder):
         """Serializer method."""
         if isinstance(o, (date, datetime)):
             return o.isoformat()
-        if isinstance(o, (Item, DefinitionSchema)):
+        if isinstance(o, DefinitionSchema) or _is_scrapy_item(o):
             return dict(o)
         if isinstance(o, Validator):
             return dict(o.schema)
         return super().default(o)
 
 
+def _is_scrapy_item(o):
+    # *Scrapy* is slow to import and items can exist only if it is already imported
+    scrapy = sys.modules.get('scrapy')
+    return scrapy is not None and isinstance(o, scrapy.Item)
+
+
 class UniversalJSONEncoder(JSONEncoder):
     """Universal JSON encoder.
 
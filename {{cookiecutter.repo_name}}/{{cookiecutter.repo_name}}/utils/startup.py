@@ -0,0 +1,189 @@
+"""Startup profiling utilities.
+
+Imports are profiled with `-X importtime` option of the interpreter
+(available since *Python 3.7*) in a fresh subprocess, so results
+do not depend on modules already imported by the calling process.
+
+Attributes
+----------
+PHASES : tuple of str
+    Initialization phases of the package timed by :py:func:`profile_startup`.
+"""
+import re
+import sys
+import json
+import subprocess
+from string import Template
+
+PHASES = ('import', 'logging', 'mongo', 'taskiss', 'scheduler')
+
+_IMPORTTIME_RX = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+# `string.Template` is used instead of `str.format`, so literal braces
+# are not doubled (double braces are rendered by the project template)
+_SCRIPT = Template("""\
+import json, time, platform
+phases, errors = {}, {}
+
+def timed(name, func):
+    start = time.perf_counter()
+    try:
+        return func()
+    except Exception as exc:
+        errors[name] = repr(exc)
+    finally:
+        phases[name] = time.perf_counter() - start
+
+start = time.perf_counter()
+package = __import__($package)
+phases['import'] = time.perf_counter() - start
+phases['logging'] = package.init_times.get('logging')
+for name in $components:
+    obj = timed(name, lambda: package.get_component(name))
+    if name == 'taskiss' and obj is not None:
+        timed('scheduler', lambda: obj.scheduler)
+print(json.dumps({
+    'python': platform.python_version(),
+    'phases': phases,
+    'errors': errors
+}))
+""")
+
+
+def parse_importtime(lines):
+    """Parse output of `-X importtime` to a tree of imports.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        Lines of the standard error stream.
+        Lines other than import times are ignored.
+
+    Returns
+    -------
+    list of dict
+        Top-level imports with `name`, `self_us`, `cumulative_us`
+        and `children` (nested imports) fields.
+        They are in the order of importing.
+    """
+    pending = {}
+    for line in lines:
+        match = _IMPORTTIME_RX.match(line.rstrip('\n'))
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        # Nested imports are reported before their parents
+        node = {
+            'name': name,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'children': pending.pop(depth + 1, [])
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+def sort_tree(nodes):
+    """Sort tree of imports by cumulative times (descending) on all levels."""
+    nodes = sorted(nodes, key=lambda n: n['cumulative_us'], reverse=True)
+    return [ { **n, 'children': sort_tree(n['children']) } for n in nodes ]
+
+def prune_tree(nodes, min_us=0, max_depth=None):
+    """Remove fast and deeply nested imports from a tree.
+
+    Parameters
+    ----------
+    nodes : list of dict
+        Tree of imports.
+    min_us : int
+        Minimum cumulative time of shown imports in microseconds.
+    max_depth : int or None
+        Maximum depth of shown imports. Top-level imports have depth 0.
+    """
+    if max_depth is not None and max_depth < 0:
+        return []
+    depth = None if max_depth is None else max_depth - 1
+    return [
+        { **n, 'children': prune_tree(n['children'], min_us, depth) }
+        for n in nodes if n['cumulative_us'] >= min_us
+    ]
+
+def format_tree(nodes, indent=2, _level=0):
+    """Format tree of imports as lines of text.
+
+    Every line shows cumulative and self time in milliseconds
+    and the name of the module indented by its depth.
+    """
+    lines = []
+    for node in nodes:
+        lines.append("{:>10.1f} {:>10.1f}  {}{}".format(
+            node['cumulative_us'] / 1000,
+            node['self_us'] / 1000,
+            ' '*indent*_level,
+            node['name']
+        ))
+        lines.extend(format_tree(node['children'], indent=indent, _level=_level+1))
+    return lines
+
+def format_profile(profile):
+    """Format startup profile (see :py:func:`profile_startup`) as text."""
+    lines = [ "Phases [ms]" ]
+    for name in PHASES:
+        if name in profile['phases']:
+            value = profile['phases'][name]
+            value = 'n/a' if value is None else f"{value:.1f}"
+            lines.append(f"  {name:<12}{value:>10}")
+    for name, error in profile['errors'].items():
+        lines.append(f"  {name} failed: {error}")
+    lines.append(f"Imports [ms] (total {profile['total_ms']:.1f})")
+    lines.append("{:>10} {:>10}  {}".format('cumul.', 'self', 'module'))
+    lines.extend(format_tree(profile['imports']))
+    return "\n".join(lines)
+
+def profile_startup(package=None, components=('mongo', 'taskiss'),
+                    python=sys.executable, env=None):
+    """Profile imports and initialization of the package in a subprocess.
+
+    Parameters
+    ----------
+    package : str or None
+        Name of the profiled package. Defaults to this package.
+        It must define `init_times` and `get_component()`.
+    components : sequence of str
+        Names of application components initialized after the import.
+        *Taskiss* scheduler is set up together with `taskiss`.
+    python : str
+        Path to the interpreter.
+    env : dict or None
+        Environment variables of the subprocess.
+
+    Returns
+    -------
+    dict
+        Profile with `python` (version), `phases` (durations in milliseconds
+        of :py:data:`PHASES`), `errors` (of initialization of components),
+        `total_ms` (total time of all imports) and `imports`
+        (tree of imports sorted by cumulative time,
+        see :py:func:`parse_importtime`) fields.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If the subprocess fails.
+    """
+    package = package or __name__.split('.')[0]
+    script = _SCRIPT.substitute(package=repr(package), components=repr(tuple(components)))
+    proc = subprocess.run([ python, '-X', 'importtime', '-c', script ],
+                          env=env, check=True, universal_newlines=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    res = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = sort_tree(parse_importtime(proc.stderr.splitlines()))
+    return {
+        'python': res['python'],
+        'phases': {
+            k: None if v is None else round(v * 1000, 3)
+            for k, v in res['phases'].items()
+        },
+        'errors': res['errors'],
+        'total_ms': sum(n['cumulative_us'] for n in imports) / 1000,
+        'imports': imports
+    }